@@ -1,7 +1,8 @@
 """Kimi LLM news-sentiment agent."""
-import httpx
 from pydantic import BaseModel
 
+from utils.endpoints import endpoint
+from utils.http_clients import http_client
 from utils.logger import get_logger
 
 log = get_logger("SENTIMENT_AGENT")
@@ -13,7 +14,7 @@ class SentimentScore(BaseModel):
 class SentimentAgent:
     def __init__(self, api_key: str) -> None:
         self.api_key = api_key
-        self.url = "https://api.moonshot.cn/v1/chat/completions"
+        self.url = endpoint("kimi")
 
     async def score_headline(self, headline: str) -> SentimentScore:
         payload = {
@@ -26,10 +27,9 @@ class SentimentAgent:
             ],
         }
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(self.url, json=payload, headers=headers)
-            r.raise_for_status()
-            text = r.json()["choices"][0]["message"]["content"]
-            # naive parse
-            score = float(text.split()[0])
-            return SentimentScore(score=score, reasoning=text)
\ No newline at end of file
+        r = await http_client("kimi").post(self.url, json=payload, headers=headers)
+        r.raise_for_status()
+        text = r.json()["choices"][0]["message"]["content"]
+        # naive parse
+        score = float(text.split()[0])
+        return SentimentScore(score=score, reasoning=text)
\ No newline at end of file
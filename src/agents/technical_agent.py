@@ -5,7 +5,7 @@ import numpy as np
 import pandas as pd
 import pandas_ta as ta
 
-from encoders.vit_encoder import ViTChartEncoder
+from registry.model_registry import ModelRegistry
 from utils.config import load_config
 from utils.logger import get_logger
 
@@ -14,11 +14,27 @@ log = get_logger("TECH_AGENT")
 
 # confidence gate
 MIN_LOGIT_GAP: float = cfg["model"].get("min_logit_gap", 0.25)
+ACTIONS = ["HOLD", "BUY", "SELL"]  # logit index order
+HOLD, BUY, SELL = range(3)
+
+
+def _ema_weights(n: int, length: int) -> np.ndarray:
+    """
+    Weights w such that window @ w equals the last value of an SMA-seeded
+    EMA (pandas_ta.ema) over an n-bar window.
+    """
+    a = 2 / (length + 1)
+    w = np.empty(n)
+    w[:length] = (1 - a) ** (n - length) / length
+    k = np.arange(length, n)
+    w[length:] = a * (1 - a) ** (n - 1 - k)
+    return w
 
 class TechnicalAgent:
     def __init__(self) -> None:
-        self.encoder = ViTChartEncoder()
+        self.encoder = ModelRegistry.load_encoder()
         self._chart_history: List[bytes] = []
+        self.last_logits: List[float] = []
         self.max_seq = 3  # last 3 PNGs
 
     # ------------------------------------------------------------------ #
@@ -36,14 +52,15 @@ class TechnicalAgent:
 
         # 2. ViT logits
         logits = self.encoder.encode(png_bytes)
+        self.last_logits = logits
         top2 = sorted(logits, reverse=True)[:2]
-        gap = top2[0] - top2[1] if len(top2) == 3 else 0.0
+        gap = top2[0] - top2[1] if len(top2) == 2 else 0.0
         if gap < MIN_LOGIT_GAP:
             log.debug("Low confidence – HOLD")
             return "HOLD", 0.0
 
         action_idx = int(np.argmax(logits))
-        action = ["HOLD", "BUY", "SELL"][action_idx]
+        action = ACTIONS[action_idx]
         confidence = gap
 
         # 3. hybrid check with classic TA
@@ -67,6 +84,44 @@ class TechnicalAgent:
 
         return action, confidence
 
+    # ------------------------------------------------------------------ #
+    # vectorised API (back-tests / sweeps)
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def ta_signal_windows(close_windows: np.ndarray, fast: int = 5, slow: int = 20) -> np.ndarray:
+        """_ta_signal for every (N, lookback) close window at once → int8 action index."""
+        n = close_windows.shape[1]
+        out = np.full(len(close_windows), HOLD, dtype=np.int8)
+        if n < max(20, slow):
+            return out
+        f = close_windows @ _ema_weights(n, fast)
+        s = close_windows @ _ema_weights(n, slow)
+        out[f > s * 1.001] = BUY
+        out[f < s * 0.999] = SELL
+        return out
+
+    @staticmethod
+    def decide_batch(
+        logits: np.ndarray, ta: np.ndarray, min_gap: float = MIN_LOGIT_GAP, seq: int = 3
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        decide() over consecutive bars: logit-gap gate, TA agreement and a
+        majority vote over the last `seq` charts. Returns (action idx, confidence).
+        """
+        srt = np.sort(logits, axis=1)
+        gap = srt[:, -1] - srt[:, -2]
+        arg = logits.argmax(axis=1)
+
+        votes = np.zeros((len(arg), 3), dtype=np.int64)
+        for k in range(seq):
+            votes[k:] += np.eye(3, dtype=np.int64)[arg[: len(arg) - k]]
+        majority = np.full(len(arg), HOLD)
+        majority[(votes[:, BUY] > votes[:, SELL]) & (votes[:, BUY] > votes[:, HOLD])] = BUY
+        majority[(votes[:, SELL] > votes[:, BUY]) & (votes[:, SELL] > votes[:, HOLD])] = SELL
+
+        ok = (gap >= min_gap) & (arg == ta) & (majority == arg)
+        return np.where(ok, arg, HOLD).astype(np.int8), np.where(ok, gap, 0.0)
+
     # ------------------------------------------------------------------ #
     # helpers
     # ------------------------------------------------------------------ #
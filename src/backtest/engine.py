@@ -1,14 +1,20 @@
 """
 Vectorised back-test using historical 1-min bars + synthetic LOB.
+
+  • every 60-bar window is a strided NumPy view (no per-bar slicing)
+  • TA signal for all bars in one matrix product
+  • charts rendered across a process pool, only where a trade is possible
+  • ViT logits in large batches, decisions via TechnicalAgent.decide_batch
+  • columnar trade table out
 """
-from pathlib import Path
 from typing import List
 
+import numpy as np
 import pandas as pd
-from tqdm import tqdm
+from numpy.lib.stride_tricks import sliding_window_view
 
-from agents.technical_agent import TechnicalAgent
-from encoders.multimodal import MultiModalEncoder
+from agents.technical_agent import ACTIONS, HOLD, TechnicalAgent
+from data_ingestion.candle_builder import RenderPool
 from execution.impact_model import ImpactModel
 from utils.config import load_config
 from utils.logger import get_logger
@@ -16,40 +22,93 @@ from utils.logger import get_logger
 cfg = load_config()
 log = get_logger("BACKTEST")
 
+OHLC = ["open", "high", "low", "close"]
+
 
 class BackTestEngine:
-    def __init__(self, symbol: str = "AAPL"):
+    def __init__(
+        self,
+        symbol: str = "AAPL",
+        lookback: int = 60,
+        qty: int = 100,
+        workers: int | None = None,
+        batch_size: int = 256,
+    ):
         self.symbol = symbol
+        self.lookback = lookback
+        self.qty = qty
+        self.workers = workers
+        self.batch_size = batch_size
         self.agent = TechnicalAgent()
-        self.encoder = MultiModalEncoder()
         self.impact = ImpactModel()
 
+    def windows(self, bars: pd.DataFrame) -> np.ndarray:
+        """(N - lookback + 1, lookback, 4) read-only view; row i ends at bar i + lookback - 1."""
+        if len(bars) < self.lookback:  # not one full window (thin or pre-listing period)
+            return np.empty((0, self.lookback, 4))
+        ohlc = np.ascontiguousarray(bars[OHLC].to_numpy(dtype=np.float64))
+        return sliding_window_view(ohlc, (self.lookback, 4))[:, 0]
+
+    def chart_mask(self, ta: np.ndarray, seq: int = 3) -> np.ndarray:
+        """Bars whose chart can influence a trade: TA non-HOLD plus the seq-1 charts before it."""
+        need = ta != HOLD
+        mask = need.copy()
+        for k in range(1, seq):
+            mask[:-k] |= need[k:]
+        return mask
+
+    def logits(self, bars: pd.DataFrame, win: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        out = np.zeros((len(win), 3), dtype=np.float32)
+        ids = np.flatnonzero(mask)
+        if not len(ids):
+            return out
+        ts = sliding_window_view(bars.index.to_numpy(), self.lookback)
+        pos = 0
+        with RenderPool(self.lookback, self.workers) as pool:
+            pngs: List[bytes] = []
+            for rendered in pool.map(win[ids], ts[ids], chunk_size=64):
+                pngs.extend(rendered)
+                if len(pngs) >= self.batch_size or pos + len(pngs) == len(ids):
+                    out[ids[pos: pos + len(pngs)]] = self.agent.encoder.encode_batch(pngs)
+                    pos += len(pngs)
+                    pngs = []
+        return out
+
     def run(self, bars: pd.DataFrame) -> pd.DataFrame:
-        trades = []
-        for ts, row in tqdm(bars.iterrows(), total=len(bars)):
-            # mock LOB
-            lob = FakeLob(row["close"])
-            png = self._render_png(bars.loc[:ts].tail(60))
-            vec = self.encoder.encode_live(png, lob, "")
-            action, conf = self.agent.decide(png, bars.loc[:ts].tail(60))
-            if action != "HOLD":
-                impact = self.impact.estimate(100, action, lob)
-                trades.append(
-                    {
-                        "ts": ts,
-                        "action": action,
-                        "price": impact.expected_price,
-                        "slippage_bps": impact.slippage_bps,
-                    }
-                )
-        return pd.DataFrame(trades)
-
-    def _render_png(self, df: pd.DataFrame) -> bytes:
-        from data_ingestion.candle_builder import CandleBuilder
-        return CandleBuilder().render_png(df)
+        bars = bars.sort_index()
+        win = self.windows(bars)
+        if not len(win):
+            return pd.DataFrame(columns=["ts", "action", "confidence", "price", "slippage_bps"])
+
+        ta = TechnicalAgent.ta_signal_windows(win[..., 3])
+        mask = self.chart_mask(ta)
+        log.info("%d windows, %d charts to score", len(win), int(mask.sum()))
+        action, conf = TechnicalAgent.decide_batch(self.logits(bars, win, mask), ta)
+
+        t = np.flatnonzero(action != HOLD)
+        close = win[t, -1, 3]
+        sides = np.asarray(ACTIONS)[action[t]]
+        est = [self.impact.estimate(self.qty, side, FakeLob(mid)) for side, mid in zip(sides, close)]
+        return pd.DataFrame({
+            "ts": bars.index[t + self.lookback - 1],
+            "action": sides,
+            "confidence": conf[t],
+            "price": np.array([e.expected_price for e in est], dtype=np.float64),
+            "slippage_bps": np.array([e.slippage_bps for e in est], dtype=np.float64),
+        })
+
+    def daily_pnl(self, bars: pd.DataFrame, trades: pd.DataFrame, freq: str = "1D") -> pd.Series:
+        """Mark-to-market PnL of ±qty following the signals (flip on the opposite one)."""
+        signed = pd.Series(
+            np.where(trades["action"].to_numpy() == "BUY", self.qty, -self.qty),
+            index=pd.DatetimeIndex(trades["ts"]),
+        )
+        pos = signed[~signed.index.duplicated(keep="last")].reindex(bars.index).ffill().fillna(0.0)
+        pnl = pos.shift(fill_value=0.0) * bars["close"].diff().fillna(0.0)
+        return pnl.groupby(pnl.index.floor(freq)).sum()  # bar-bearing periods only
 
 
 class FakeLob:
     def __init__(self, mid: float):
         self.bid = [(mid - 0.01 * i, 100) for i in range(1, 6)]
-        self.ask = [(mid + 0.01 * i, 100) for i in range(1, 6)]
\ No newline at end of file
+        self.ask = [(mid + 0.01 * i, 100) for i in range(1, 6)]
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Parallel multi-symbol / multi-period back-test runner.
+
+The universe × date range is cut into (symbol, period) shards and fanned
+out over a process pool; each worker loads the model once and keeps it.
+Every finished shard is written atomically under <out>/shards/, so an
+interrupted or failed run picks up where it stopped. merge() concatenates
+shard results into consolidated trade and daily-equity tables.
+"""
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import pandas as pd
+
+from performance import analytics
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("BT_ORCHESTRATOR")
+
+BT_CFG = cfg.get("backtest", {})
+BARS_DIR = Path(BT_CFG.get("bars_dir", "./data/replay"))
+OUT_DIR = Path(BT_CFG.get("out_dir", "./data/backtest"))
+
+
+@dataclass(frozen=True)
+class Shard:
+    symbol: str
+    start: pd.Timestamp
+    end: pd.Timestamp   # exclusive
+
+    @property
+    def key(self) -> str:
+        return f"{self.symbol}_{self.start:%Y%m%d}_{self.end:%Y%m%d}"
+
+
+def make_shards(symbols: Sequence[str], start: str, end: str, period: str = "MS") -> List[Shard]:
+    """Cut [start, end) into calendar periods (default: month starts) per symbol."""
+    edges = pd.date_range(start, end, freq=period)
+    edges = edges.union([pd.Timestamp(start), pd.Timestamp(end)])
+    return [
+        Shard(sym, lo, hi)
+        for sym in symbols
+        for lo, hi in zip(edges[:-1], edges[1:])
+    ]
+
+
+@lru_cache(maxsize=2)
+def load_bars(symbol: str, bars_dir: Path = BARS_DIR) -> pd.DataFrame:
+    """Full 1-min history for a symbol (<bars_dir>/<SYMBOL>_1m.csv, 'timestamp' column)."""
+    df = pd.read_csv(bars_dir / f"{symbol}_1m.csv", parse_dates=["timestamp"])
+    return df.set_index("timestamp").sort_index()
+
+
+# ---------------- process-pool worker ----------------
+_engine = None
+
+
+def _init_worker(lookback: int, qty: int, threads: int) -> None:
+    global _engine
+    import torch
+    from backtest.engine import BackTestEngine
+
+    torch.set_num_threads(threads)
+    # one model load per worker; charts render in-process (no nested pool)
+    _engine = BackTestEngine(lookback=lookback, qty=qty, workers=0)
+
+
+def _run_shard(shard: Shard, bars_dir: Path, out_dir: Path) -> str:
+    bars = load_bars(shard.symbol, bars_dir)
+    # warm-up: the lookback bars before the period so the first window is complete
+    first = bars.index.searchsorted(shard.start)
+    last = bars.index.searchsorted(shard.end)
+    window = bars.iloc[max(0, first - _engine.lookback + 1): last]
+
+    # fewer bars than lookback (pre-listing, delisted, thin period) → empty
+    # trades, still written below so a rerun treats the shard as done
+    trades = _engine.run(window)
+    trades = trades[trades["ts"] >= shard.start]
+    trades.insert(0, "symbol", shard.symbol)
+
+    pnl = _engine.daily_pnl(window[window.index >= shard.start], trades)
+    equity = pd.DataFrame({"date": pnl.index, "symbol": shard.symbol, "pnl": pnl.to_numpy()})
+
+    for name, df in (("trades", trades), ("equity", equity)):
+        tmp = out_dir / f"{shard.key}.{name}.pkl.tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, out_dir / f"{shard.key}.{name}.pkl")
+    return shard.key
+
+
+class BacktestOrchestrator:
+    def __init__(
+        self,
+        out_dir: Path = OUT_DIR,
+        bars_dir: Path = BARS_DIR,
+        workers: int | None = None,
+        lookback: int = 60,
+        qty: int = 100,
+    ) -> None:
+        self.out_dir = Path(out_dir)
+        self.shard_dir = self.out_dir / "shards"
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.bars_dir = Path(bars_dir)
+        self.workers = workers or os.cpu_count()
+        self.lookback = lookback
+        self.qty = qty
+
+    def done(self, shard: Shard) -> bool:
+        return all((self.shard_dir / f"{shard.key}.{n}.pkl").exists() for n in ("trades", "equity"))
+
+    def run(self, shards: Sequence[Shard]) -> Dict[str, str]:
+        """Run every shard not already on disk. Returns {key: error} for failures."""
+        todo = [s for s in shards if not self.done(s)]
+        log.info("%d shards, %d already done, %d to run on %d workers",
+                 len(shards), len(shards) - len(todo), len(todo), self.workers)
+        failed: Dict[str, str] = {}
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        with ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.lookback, self.qty, threads)
+        ) as pool:
+            pending = {pool.submit(_run_shard, s, self.bars_dir, self.shard_dir): s for s in todo}
+            try:
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        shard = pending.pop(fut)
+                        try:
+                            fut.result()
+                        except Exception as e:
+                            failed[shard.key] = repr(e)
+                            log.error("Shard %s failed: %s", shard.key, e)
+                    log.info("%d/%d shards left", len(pending), len(todo))
+            except KeyboardInterrupt:
+                log.warning("Interrupted – finished shards are kept, rerun to resume")
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+        return failed
+
+    def merge(self) -> Dict[str, pd.DataFrame]:
+        """Consolidate shard files into trades.pkl, equity.pkl and a per-symbol summary.csv."""
+        def _cat(name: str) -> pd.DataFrame:
+            files = sorted(self.shard_dir.glob(f"*.{name}.pkl"))
+            return pd.concat([pd.read_pickle(f) for f in files], ignore_index=True) if files else pd.DataFrame()
+
+        trades = _cat("trades")
+        if not trades.empty:
+            trades = trades.sort_values(["ts", "symbol"], kind="stable").reset_index(drop=True)
+        equity = _cat("equity")
+        if not equity.empty:
+            equity = equity.sort_values(["symbol", "date"], kind="stable").reset_index(drop=True)
+            equity["equity"] = equity.groupby("symbol")["pnl"].cumsum()
+        summary = analytics.by_symbol(equity) if not equity.empty else pd.DataFrame()
+        if not trades.empty:
+            summary = summary.join(analytics.trade_report(trades), how="outer")
+        trades.to_pickle(self.out_dir / "trades.pkl")
+        equity.to_pickle(self.out_dir / "equity.pkl")
+        summary.to_csv(self.out_dir / "summary.csv")
+        log.info("Merged %d trades, %d equity rows -> %s", len(trades), len(equity), self.out_dir)
+        return {"trades": trades, "equity": equity, "summary": summary}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", nargs="+", default=cfg["symbols"]["stocks"])
+    parser.add_argument("--symbols_file", type=Path, help="one symbol per line")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--period", default="MS", help="pandas offset alias per shard")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    symbols = args.symbols_file.read_text().split() if args.symbols_file else args.symbols
+    orch = BacktestOrchestrator(out_dir=args.out, workers=args.workers)
+    failed = orch.run(make_shards(symbols, args.start, args.end, args.period))
+    if failed:
+        log.error("%d shards failed – rerun to retry: %s", len(failed), sorted(failed))
+    orch.merge()
+
+
+if __name__ == "__main__":
+    main()
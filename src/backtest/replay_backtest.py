@@ -2,7 +2,7 @@
 """
 Offline back-test that runs the **full live-trading stack**:
 PNG → Kimi → Impact → Micro-price → Risk-guard → Trade → PnL
-(LOB & sentiment mocked; Kimi stubbed for speed)
+(LOB & sentiment mocked; Kimi answers served from the record/replay cache)
 """
 
 import argparse
@@ -16,10 +16,12 @@ from tqdm import tqdm
 # 1)  Remove every "src." prefix
 from agents.sentiment_agent import SentimentAgent
 from agents.technical_agent import TechnicalAgent
-from brain import Decision, KimiDecisionMaker
+from brain import Decision
+from brain_cache import MODES, CachedDecisionMaker
 from data_ingestion.candle_builder import CandleBuilder
 from execution.impact_model import ImpactEstimate, ImpactModel
 from execution.micro_price import MicroPriceEngine, SizedOrder
+from performance import analytics
 from performance.pnl_tracker import PnLTracker      # ← no more src.performance
 from risk.portfolio_risk import PortfolioRisk       # ← no more src.risk
 from risk.reg_t_guard import RegTGuard              # ← no more src.risk
@@ -38,10 +40,10 @@ class LiveStackReplay:
     but offline on historical bars.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, llm_mode: str = "record") -> None:
         self.symbol = "INTC"
         self.technical = TechnicalAgent()
-        self.brain = KimiDecisionMaker(cfg["model"])
+        self.brain = CachedDecisionMaker(cfg["model"], mode=llm_mode)
         self.sentiment = SentimentAgent(cfg["model"]["kimi_key"])  # stub for API
         self.impact = ImpactModel(
             gamma=cfg["impact"]["gamma"], eta=cfg["impact"]["eta"]
@@ -51,7 +53,7 @@ class LiveStackReplay:
         self.reg_t = RegTGuard(None)          # Reg-T stub
 
         # running state
-        self.position = {"qty": 0, "avg_price": 0.0, "real_pnl": 0.0}
+        self.position = {"qty": 0, "avg_price": 0.0, "unreal_pnl": 0.0, "real_pnl": 0.0}
         self.trades: list[dict] = []
 
     # ---------- helpers ----------
@@ -81,11 +83,7 @@ class LiveStackReplay:
         log.info("Loaded %d bars", len(df))
 
         builder = CandleBuilder()
-        for idx, (ts, row) in enumerate(tqdm(df.iterrows(), total=len(df))):
-            # skip every 2nd bar to speed up
-            if idx % 2:
-                continue
-
+        for ts, row in tqdm(df.iterrows(), total=len(df)):
             lookback = df.loc[:ts].tail(60)
             if len(lookback) < 20:
                 continue
@@ -128,10 +126,13 @@ class LiveStackReplay:
             # 6) impact & micro-price check
             mid = float(row["close"])
             lob = self._mock_lob(mid)
-            impact: ImpactEstimate = self.impact.estimate(sized.qty, sized.action, lob)
-            if impact.slippage_bps > cfg["impact"]["max_slippage_bps"]:
+            best_qty = self.impact.max_qty(sized.action, lob, cfg["impact"]["max_slippage_bps"],
+                                           cfg["impact"].get("max_cost_bps"), upper=sized.qty)
+            if best_qty == 0:
                 log.debug("Skip – slippage too high")
                 continue
+            sized = sized.copy(update={"qty": best_qty})
+            impact: ImpactEstimate = self.impact.estimate(sized.qty, sized.action, lob)
 
             micro = self.micro.compute(lob, sized.qty)
             if micro.cost_bps > cfg["micro"]["max_cost_bps"]:
@@ -166,8 +167,8 @@ class LiveStackReplay:
                     "fill_px": fill_px,
                     "qty_after": self.position["qty"],
                     "real_pnl": self.position["real_pnl"],
-                    "stop": decision.stop,
-                    "take": decision.take,
+                    "stop": decision.stop_loss,
+                    "take": decision.take_profit,
                     "reasoning": decision.reasoning,
                     "slippage_bps": impact.slippage_bps,
                 }
@@ -181,10 +182,17 @@ class LiveStackReplay:
             log.warning("No trades")
             return
         realized = trades["real_pnl"].iloc[-1] if not trades.empty else 0
+        closed = trades["real_pnl"].diff().fillna(trades["real_pnl"]).to_numpy()
+        slip = analytics.slippage_stats(trades["slippage_bps"])
         log.info("=" * 60)
         log.info("BACK-TEST SUMMARY")
         log.info("Trades      : %d", len(trades))
         log.info("Realized PnL: %.4f pts", realized)
+        log.info("Hit rate    : %.1f%% of %d closing trades", 100 * analytics.hit_rate(closed), int((closed != 0).sum()))
+        log.info("Turnover    : %d shares", int(trades["qty_after"].diff().fillna(trades["qty_after"]).abs().sum()))
+        log.info("Slippage bps: mean %.2f  p50 %.2f  p95 %.2f  max %.2f",
+                 slip["mean"], slip["p50"], slip["p95"], slip["max"])
+        log.info("LLM cache   : %d hits / %d misses (%s)", self.brain.hits, self.brain.misses, self.brain.mode)
         log.info("=" * 60)
 
 
@@ -192,6 +200,9 @@ class LiveStackReplay:
 async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--file", default="data/replay/INTC_1m.csv")
+    parser.add_argument("--llm_cache", choices=MODES, default="record",
+                        help="record: call Kimi on miss and store; replay: cache only; "
+                             "replay-or-stub: HOLD on miss")
     args = parser.parse_args()
 
     csv_path = Path(__file__).parents[2] / args.file
@@ -200,7 +211,7 @@ async def main():
         return
 
     df = pd.read_csv(csv_path, parse_dates=["timestamp"])
-    bt = LiveStackReplay()
+    bt = LiveStackReplay(llm_mode=args.llm_cache)
     trades = await bt.run(df)
     bt.summary(trades)
 
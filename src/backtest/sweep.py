@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Precompute-once, sweep-many parameter search.
+
+The expensive per-bar work – chart rendering + ViT logits for every window,
+the close-price windows and the order-book features – is computed once per
+bar set and cached under <sweep.dir>. Every gating / sizing combination
+(min_logit_gap, EMA lengths, impact gamma/eta, max_slippage_bps,
+micro max_cost_bps, hard_stop_pct) is then a handful of array ops over
+those artifacts, fanned out over a process pool. Output is a ranked table.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from agents.technical_agent import HOLD, BUY, TechnicalAgent
+from performance import analytics
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("SWEEP")
+
+SWEEP_CFG = cfg.get("sweep", {})
+SWEEP_DIR = Path(SWEEP_CFG.get("dir", "./data/sweep"))
+
+# defaults = live config, so a one-point grid reproduces the live gates
+DEFAULTS: Dict[str, float] = {
+    "min_logit_gap": cfg["model"].get("min_logit_gap", 0.25),
+    "ema_fast": 5,
+    "ema_slow": 20,
+    "gamma": cfg["impact"]["gamma"],
+    "eta": cfg["impact"]["eta"],
+    "max_slippage_bps": cfg["impact"]["max_slippage_bps"],
+    "max_cost_bps": cfg["micro"]["max_cost_bps"],
+    "hard_stop_pct": cfg["risk"]["hard_stop_pct"],
+}
+ADVERSE_ALPHA: float = cfg["micro"]["adverse_alpha"]
+ROUTE_DEPTH_FRAC: float = cfg.get("algos", {}).get("route_depth_frac", 0.5)
+CHILD_DEPTH_FRAC: float = cfg.get("algos", {}).get("max_child_depth_frac", 0.25)
+
+
+@dataclass
+class Artifacts:
+    """Per-window inputs to the gates; row i is the window ending at bar ts[i]."""
+    ts: np.ndarray        # (N,) datetime64
+    close: np.ndarray     # (N, lookback) close windows
+    logits: np.ndarray    # (N, 3) ViT logits
+    bid_px: np.ndarray    # (N, L) best first
+    bid_sz: np.ndarray
+    ask_px: np.ndarray
+    ask_sz: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, **{f.name: getattr(self, f.name) for f in fields(self)})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Artifacts":
+        with np.load(path) as z:
+            return cls(**{f.name: z[f.name] for f in fields(cls)})
+
+
+def fake_books(mid: np.ndarray, levels: int = 5, tick: float = 0.01, size: int = 100) -> np.ndarray:
+    """(N, levels, 4) [bid_px, bid_sz, ask_px, ask_sz] – vectorised backtest.engine.FakeLob."""
+    step = tick * np.arange(1, levels + 1)
+    out = np.empty((len(mid), levels, 4))
+    out[..., 0] = mid[:, None] - step
+    out[..., 1] = size
+    out[..., 2] = mid[:, None] + step
+    out[..., 3] = size
+    return out
+
+
+def param_grid(grid: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """Cartesian product over `grid`; unspecified parameters take DEFAULTS."""
+    unknown = set(grid) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown sweep parameters: {sorted(unknown)}")
+    keys = list(grid)
+    combos = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        p = {**DEFAULTS, **dict(zip(keys, values))}
+        if p["ema_fast"] < p["ema_slow"]:
+            combos.append(p)
+    return combos
+
+
+# ---------------- vectorised evaluation ----------------
+def _walk_cost(px: np.ndarray, sz: np.ndarray, qty, gamma: float, eta: float):
+    """ImpactModel.estimate for every row (qty scalar or per row): (|slippage_bps|, cost per share incl. impact)."""
+    cum = np.cumsum(sz, axis=1)
+    idx = np.minimum((cum < np.asarray(qty)[..., None]).sum(axis=1), px.shape[1] - 1)
+    rows = np.arange(len(px))
+    best = px[:, 0]
+    slip = np.abs(px[rows, idx] - best)
+    impact = (gamma + eta) * qty / cum[:, -1]
+    return 1e4 * slip / best, slip + impact
+
+
+def _size(px: np.ndarray, sz: np.ndarray, qty: int, max_slippage_bps: float) -> np.ndarray:
+    """
+    Supervisor sizing per row: a parent SmartRouter would slice (ALGO) keeps qty,
+    anything sent whole is cut to ImpactModel.max_qty under the slippage budget.
+    """
+    cum = np.cumsum(sz, axis=1)
+    fits = 1e4 * np.abs(px - px[:, :1]) / px[:, :1] <= max_slippage_bps + 1e-9
+    n_ok = np.cumprod(fits, axis=1).sum(axis=1)        # leading levels inside the budget
+    capped = np.minimum(qty, cum[np.arange(len(px)), np.maximum(n_ok - 1, 0)])
+    capped = np.where(n_ok == px.shape[1], qty, np.where(n_ok == 0, 0, capped))
+    return np.where(qty > ROUTE_DEPTH_FRAC * cum[:, -1], qty, capped)
+
+
+def _exec_cost(px: np.ndarray, sz: np.ndarray, traded: np.ndarray, gamma: float, eta: float) -> np.ndarray:
+    """Cost per share of `traded` shares: one walk, or child-sized walks once it is sliced."""
+    depth = sz.sum(axis=1)
+    child = np.maximum(1, np.floor(CHILD_DEPTH_FRAC * depth))
+    walk = np.where(traded > ROUTE_DEPTH_FRAC * depth, np.minimum(traded, child), traded)
+    return _walk_cost(px, sz, walk, gamma, eta)[1]
+
+
+def evaluate(art: Artifacts, p: Dict[str, float], qty: int = 100, _ta_cache: Dict | None = None) -> Dict[str, float]:
+    """Replay the live gate chain + a hard stop for one parameter set."""
+    key = (int(p["ema_fast"]), int(p["ema_slow"]))
+    if _ta_cache is not None and key in _ta_cache:
+        ta = _ta_cache[key]
+    else:
+        ta = TechnicalAgent.ta_signal_windows(art.close, *key)
+        if _ta_cache is not None:
+            _ta_cache[key] = ta
+    action, _ = TechnicalAgent.decide_batch(art.logits, ta, p["min_logit_gap"])
+
+    # sizing + adverse-selection gate (supervisor step 5)
+    size = np.where(action == BUY, _size(art.ask_px, art.ask_sz, qty, p["max_slippage_bps"]),
+                    _size(art.bid_px, art.bid_sz, qty, p["max_slippage_bps"]))
+    bid_vol, ask_vol = art.bid_sz.sum(axis=1), art.ask_sz.sum(axis=1)
+    micro_bps = ADVERSE_ALPHA * np.abs((bid_vol - ask_vol) / (bid_vol + ask_vol + 1e-9))
+    signal = (action != HOLD) & (size > 0) & (micro_bps <= p["max_cost_bps"])
+
+    # every accepted signal opens a leg (±size) that runs until the next one or its hard stop
+    close = art.close[:, -1]
+    seg = np.cumsum(signal)
+    starts = np.flatnonzero(signal)
+    side = np.zeros(len(close))
+    ref = np.ones(len(close))
+    lot = np.zeros(len(close))
+    if len(starts):
+        leg = np.maximum(seg - 1, 0)
+        side = np.where(seg > 0, np.where(action[starts] == BUY, 1.0, -1.0)[leg], 0.0)
+        ref = close[starts][leg]
+        lot = size[starts][leg]
+    hits = np.cumsum((side != 0) & (side * (close / ref - 1.0) <= -p["hard_stop_pct"]))
+    # stop hits since the leg opened
+    base = np.concatenate(([0], np.concatenate(([0], hits))[starts]))[seg]
+    stopped = hits - base > 0
+    pos = lot * side * ~stopped
+
+    dpos = np.diff(pos, prepend=0.0)
+    traded = np.abs(dpos)
+    costs = traded * np.where(dpos > 0, _exec_cost(art.ask_px, art.ask_sz, traded, p["gamma"], p["eta"]),
+                              _exec_cost(art.bid_px, art.bid_sz, traded, p["gamma"], p["eta"]))
+    pnl = np.concatenate(([0.0], pos[:-1] * np.diff(close))) - costs
+
+    return {
+        **p,
+        "signals": int(signal.sum()),
+        "stops": int((np.diff(stopped.astype(np.int8), prepend=0) > 0).sum()),
+        "cost": float(costs.sum()),
+        **analytics.summarize(pnl, pos),
+    }
+
+
+# ---------------- process-pool worker ----------------
+_art: Artifacts | None = None
+
+
+def _init_worker(art: Artifacts) -> None:
+    global _art
+    _art = art
+
+
+def _eval_chunk(params: List[Dict[str, float]], qty: int) -> List[Dict[str, float]]:
+    cache: Dict = {}
+    return [evaluate(_art, p, qty, cache) for p in params]
+
+
+class SweepEngine:
+    def __init__(self, lookback: int = 60, qty: int = 100, workers: int | None = None, cache_dir: Path = SWEEP_DIR):
+        self.lookback = lookback
+        self.qty = qty
+        self.workers = workers or os.cpu_count()
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _cache_path(self, symbol: str, bars: pd.DataFrame) -> Path:
+        h = hashlib.sha256(bars.index.asi8.tobytes())
+        h.update(np.ascontiguousarray(bars["close"].to_numpy(np.float64)).tobytes())
+        return self.cache_dir / f"{symbol}_{self.lookback}_{h.hexdigest()[:12]}.npz"
+
+    def precompute(self, symbol: str, bars: pd.DataFrame, books: np.ndarray | None = None) -> Artifacts:
+        """
+        Logits for every window (not just TA-active ones – the EMA lengths are
+        swept too) + book features. `books` is (n_bars, L, 4) in synthetic
+        make_lob column order; defaults to the FakeLob ladder around close.
+        """
+        bars = bars.sort_index()
+        path = self._cache_path(symbol, bars)
+        if path.exists():
+            log.info("Artifacts cache hit %s", path.name)
+            return Artifacts.load(path)
+
+        from backtest.engine import BackTestEngine
+
+        engine = BackTestEngine(symbol, self.lookback, self.qty, workers=self.workers)
+        win = engine.windows(bars)
+        log.info("Precomputing %d windows for %s", len(win), symbol)
+        logits = engine.logits(bars, win, np.ones(len(win), dtype=bool))
+        if books is None:
+            books = fake_books(bars["close"].to_numpy(np.float64))
+        books = books[self.lookback - 1:]
+        art = Artifacts(
+            ts=bars.index.to_numpy()[self.lookback - 1:],
+            close=np.ascontiguousarray(win[..., 3]),
+            logits=logits,
+            bid_px=books[..., 0], bid_sz=books[..., 1],
+            ask_px=books[..., 2], ask_sz=books[..., 3],
+        )
+        art.save(path)
+        return art
+
+    def sweep(self, art: Artifacts, grid: Dict[str, Sequence[float]], rank_by: str = "sharpe") -> pd.DataFrame:
+        combos = param_grid(grid)
+        # keep equal EMA pairs together so each worker computes their TA signal once
+        combos.sort(key=lambda p: (p["ema_fast"], p["ema_slow"]))
+        n_chunks = min(len(combos), self.workers * 4) or 1
+        chunks = [c.tolist() for c in np.array_split(np.array(combos, dtype=object), n_chunks)]
+        log.info("Sweeping %d combinations over %d windows on %d workers", len(combos), len(art), self.workers)
+
+        if self.workers <= 1:
+            _init_worker(art)
+            rows = [r for ch in chunks for r in _eval_chunk(ch, self.qty)]
+        else:
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(art,)) as pool:
+                rows = [r for res in pool.map(_eval_chunk, chunks, itertools.repeat(self.qty)) for r in res]
+        out = pd.DataFrame(rows)
+        return out.sort_values(rank_by, ascending=False, kind="stable").reset_index(drop=True)
+
+
+def main() -> None:
+    from backtest.orchestrator import BARS_DIR, load_bars
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbol", default=cfg["symbols"]["stocks"][0])
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--grid", type=Path, help="JSON {param: [values]}; default sweep.grid in config")
+    parser.add_argument("--workers", type=int, default=SWEEP_CFG.get("workers"))
+    parser.add_argument("--rank_by", default=SWEEP_CFG.get("rank_by", "sharpe"))
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    bars = load_bars(args.symbol, BARS_DIR).loc[args.start: args.end]
+    grid: Dict[str, Iterable[float]] = json.loads(args.grid.read_text()) if args.grid else SWEEP_CFG.get("grid", {})
+
+    engine = SweepEngine(workers=args.workers)
+    res = engine.sweep(engine.precompute(args.symbol, bars), grid, args.rank_by)
+    out = engine.cache_dir / f"{args.symbol}_results.csv"
+    res.to_csv(out, index=False)
+    log.info("%d results -> %s", len(res), out)
+    print(res.head(args.top).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Micro-benchmark harness: latency percentiles, allocations, throughput,
+a JSON-lines history and a regression gate against recent runs.
+
+A case is a setup function registered with @bench; setup builds whatever
+state it needs and returns the callable to time (sync or async), or a
+(callable, cleanup) pair. Setup failing (missing weights, optional deps)
+marks the case skipped rather than failing the suite.
+"""
+import asyncio
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("BENCH")
+
+BENCH_CFG = cfg.get("bench", {})
+HISTORY = Path(BENCH_CFG.get("history", "./data/bench/history.jsonl"))
+NOISE_FLOOR = 1.0   # µs / KB – baselines below this are too small to gate on
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Any]
+    number: int = 200       # timed calls
+    warmup: int = 10
+    alloc_calls: int = 20   # calls traced by tracemalloc (separate pass – it slows timing)
+
+
+CASES: Dict[str, Case] = {}
+
+
+def bench(name: str, number: int = 200, warmup: int = 10, alloc_calls: int = 20):
+    def deco(setup: Callable[[], Any]) -> Callable[[], Any]:
+        CASES[name] = Case(name, setup, number, warmup, alloc_calls)
+        return setup
+    return deco
+
+
+# ---------------- measurement ----------------
+def _stats(ns: List[int], peaks: List[int], retained: int) -> Dict[str, float]:
+    us = np.asarray(ns, dtype=np.float64) / 1e3
+    p50, p90, p99 = np.percentile(us, [50, 90, 99])
+    return {
+        "n": len(us),
+        "mean_us": float(us.mean()),
+        "p50_us": float(p50),
+        "p90_us": float(p90),
+        "p99_us": float(p99),
+        "ops_per_s": float(1e6 / us.mean()) if us.mean() > 0 else 0.0,
+        "alloc_peak_kb": float(np.mean(peaks) / 1024) if peaks else 0.0,
+        "retained_kb": retained / 1024,
+    }
+
+
+def _split(made: Any):
+    return made if isinstance(made, tuple) else (made, None)
+
+
+def _run_sync(case: Case, fn: Callable[[], Any]) -> Dict[str, float]:
+    for _ in range(case.warmup):
+        fn()
+    ns = []
+    for _ in range(case.number):
+        t0 = time.perf_counter_ns()
+        fn()
+        ns.append(time.perf_counter_ns() - t0)
+    peaks = []
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        for _ in range(case.alloc_calls):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    return _stats(ns, peaks, retained)
+
+
+async def _run_async(case: Case) -> Dict[str, float]:
+    made = case.setup()
+    fn, cleanup = _split(await made if asyncio.iscoroutine(made) else made)
+    try:
+        for _ in range(case.warmup):
+            await fn()
+        ns = []
+        for _ in range(case.number):
+            t0 = time.perf_counter_ns()
+            await fn()
+            ns.append(time.perf_counter_ns() - t0)
+        peaks = []
+        tracemalloc.start()
+        try:
+            start, _ = tracemalloc.get_traced_memory()
+            for _ in range(case.alloc_calls):
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                await fn()
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+            retained = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+        return _stats(ns, peaks, retained)
+    finally:
+        if cleanup is not None:
+            res = cleanup()
+            if asyncio.iscoroutine(res):
+                await res
+
+
+def run_case(case: Case, scale: float = 1.0) -> Dict[str, Any]:
+    case = Case(case.name, case.setup, max(5, int(case.number * scale)), case.warmup,
+                max(2, int(case.alloc_calls * scale)))
+    try:
+        if asyncio.iscoroutinefunction(case.setup):
+            return asyncio.run(_run_async(case))
+        made = case.setup()
+        fn, cleanup = _split(made)
+        if asyncio.iscoroutinefunction(fn):
+            async def _setup():
+                return made
+            return asyncio.run(_run_async(Case(case.name, _setup, case.number, case.warmup, case.alloc_calls)))
+        try:
+            return _run_sync(case, fn)
+        finally:
+            if cleanup is not None:
+                cleanup()
+    except Exception as e:
+        log.warning("Bench %s skipped: %s", case.name, e)
+        return {"skipped": f"{type(e).__name__}: {e}"}
+
+
+# ---------------- history + gate ----------------
+def _machine() -> str:
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}"
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def load_history(path: Path = HISTORY) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record(results: Dict[str, Dict[str, Any]], path: Path = HISTORY) -> Dict[str, Any]:
+    row = {"ts": dt.datetime.utcnow().isoformat(), "git": _git_rev(), "machine": _machine(), "results": results}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        f.write(json.dumps(row) + "\n")
+    return row
+
+
+def baseline(history: List[Dict[str, Any]], window: int = BENCH_CFG.get("window", 5)) -> Dict[str, Dict[str, float]]:
+    """Per-case median of each metric over the last `window` runs on this machine."""
+    runs = [h["results"] for h in history if h.get("machine") == _machine()][-window:]
+    out: Dict[str, Dict[str, float]] = {}
+    for name in {n for r in runs for n in r}:
+        rows = [r[name] for r in runs if name in r and "skipped" not in r[name]]
+        if rows:
+            out[name] = {k: float(np.median([r[k] for r in rows])) for k in ("p50_us", "p99_us", "alloc_peak_kb")}
+    return out
+
+
+def regressions(
+    results: Dict[str, Dict[str, Any]],
+    base: Dict[str, Dict[str, float]],
+    thresholds: Dict[str, float] | None = None,
+) -> List[str]:
+    """Human-readable list of metrics worse than baseline × (1 + threshold)."""
+    thresholds = thresholds or {
+        "p50_us": BENCH_CFG.get("p50_threshold", 0.15),
+        "p99_us": BENCH_CFG.get("p99_threshold", 0.50),
+        "alloc_peak_kb": BENCH_CFG.get("alloc_threshold", 0.25),
+    }
+    bad = []
+    for name, res in sorted(results.items()):
+        if "skipped" in res or name not in base:
+            continue
+        for metric, thr in thresholds.items():
+            ref = base[name].get(metric, 0.0)
+            if ref > NOISE_FLOOR and res[metric] > ref * (1 + thr):
+                bad.append(f"{name}.{metric}: {res[metric]:.1f} vs baseline {ref:.1f} (+{res[metric] / ref - 1:.0%} > {thr:.0%})")
+    return bad
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for every hot path on the tick → order route.
+
+  python -m benchmarks.hot_paths                 # run all, append to history, gate
+  python -m benchmarks.hot_paths --only router   # substring filter
+  python -m benchmarks.hot_paths --quick --no-record
+
+Exit status 1 when any case regresses past the `bench:` thresholds against
+the median of the last `bench.window` runs on this machine.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import List
+
+import numpy as np
+import pandas as pd
+from ib_insync import Stock, Ticker
+
+from benchmarks.harness import CASES, baseline, bench, load_history, record, regressions, run_case
+from data_ingestion.lob_stream import LobTick
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("BENCH")
+
+CONTRACT = Stock(cfg["symbols"]["stocks"][0], "SMART", "USD")
+
+
+# ---------------- fixtures ----------------
+def lob_tick(mid: float = 100.0, depth: int = 5, size: int = 300, tick: float = 0.01) -> LobTick:
+    bid = [(round(mid - tick * k, 2), size * k) for k in range(1, depth + 1)]
+    ask = [(round(mid + tick * k, 2), size * k) for k in range(1, depth + 1)]
+    return LobTick(CONTRACT, bid, ask, 0.0, 0)
+
+
+def ohlc(n: int = 60, mid: float = 100.0, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    c = mid * np.exp(np.cumsum(rng.normal(0, 5e-4, n)))
+    o = np.concatenate(([mid], c[:-1]))
+    idx = pd.date_range("2024-01-02 09:30", periods=n, freq="1min")
+    return pd.DataFrame({"open": o, "high": np.maximum(o, c) + 0.01,
+                         "low": np.minimum(o, c) - 0.01, "close": c}, index=idx)
+
+
+def chart_png() -> bytes:
+    from data_ingestion.candle_builder import CandleBuilder
+
+    return CandleBuilder(lookback=60).render_png(ohlc())
+
+
+# ---------------- candles ----------------
+@bench("candle.add_tick", number=5000, warmup=100, alloc_calls=200)
+def _add_tick():
+    from data_ingestion.candle_builder import CandleBuilder
+
+    builder = CandleBuilder()
+    tick = Ticker(contract=CONTRACT, last=100.0, volume=10.0)
+    return lambda: builder.add_tick(CONTRACT, tick)
+
+
+@bench("candle.to_df", number=100, warmup=5)
+def _to_df():
+    from data_ingestion.candle_builder import CandleBuilder
+    from utils.clock import SimClock, set_clock
+
+    # full tick buffer (10k ticks ≈ 2.8 h at 1 tick/s), timestamps from a sim clock
+    builder = CandleBuilder()
+    clock = SimClock(pd.Timestamp("2024-01-02 09:30").timestamp())
+    rng = np.random.default_rng(0)
+
+    async def fill():
+        for px in 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, builder._ticks.maxlen))):
+            builder.add_tick(CONTRACT, Ticker(contract=CONTRACT, last=float(px), volume=10.0))
+            await clock.advance(1.0)
+
+    prev = set_clock(clock)
+    try:
+        asyncio.run(fill())
+    finally:
+        set_clock(prev)
+    return builder.to_df
+
+
+@bench("candle.render_png", number=20, warmup=2, alloc_calls=3)
+def _render_png():
+    import matplotlib
+    matplotlib.use("Agg")
+    from data_ingestion.candle_builder import CandleBuilder
+
+    builder = CandleBuilder(lookback=60)
+    df = ohlc()
+    return lambda: builder.render_png(df)
+
+
+# ---------------- encoders ----------------
+@bench("encoder.vit", number=20, warmup=2, alloc_calls=3)
+def _vit():
+    from encoders.vit_encoder import ViTChartEncoder
+
+    enc = ViTChartEncoder()
+    png = chart_png()
+    return lambda: enc.encode(png)
+
+
+@bench("encoder.multimodal", number=10, warmup=1, alloc_calls=2)
+def _multimodal():
+    from encoders.multimodal import MultiModalEncoder
+
+    enc = MultiModalEncoder(latent_dim=cfg["model"].get("latent_dim", 512)).eval()
+    png, lob = chart_png(), lob_tick()
+    return lambda: enc.encode_live(png, lob, "Fed holds rates steady")
+
+
+# ---------------- execution ----------------
+@bench("impact.estimate", number=5000, warmup=100, alloc_calls=200)
+def _impact():
+    from execution.impact_model import ImpactModel
+
+    model = ImpactModel(gamma=cfg["impact"]["gamma"], eta=cfg["impact"]["eta"])
+    lob = lob_tick()
+    return lambda: model.estimate(1200, "BUY", lob)
+
+
+@bench("impact.max_qty", number=5000, warmup=100, alloc_calls=200)
+def _impact_max_qty():
+    from execution.impact_model import ImpactModel
+
+    model = ImpactModel(gamma=cfg["impact"]["gamma"], eta=cfg["impact"]["eta"])
+    lob = lob_tick()
+    return lambda: model.max_qty("BUY", lob, cfg["impact"]["max_slippage_bps"], upper=5000)
+
+
+@bench("micro_price.compute", number=5000, warmup=100, alloc_calls=200)
+def _micro():
+    from execution.micro_price import MicroPriceEngine
+
+    engine = MicroPriceEngine()
+    lob = lob_tick()
+    return lambda: engine.compute(lob, 500)
+
+
+@bench("fill_model.predict", number=5000, warmup=100, alloc_calls=200)
+def _fill_predict():
+    from execution.fill_model import FillModel
+
+    model = FillModel("BENCH", min_samples=0, snapshot_every=10**9)
+    return lambda: model.predict(200, 900, 1500)
+
+
+@bench("fill_model.update", number=5000, warmup=100, alloc_calls=200)
+def _fill_update():
+    from execution.fill_model import FillModel
+
+    model = FillModel("BENCH", snapshot_every=10**9)
+    return lambda: model.update(200, 900, 1500, True)
+
+
+@bench("router.route", number=5000, warmup=100, alloc_calls=200)
+def _router():
+    from execution.smart_router import SmartRouter
+
+    router = SmartRouter(cfg["risk"].get("venue_fees", {"SMART": 0.3}))
+    lob = lob_tick()
+    return lambda: router.route(lob, "BUY", 100)
+
+
+# ---------------- risk ----------------
+@bench("risk.size_order", number=5000, warmup=100, alloc_calls=200)
+def _size_order():
+    from execution.risk import RiskManager
+
+    rm = RiskManager(cfg["risk"])
+    return lambda: rm.size_order(100_000.0, 100.0, 0.2)
+
+
+@bench("portfolio_risk.snapshot", number=200, warmup=10)
+def _portfolio_risk():
+    from execution.fake_ib import FakeIB, _Book
+    from risk.portfolio_risk import PortfolioRisk
+
+    ib = FakeIB()
+    for i, sym in enumerate(["AAPL", "MSFT", "JPM", "XOM", "INTC"]):
+        c = Stock(sym, "SMART", "USD")
+        ib.quote(c, 0.0, 100.0 + 10 * i)
+        ib.book[sym] = _Book(qty=100 * (i + 1) * (-1) ** i, avg=100.0 + 10 * i, contract=c)
+    return PortfolioRisk(ib).snapshot
+
+
+@bench("flatten.200_positions", number=20, warmup=2, alloc_calls=3)
+async def _flatten_200():
+    """Flattener on a 200-position book, confirmed flat – includes FakeIB's 200-symbol quote feed."""
+    from execution.fake_ib import FakeIB, _Book
+    from execution.flatten import Flattener
+    from execution.order_manager import OrderManager
+
+    ib = FakeIB(latency_ms=0.0)
+    contracts = [Stock(f"F{i:03d}", "SMART", "USD") for i in range(200)]
+    flattener = Flattener(ib, OrderManager(ib))
+    ts = [0.0]
+
+    def quote_all():
+        ts[0] += 1.0
+        for i, c in enumerate(contracts):
+            ib.quote(c, ts[0], 50.0 + i)
+
+    async def run():
+        for i, c in enumerate(contracts):
+            ib.book[c.symbol] = _Book(qty=100 * (-1) ** i, avg=50.0 + i, contract=c)
+        quote_all()
+        task = asyncio.create_task(flattener.run())
+        while not task.done():
+            await asyncio.sleep(0)   # orders go out; then the feed fills them
+            quote_all()
+        if not (await task).complete:
+            raise RuntimeError("flatten left positions open")
+    return run
+
+
+# ---------------- prime session ----------------
+async def zero_latency_stubs():
+    """Every HTTP dependency on a zero-latency local stub; returns the cleanup coroutine function."""
+    from services.stub_servers import SERVICES, Profile, StubServer
+
+    srv = await StubServer(port=0, profiles={s: Profile(median_ms=0.0, sigma=0.0) for s in SERVICES},
+                           seed=0).start()
+    prev = os.environ.get("TRADER_STUBS")
+    os.environ["TRADER_STUBS"] = f"{srv.host}:{srv.port}"   # before any client reads its URL
+
+    async def cleanup():
+        await srv.stop()
+        if prev is None:
+            os.environ.pop("TRADER_STUBS", None)
+        else:
+            os.environ["TRADER_STUBS"] = prev
+    return cleanup
+
+
+@bench("prime.send_order", number=200, warmup=10)
+async def _prime_one():
+    from ib_insync import MarketOrder
+
+    from execution.prime_connector import PrimeConnector
+
+    cleanup = await zero_latency_stubs()
+    prime = PrimeConnector()
+    order = MarketOrder("BUY", 100)
+
+    async def done():
+        await prime.close()
+        await cleanup()
+    return lambda: prime.send_order(order, CONTRACT), done
+
+
+@bench("prime.batch_50", number=50, warmup=5)
+async def _prime_batch():
+    """50 exits ready at once (flatten_all): one pipelined session vs 50 round-trips above."""
+    from ib_insync import MarketOrder
+
+    from execution.prime_connector import PrimeConnector
+
+    cleanup = await zero_latency_stubs()
+    prime = PrimeConnector()
+    orders = [MarketOrder("SELL", 10 + i) for i in range(50)]
+
+    async def run():
+        await asyncio.gather(*(prime.submit(o, CONTRACT) for o in orders))
+
+    async def done():
+        await prime.close()
+        await cleanup()
+    return run, done
+
+
+# ---------------- end to end ----------------
+@bench("supervisor.on_candle", number=20, warmup=2, alloc_calls=3)
+async def _supervisor():
+    """Full on_candle against FakeIB with every HTTP dependency on zero-latency stubs."""
+    from execution.fake_ib import FakeIB
+    from services.latency_harness import LatencyHarness
+
+    cleanup = await zero_latency_stubs()
+    try:
+        harness = LatencyHarness(FakeIB(latency_ms=0.0, md_latency_ms=0.0), CONTRACT)
+        stage = harness.supervisor_stage()
+    except BaseException:
+        await cleanup()
+        raise
+
+    async def run():
+        harness.tick()
+        seen = len(harness.ib.order_log)
+        await stage(0)
+        if len(harness.ib.order_log) > seen:
+            await harness.flatten()
+    return run, cleanup
+
+
+# ---------------- CLI ----------------
+def _table(results) -> str:
+    lines = [f"{'case':26s} {'p50 µs':>10s} {'p99 µs':>10s} {'ops/s':>10s} {'peak KB':>9s}"]
+    for name, r in results.items():
+        if "skipped" in r:
+            lines.append(f"{name:26s} skipped – {r['skipped'][:60]}")
+        else:
+            lines.append(f"{name:26s} {r['p50_us']:10.1f} {r['p99_us']:10.1f} "
+                         f"{r['ops_per_s']:10.0f} {r['alloc_peak_kb']:9.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", action="append", default=[], help="run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="10 %% of the iterations (smoke run, not recorded)")
+    parser.add_argument("--no-record", action="store_true", help="don't append to the history")
+    parser.add_argument("--no-gate", action="store_true", help="report regressions but exit 0")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args(argv)
+
+    cases = [c for n, c in CASES.items() if not args.only or any(o in n for o in args.only)]
+    scale = 0.1 if args.quick else 1.0
+    results = {}
+    for case in cases:
+        log.info("Running %s", case.name)
+        results[case.name] = run_case(case, scale)
+
+    print(json.dumps(results, indent=2) if args.json else _table(results))
+
+    bad = regressions(results, baseline(load_history()))
+    for line in bad:
+        log.error("REGRESSION %s", line)
+    if not (args.quick or args.no_record):
+        record(results)
+    return 1 if bad and not args.no_gate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
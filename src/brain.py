@@ -8,11 +8,12 @@ import base64
 import os
 from typing import Any, Dict
 
-import httpx
 from pydantic import BaseModel, Field
 
 from agents.technical_agent import TechnicalAgent
 from utils.config import load_config
+from utils.endpoints import endpoint
+from utils.http_clients import http_client
 from performance.pnl_tracker import PnLTracker          # for NAV
 from risk.portfolio_risk import PortfolioRisk            # for VAR
 from risk.reg_t_guard import RegTGuard                   # for SMA
@@ -33,18 +34,15 @@ class Decision(BaseModel):
 class KimiDecisionMaker:
     def __init__(self, model_cfg: Dict[str, Any]) -> None:
         self.model_cfg = model_cfg
-        self.url = "https://api.moonshot.cn/v1/chat/completions"
+        self.url = endpoint("kimi")
         self.headers = {"Authorization": f"Bearer {os.getenv('KIMI_API_KEY')}"}
 
-    async def decide(
+    def build_prompt(
         self,
-        png_bytes: bytes,
-        agent: TechnicalAgent,
         position: Dict[str, Any],
         headline: str = "",
         sent_score: float = 0.0,
         memory: str = "",
-        # --- NEW context sources ---
         nav: float = 0.0,
         var_95: float = 0.0,
         sma_ratio: float = 0.0,
@@ -52,9 +50,8 @@ class KimiDecisionMaker:
         adverse_cost_bps: float = 0.0,
         hedge_delta: float = 0.0,
         lob_imbalance: float = 0.0,
-    ) -> Decision:
-        img_b64 = base64.b64encode(png_bytes).decode()
-
+    ) -> str:
+        """Text part of the request – everything but the chart image."""
         pos_summary = (
             f"Current position: {position['qty']} shares "
             f"avg_price={position['avg_price']:.4f} "
@@ -80,7 +77,7 @@ class KimiDecisionMaker:
             f"LOB imbalance: {lob_imbalance:+.2f}",
         ])
 
-        prompt_text = (
+        return (
             "You are a professional, risk-averse trader.\n"
             f"{pos_summary}\n"
             + ("\n".join(extras) + "\n" if extras else "")
@@ -88,6 +85,33 @@ class KimiDecisionMaker:
             + "Output JSON: {\"action\":\"BUY|SELL|HOLD\",\"stop_loss\":float,\"take_profit\":float,\"reasoning\":str}"
         )
 
+    async def decide(
+        self,
+        png_bytes: bytes,
+        agent: TechnicalAgent,
+        position: Dict[str, Any],
+        headline: str = "",
+        sent_score: float = 0.0,
+        memory: str = "",
+        # --- NEW context sources ---
+        nav: float = 0.0,
+        var_95: float = 0.0,
+        sma_ratio: float = 0.0,
+        impact_cost_bps: float = 0.0,
+        adverse_cost_bps: float = 0.0,
+        hedge_delta: float = 0.0,
+        lob_imbalance: float = 0.0,
+    ) -> Decision:
+        prompt_text = self.build_prompt(
+            position, headline, sent_score, memory, nav, var_95, sma_ratio,
+            impact_cost_bps, adverse_cost_bps, hedge_delta, lob_imbalance,
+        )
+        return Decision.model_validate_json(await self.complete(png_bytes, prompt_text))
+
+    async def complete(self, png_bytes: bytes, prompt_text: str) -> str:
+        """Raw JSON content returned by Kimi for chart + prompt."""
+        img_b64 = base64.b64encode(png_bytes).decode()
+
         payload = {
             "model": self.model_cfg["kimi_model"],
             "response_format": {"type": "json_object"},
@@ -106,8 +130,6 @@ class KimiDecisionMaker:
             "max_tokens": 256,
         }
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(self.url, headers=self.headers, json=payload)
-            r.raise_for_status()
-            data = r.json()["choices"][0]["message"]["content"]
-            return Decision.model_validate_json(data)
\ No newline at end of file
+        r = await http_client("kimi").post(self.url, headers=self.headers, json=payload)
+        r.raise_for_status()
+        return r.json()["choices"][0]["message"]["content"]
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Persistent record / replay cache for Kimi decisions.
+
+Key = sha256(model, prompt text, chart PNG) truncated to 16 bytes.
+On disk:
+  • decisions.dat – raw JSON answers, appended
+  • index.bin     – fixed-width (key, offset, length) records, appended after
+                    the data so a torn write never points at missing bytes
+Replaying returns the exact recorded JSON → bit-identical Decisions.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from brain import Decision, KimiDecisionMaker
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("BRAIN_CACHE")
+
+CACHE_DIR = Path(cfg.get("llm_cache", {}).get("dir", "./data/llm_cache"))
+MODES = ("record", "replay", "replay-or-stub")
+
+# raw void, not "S16": numpy strips trailing NULs from S fields, and 1 digest in 256 ends in one
+INDEX = np.dtype([("key", "V16"), ("off", "<u8"), ("len", "<u4")])
+STUB = json.dumps({
+    "action": "HOLD",
+    "stop_loss": 0.0,
+    "take_profit": 0.0,
+    "reasoning": "stub: no recorded decision",
+})
+
+
+class CacheMiss(KeyError):
+    pass
+
+
+class DecisionCache:
+    def __init__(self, root: Path = CACHE_DIR) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.data_path = self.root / "decisions.dat"
+        self.index_path = self.root / "index.bin"
+        self._index: Dict[bytes, tuple[int, int]] = {}
+        if self.index_path.exists():
+            for rec in np.fromfile(self.index_path, dtype=INDEX):
+                self._index[rec["key"].tobytes()] = (int(rec["off"]), int(rec["len"]))
+        log.info("LLM cache %s: %d entries", self.root, len(self._index))
+
+    @staticmethod
+    def key(model: str, prompt: str, png: bytes) -> bytes:
+        h = hashlib.sha256()
+        for part in (model.encode(), prompt.encode(), png):
+            h.update(len(part).to_bytes(8, "little"))
+            h.update(part)
+        return h.digest()[:16]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
+
+    def get(self, key: bytes) -> str:
+        if key not in self._index:
+            raise CacheMiss(key.hex())
+        off, n = self._index[key]
+        with self.data_path.open("rb") as f:
+            f.seek(off)
+            return f.read(n).decode()
+
+    def put(self, key: bytes, content: str) -> None:
+        blob = content.encode()
+        with self.data_path.open("ab") as f:
+            off = f.tell()
+            f.write(blob)
+        with self.index_path.open("ab") as f:
+            np.array([(key, off, len(blob))], dtype=INDEX).tofile(f)
+        self._index[key] = (off, len(blob))
+
+
+class CachedDecisionMaker(KimiDecisionMaker):
+    """
+    Drop-in KimiDecisionMaker:
+      record         – hit → cached, miss → call Kimi and store (valid Decisions only)
+      replay         – hit → cached, miss → CacheMiss (never touches network)
+      replay-or-stub – hit → cached, miss → HOLD stub
+    """
+
+    def __init__(self, model_cfg: Dict[str, Any], mode: str = "record", cache: DecisionCache | None = None):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        super().__init__(model_cfg)
+        self.mode = mode
+        self.cache = cache if cache is not None else DecisionCache()   # an empty cache is falsy
+        self.hits = self.misses = 0
+
+    async def complete(self, png_bytes: bytes, prompt_text: str) -> str:
+        key = DecisionCache.key(self.model_cfg["kimi_model"], prompt_text, png_bytes)
+        if key in self.cache:
+            self.hits += 1
+            return self.cache.get(key)
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMiss(key.hex())
+        if self.mode == "replay-or-stub":
+            return STUB
+        content = await super().complete(png_bytes, prompt_text)
+        try:
+            Decision.model_validate_json(content)
+        except ValueError as e:   # a malformed answer would be replayed on every later hit
+            log.warning("Not caching malformed decision %s: %s", key.hex(), e)
+            return content
+        self.cache.put(key, content)
+        return content
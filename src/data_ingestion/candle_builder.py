@@ -1,13 +1,16 @@
 """Lock-free 1-minute OHLCV builder."""
 import io
+import os
 from collections import deque
-from datetime import datetime
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List
 
 import mplfinance as mpf
+import numpy as np
 import pandas as pd
 from ib_insync import Contract, Ticker
 
+from utils.clock import get_clock
 from utils.logger import get_logger
 
 log = get_logger("CANDLE_BUILDER")
@@ -18,7 +21,7 @@ class CandleBuilder:
         self._ticks: deque = deque(maxlen=10_000)
 
     def add_tick(self, contract: Contract, tick: Ticker) -> bool:
-        now = datetime.utcnow()
+        now = get_clock().utcnow()
         self._ticks.append(
             {"t": now, "p": float(tick.last or tick.close or 0), "v": tick.volume or 0}
         )
@@ -43,4 +46,62 @@ class CandleBuilder:
         return buf.read()
 
     def reset(self) -> None:
-        self._ticks.clear()
\ No newline at end of file
+        self._ticks.clear()
+
+
+# ---------------- process-pool rendering ----------------
+_pool_builder: CandleBuilder | None = None
+
+
+def _init_render_worker(lookback: int) -> None:
+    global _pool_builder
+    import matplotlib
+    matplotlib.use("Agg")  # headless
+    _pool_builder = CandleBuilder(lookback=lookback)
+
+
+def _render_chunk(ohlc: np.ndarray, index: np.ndarray | None) -> List[bytes]:
+    """Render (k, lookback, 4) OHLC windows; index is (k, lookback) datetime64 or None."""
+    default = pd.date_range("2024-01-02 09:30", periods=ohlc.shape[1], freq="1min")
+    pngs = []
+    for i, window in enumerate(ohlc):
+        idx = pd.DatetimeIndex(index[i]) if index is not None else default
+        df = pd.DataFrame(window, index=idx, columns=["open", "high", "low", "close"])
+        pngs.append(_pool_builder.render_png(df))
+    return pngs
+
+
+class RenderPool:
+    """
+    Renders many chart windows across processes, one CandleBuilder per worker.
+    workers=0 renders in the calling process (e.g. when already inside a pool).
+    """
+
+    def __init__(self, lookback: int = 60, workers: int | None = None) -> None:
+        self.lookback = lookback
+        self.workers = os.cpu_count() if workers is None else workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> "RenderPool":
+        if self.workers:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_render_worker, initargs=(self.lookback,)
+            )
+        else:
+            _init_render_worker(self.lookback)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._pool:
+            self._pool.shutdown()
+
+    def map(
+        self, ohlc: np.ndarray, index: np.ndarray | None = None, chunk_size: int = 64
+    ) -> Iterator[List[bytes]]:
+        """Yield PNG lists chunk by chunk, in input order."""
+        starts = range(0, len(ohlc), chunk_size)
+        return (self._pool.map if self._pool else map)(
+            _render_chunk,
+            (ohlc[i: i + chunk_size] for i in starts),
+            (index[i: i + chunk_size] if index is not None else None for i in starts),
+        )
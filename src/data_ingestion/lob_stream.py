@@ -2,11 +2,11 @@
 from __future__ import annotations
 
 import asyncio
-import time
 from dataclasses import dataclass
 from typing import AsyncGenerator
 
 from ib_insync import IB, Contract, Ticker
+from utils.clock import get_clock
 from utils.logger import get_logger
 
 log = get_logger("LOB_STREAM")
@@ -31,24 +31,28 @@ class LobStream:
         # Force delayed feed so depth is always available (even off-hours)
         self.ib.reqMarketDataType(4)
 
-        deadline = time.time() + 5.0  # absolute wall-clock deadline
+        clock = get_clock()
+        deadline = clock.time() + 5.0  # absolute deadline on the session clock
 
-        async for ticker in self.ib.pendingTickersEvent:
-            if ticker.contract != contract:
+        async for tickers in self.ib.pendingTickersEvent:
+            ticker = next((t for t in tickers if t.contract == contract), None)
+            if ticker is None:
+                if clock.time() > deadline:
+                    break
                 continue
             if ticker.domBids and ticker.domAsks:
-                latency = int((time.time_ns() - ticker.time.timestamp() * 1e9) / 1000)
+                latency = int((clock.time() - ticker.time.timestamp()) * 1e6)
                 yield LobTick(
                     contract=contract,
                     bid=[(ticker.domBids[i].price, int(ticker.domBids[i].size))
                          for i in range(min(self.depth, len(ticker.domBids)))],
                     ask=[(ticker.domAsks[i].price, int(ticker.domAsks[i].size))
                          for i in range(min(self.depth, len(ticker.domAsks)))],
-                    ts=time.time(),
+                    ts=clock.time(),
                     latency_us=latency,
                 )
                 return  # one-shot
-            if time.time() > deadline:
+            if clock.time() > deadline:
                 break
 
         # Explicit failure
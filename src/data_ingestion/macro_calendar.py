@@ -0,0 +1,165 @@
+"""
+In-memory macro calendar, refreshed off the order path.
+
+The day's events are fetched once at session start and re-fetched in the
+background every `calendar.refresh_min`. Events are kept as sorted epoch
+times per impact level, so "high impact within the next N minutes" is a
+bisect, not an HTTP round-trip. A failed refresh keeps the last good
+snapshot; with no snapshot at all the check fails open (no blackout),
+exactly as the old per-order fetch did.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Set
+
+from prometheus_client import Counter, Gauge
+
+from utils.clock import get_clock
+from utils.config import load_config
+from utils.endpoints import endpoint
+from utils.http_clients import http_client
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("MACRO_CALENDAR")
+
+CAL_CFG = cfg.get("calendar", {})
+IMPORTANCE = {1: "High", 0: "Medium", -1: "Low"}   # TradingView importance → impact
+
+CALENDAR_FAIL = Counter("risk_calendar_fail_total", "Macro calendar fetch failures")
+CALENDAR_EVENTS = Gauge("macro_calendar_events", "Events in the current calendar snapshot")
+CALENDAR_AGE = Gauge("macro_calendar_age_seconds", "Seconds since the last good calendar fetch")
+
+
+@dataclass(frozen=True)
+class MacroEvent:
+    ts: float | None      # epoch seconds; None → no time given, counts for the whole day
+    title: str
+    impact: str
+
+
+def parse_event(raw: Dict[str, Any]) -> MacroEvent:
+    impact = raw.get("impact") or IMPORTANCE.get(raw.get("importance"), "Low")
+    ts = None
+    when = raw.get("date") or raw.get("time")
+    if when:
+        t = dt.datetime.fromisoformat(str(when).replace("Z", "+00:00"))
+        ts = (t if t.tzinfo else t.replace(tzinfo=dt.timezone.utc)).timestamp()
+    return MacroEvent(ts, str(raw.get("title", "")), str(impact))
+
+
+class MacroCalendar:
+    def __init__(
+        self,
+        url: str | None = None,
+        refresh_min: float = CAL_CFG.get("refresh_min", 15),
+        retry_s: float = CAL_CFG.get("retry_s", 60),
+    ) -> None:
+        self.url = url or endpoint("calendar", cfg["risk"]["macro_calendar_url"])
+        self.refresh_s = 60.0 * refresh_min
+        self.retry_s = retry_s      # back-off after a failed refresh
+        self.day: dt.date | None = None
+        self.fetched_at: float | None = None
+        self.n_events = 0
+        self._times: Dict[str, List[float]] = {}   # impact → sorted event times
+        self._all_day: Set[str] = set()            # impacts with an untimed event today
+        self._task: asyncio.Task | None = None
+
+    # ---------- snapshot ----------
+    def load(self, events: Iterable[MacroEvent], day: dt.date) -> None:
+        """Swap in a new snapshot (built aside, assigned at once – readers never see a partial one)."""
+        times: Dict[str, List[float]] = {}
+        all_day: Set[str] = set()
+        n = 0
+        for e in events:
+            n += 1
+            if e.ts is None:
+                all_day.add(e.impact)
+            else:
+                times.setdefault(e.impact, []).append(e.ts)
+        for ts in times.values():
+            ts.sort()
+        self._times, self._all_day, self.day, self.n_events = times, all_day, day, n
+        self.fetched_at = get_clock().time()
+        CALENDAR_EVENTS.set(n)
+
+    @property
+    def ready(self) -> bool:
+        return self.fetched_at is not None
+
+    def high_impact_within(
+        self,
+        minutes: float = CAL_CFG.get("window_min", 30),
+        after_min: float = CAL_CFG.get("after_min", 15),
+        impact: str = "High",
+        now: float | None = None,
+    ) -> bool:
+        """Any `impact` event in [now − after_min, now + minutes]? O(log n), no I/O."""
+        self._ensure_started()
+        now = get_clock().time() if now is None else now
+        if impact in self._all_day and self.day == dt.datetime.fromtimestamp(now, dt.timezone.utc).date():
+            return True
+        times = self._times.get(impact)
+        if not times:
+            return False
+        i = bisect.bisect_left(times, now - 60.0 * after_min)
+        return i < len(times) and times[i] <= now + 60.0 * minutes
+
+    def high_impact_today(self, impact: str = "High") -> bool:
+        self._ensure_started()
+        return impact in self._all_day or bool(self._times.get(impact))
+
+    # ---------- fetch ----------
+    async def _fetch(self, day: dt.date) -> List[MacroEvent]:
+        r = await http_client("calendar").get(self.url, params={"date": day.isoformat()})
+        r.raise_for_status()
+        return [parse_event(e) for e in r.json().get("result", [])]
+
+    async def refresh(self) -> bool:
+        """Fetch today's events; on failure keep the last good snapshot."""
+        day = get_clock().utcnow().date()
+        try:
+            events = await self._fetch(day)
+        except Exception as e:
+            CALENDAR_FAIL.inc()
+            if self.ready:
+                log.warning("Calendar refresh failed – keeping snapshot from %s: %s", self.day, e)
+            else:
+                log.warning("Calendar fetch failed – assuming NO high impact: %s", e)
+            return False
+        self.load(events, day)
+        log.info("Macro calendar %s: %d events", day, self.n_events)
+        return True
+
+    # ---------- background ----------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _ensure_started(self) -> None:
+        # lazily start the refresher when used from a loop nobody called start() on
+        if self._task is None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:   # sync caller (tests, offline tools) – snapshot only
+                return
+            self.start()
+
+    async def _run(self) -> None:
+        clock = get_clock()
+        while True:
+            due = (not self.ready or clock.time() - self.fetched_at >= self.refresh_s
+                   or self.day != clock.utcnow().date())
+            ok = await self.refresh() if due else True
+            if self.ready:
+                CALENDAR_AGE.set(clock.time() - self.fetched_at)
+            await clock.sleep(self.refresh_s if ok else min(self.retry_s, self.refresh_s))
@@ -3,10 +3,10 @@ import asyncio
 from dataclasses import dataclass
 from typing import AsyncGenerator
 
-import httpx
 from ib_insync import Contract
 
 from utils.config import load_config
+from utils.http_clients import http_client
 from utils.logger import get_logger
 
 cfg = load_config()
@@ -28,14 +28,15 @@ class AltDataFeed:
 
     async def stream(self, contract: Contract) -> AsyncGenerator[AltBar, None]:
         url = f"wss://socket.polygon.io/options"
-        async with httpx.AsyncClient() as client:
-            async with client.stream("GET", url, headers={"Authorization": f"Bearer {self.poly_key}"}) as ws:
-                async for msg in ws:
-                    data = msg.json()
-                    yield AltBar(
-                        contract=contract,
-                        ts=data["t"],
-                        lob_imb=data["lob_imbalance"],
-                        gamma_flip=data["gamma_flip"],
-                        dp_notional=data["dark_pool_notional"],
-                    )
\ No newline at end of file
+        async with http_client("polygon").stream(
+            "GET", url, headers={"Authorization": f"Bearer {self.poly_key}"}
+        ) as ws:
+            async for msg in ws:
+                data = msg.json()
+                yield AltBar(
+                    contract=contract,
+                    ts=data["t"],
+                    lob_imb=data["lob_imbalance"],
+                    gamma_flip=data["gamma_flip"],
+                    dp_notional=data["dark_pool_notional"],
+                )
\ No newline at end of file
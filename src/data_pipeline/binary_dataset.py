@@ -0,0 +1,63 @@
+"""
+Compact binary dataset shards (.npz) for chart / LOB training data.
+
+A shard holds N rows:
+  • png_blob / png_offsets – all PNGs concatenated, row i = blob[off[i]:off[i+1]]
+  • any number of aligned NumPy arrays with leading dimension N
+    (lob, ohlc, action, reward, …)
+Written once in bulk, read back with a single mmap-free load.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+PNG_BLOB = "png_blob"
+PNG_OFFSETS = "png_offsets"
+
+# int8 action encoding – same index order as TechnicalAgent logits
+ACTIONS = ("HOLD", "BUY", "SELL")
+
+
+def write_shard(path: Path, pngs: Sequence[bytes], **arrays: np.ndarray) -> Path:
+    """Write PNGs + aligned arrays to one uncompressed .npz shard."""
+    n = len(pngs)
+    for name, arr in arrays.items():
+        if len(arr) != n:
+            raise ValueError(f"Array {name!r} has {len(arr)} rows, expected {n}")
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(p) for p in pngs], out=offsets[1:])
+    blob = np.frombuffer(b"".join(pngs), dtype=np.uint8)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # PNG is already deflated – zip compression would only cost CPU
+    np.savez(path, **{PNG_BLOB: blob, PNG_OFFSETS: offsets}, **arrays)
+    return path
+
+
+def read_shard(path: Path) -> Dict[str, np.ndarray]:
+    """Load every array of a shard into memory."""
+    with np.load(path) as z:
+        return {k: z[k] for k in z.files}
+
+
+def shard_len(shard: Dict[str, np.ndarray]) -> int:
+    return len(shard[PNG_OFFSETS]) - 1
+
+
+def png_at(shard: Dict[str, np.ndarray], i: int) -> bytes:
+    off = shard[PNG_OFFSETS]
+    return shard[PNG_BLOB][off[i]: off[i + 1]].tobytes()
+
+
+def iter_pngs(shard: Dict[str, np.ndarray]) -> Iterator[bytes]:
+    for i in range(shard_len(shard)):
+        yield png_at(shard, i)
+
+
+def list_shards(directory: Path, prefix: str) -> List[Path]:
+    return sorted(Path(directory).glob(f"{prefix}-*.npz"))
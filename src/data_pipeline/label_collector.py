@@ -1,13 +1,13 @@
 """Logs (png, action, reward) from live or paper trades for ViT fine-tuning."""
 import asyncio
 import json
-import time
 from pathlib import Path
 from typing import Dict, Any
 
 import pandas as pd
 from ib_insync import Contract, IB   # IB added for type hint
 
+from utils.clock import get_clock
 from utils.logger import get_logger
 from utils.config import load_config
 
@@ -32,10 +32,12 @@ class LabelCollector:
     _lock = asyncio.Lock()
 
     @staticmethod
-    async def log(ib: IB, png: bytes, action: str, contract: Contract, horizon_sec: int = 300) -> None:
-        reward = await LabelCollector._compute_reward(ib, contract, horizon_sec)
+    async def log(
+        ib: IB, png: bytes, action: str, contract: Contract, horizon_sec: int = 300, entry_px: float | None = None
+    ) -> None:
+        reward = await LabelCollector._compute_reward(ib, contract, horizon_sec, entry_px)
         row = {
-            "ts": time.time(),
+            "ts": get_clock().time(),
             "png_b64": png.hex(),
             "action": action,
             "reward": reward,
@@ -48,9 +50,9 @@ class LabelCollector:
         log.debug("Label logged: %s reward=%.4f", action, reward)
 
     @staticmethod
-    async def _compute_reward(ib: IB, contract: Contract, horizon_sec: int) -> float:
-        """Compute % return horizon_sec after now."""
-        px_now = float(ib.reqMktData(contract, "", False, False).last or 0)
-        await asyncio.sleep(horizon_sec)
+    async def _compute_reward(ib: IB, contract: Contract, horizon_sec: int, entry_px: float | None = None) -> float:
+        """Compute % return horizon_sec after now (from `entry_px`, the price the decision saw, if given)."""
+        px_now = entry_px if entry_px is not None else float(ib.reqMktData(contract, "", False, False).last or 0)
+        await get_clock().sleep(horizon_sec)
         px_later = float(ib.reqMktData(contract, "", False, False).last or 0)
         return (px_later - px_now) / px_now if px_now else 0.0
\ No newline at end of file
@@ -1,59 +1,129 @@
 """
 Generate adversarial price charts + LOB tensors for tail-scenario training.
+
+All paths are simulated in one vectorised NumPy call (GBM + fat-tail jumps,
+intrabar sub-steps → proper OHLC), charts are rendered across a process pool
+and rows are written in bulk to binary dataset shards.
 """
-import io
-import random
+import os
 from pathlib import Path
+from typing import List
 
 import numpy as np
-import pandas as pd
-import torch
-from PIL import Image
 
-from data_ingestion.candle_builder import CandleBuilder
+from data_ingestion.candle_builder import RenderPool
+from data_pipeline.binary_dataset import ACTIONS, write_shard
 from utils.config import load_config
 from utils.logger import get_logger
 
 cfg = load_config()
 log = get_logger("SYNTHETIC")
-OUT = Path(cfg["dataset"]["raw_dir"]) / "synthetic.jsonl"
-OUT.parent.mkdir(parents=True, exist_ok=True)
+OUT_DIR = Path(cfg["dataset"]["raw_dir"])
+PREFIX = "synthetic"
+
+LOB_DEPTH = 5    # same layout as MultiModalEncoder.encode_live:
+LOB_FIELDS = 4   # [bid_px, bid_sz, ask_px, ask_sz] per level
+TICK = 0.01
+
 
 class SyntheticEngine:
-    def __init__(self, n_scenarios: int = 10_000):
+    def __init__(
+        self,
+        n_scenarios: int = 10_000,
+        steps: int = 60,
+        substeps: int = 4,
+        workers: int | None = None,
+        shard_size: int = 10_000,
+        chunk_size: int = 256,
+        seed: int | None = None,
+    ):
         self.n = n_scenarios
+        self.steps = steps
+        self.substeps = substeps
+        self.workers = workers or os.cpu_count()
+        self.shard_size = shard_size
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+
+    def simulate_paths(self) -> np.ndarray:
+        """Return (n, steps, 4) float32 OHLC for every scenario at once."""
+        n, steps, k = self.n, self.steps, self.substeps
+        # GBM with random σ per path, split over k intrabar sub-steps
+        sigma = self.rng.uniform(0.005, 0.05, size=(n, 1, 1))
+        log_ret = sigma / np.sqrt(k) * self.rng.standard_normal((n, steps, k))
+        # fat-tail shocks land on the bar open (gap), Laplace-style as before
+        shock = self.rng.choice([1.0, -1.0], size=(n, steps)) * self.rng.exponential(3, (n, steps)) * 0.01
+        log_ret[:, :, 0] += shock
+        log_ret[:, 0, 0] = 0.0  # every path opens at 100
+
+        prices = 100 * np.exp(np.cumsum(log_ret.reshape(n, -1), axis=1)).reshape(n, steps, k)
+        ohlc = np.empty((n, steps, 4), dtype=np.float32)
+        ohlc[..., 0] = prices[..., 0]
+        ohlc[..., 1] = prices.max(axis=2)
+        ohlc[..., 2] = prices.min(axis=2)
+        ohlc[..., 3] = prices[..., -1]
+        return ohlc
+
+    def make_lob(self, ohlc: np.ndarray) -> np.ndarray:
+        """Return (n, LOB_DEPTH, LOB_FIELDS) float32 books around each last close."""
+        n = len(ohlc)
+        mid = ohlc[:, -1, 3].astype(np.float64)
+        half_spread = TICK * (1 + self.rng.geometric(0.5, n)) / 2
+        levels = TICK * np.arange(LOB_DEPTH)
 
-    def _make_tail_chart(self) -> bytes:
-        # GBM with random σ and fat-tail shocks
-        mu, sigma = 0, random.uniform(0.005, 0.05)
-        steps = 60
-        prices = [100]
-        for _ in range(steps - 1):
-            shock = random.choice([1, -1]) * random.expovariate(1 / 3) * 0.01
-            prices.append(prices[-1] * np.exp(mu + sigma * np.random.normal() + shock))
-        df = pd.DataFrame({"open": prices, "high": prices, "low": prices, "close": prices})
-        builder = CandleBuilder()
-        return builder.render_png(df)
-
-    def generate(self):
-        for idx in range(self.n):
-            png = self._make_tail_chart()
-            label = random.choice(["BUY", "SELL", "HOLD"])
-            with OUT.open("a") as f:
-                f.write(
-                    json.dumps(
-                        {
-                            "png_b64": png.hex(),
-                            "action": label,
-                            "reward": random.uniform(-0.02, 0.02),
-                            "contract": "SYNTH",
-                            "metadata": {"synthetic": True},
-                        }
-                    )
-                    + "\n"
+        # book thins on the side the last bar ran into
+        last_ret = ohlc[:, -1, 3] / ohlc[:, -1, 0] - 1
+        skew = np.tanh(last_ret / 0.01)[:, None]
+        sizes = self.rng.lognormal(np.log(100), 0.75, size=(n, 2, LOB_DEPTH))
+
+        lob = np.empty((n, LOB_DEPTH, LOB_FIELDS), dtype=np.float32)
+        lob[..., 0] = (mid - half_spread)[:, None] - levels
+        lob[..., 1] = np.maximum(1, np.rint(sizes[:, 0] * np.exp(skew)))
+        lob[..., 2] = (mid + half_spread)[:, None] + levels
+        lob[..., 3] = np.maximum(1, np.rint(sizes[:, 1] * np.exp(-skew)))
+        return lob
+
+    def generate(self) -> List[Path]:
+        ohlc = self.simulate_paths()
+        lob = self.make_lob(ohlc)
+        action = self.rng.integers(0, len(ACTIONS), self.n).astype(np.int8)
+        reward = self.rng.uniform(-0.02, 0.02, self.n).astype(np.float32)
+        log.info("Simulated %d paths – rendering on %d workers", self.n, self.workers)
+
+        shards: List[Path] = []
+        pngs: List[bytes] = []
+
+        def _flush(batch: List[bytes]) -> None:
+            lo = len(shards) * self.shard_size
+            hi = lo + len(batch)
+            shards.append(
+                write_shard(
+                    OUT_DIR / f"{PREFIX}-{len(shards):05d}.npz",
+                    batch,
+                    ohlc=ohlc[lo:hi],
+                    lob=lob[lo:hi],
+                    action=action[lo:hi],
+                    reward=reward[lo:hi],
                 )
-        log.info("Synthetic dataset ready: %s rows", self.n)
+            )
+
+        with RenderPool(self.steps, self.workers) as pool:
+            for rendered in pool.map(ohlc, chunk_size=self.chunk_size):
+                pngs.extend(rendered)
+                while len(pngs) >= self.shard_size:
+                    _flush(pngs[: self.shard_size])
+                    pngs = pngs[self.shard_size:]
+        if pngs:
+            _flush(pngs)
+        log.info("Synthetic dataset ready: %s rows in %d shards", self.n, len(shards))
+        return shards
+
 
 if __name__ == "__main__":
-    import json
-    SyntheticEngine().generate()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    SyntheticEngine(args.n, workers=args.workers, seed=args.seed).generate()
@@ -0,0 +1,76 @@
+"""
+Compact distilled chart classifier – drop-in for ViTChartEncoder on CPU.
+~0.1 M params vs ~86 M for ViT-base; trained by training/distill.py.
+"""
+from __future__ import annotations
+
+import json
+from io import BytesIO
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+import torch
+import torch.nn as nn
+from PIL import Image
+
+from utils.logger import get_logger
+
+log = get_logger("STUDENT_ENCODER")
+
+INPUT_HW = (96, 160)       # keeps the 10x6 chart aspect ratio
+WEIGHTS_FILE = "student.pt"
+META_FILE = "student.json"
+
+
+def _block(c_in: int, c_out: int) -> nn.Sequential:
+    return nn.Sequential(
+        nn.Conv2d(c_in, c_out, 3, stride=2, padding=1, bias=False),
+        nn.BatchNorm2d(c_out),
+        nn.ReLU(inplace=True),
+    )
+
+
+class ChartStudent(nn.Module):
+    def __init__(self, num_classes: int = 3, widths: Sequence[int] = (16, 32, 64, 96)) -> None:
+        super().__init__()
+        chans = [3, *widths]
+        self.features = nn.Sequential(*(_block(a, b) for a, b in zip(chans, chans[1:])))
+        self.head = nn.Sequential(nn.AdaptiveAvgPool2d(1), nn.Flatten(), nn.Linear(chans[-1], num_classes))
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.head(self.features(x))
+
+
+def preprocess(png_bytes: bytes) -> torch.Tensor:
+    """PNG → (3, H, W) float tensor in [0, 1]."""
+    img = Image.open(BytesIO(png_bytes)).convert("RGB").resize(INPUT_HW[::-1], Image.BILINEAR)
+    return torch.from_numpy(np.asarray(img, dtype=np.float32) / 255.0).permute(2, 0, 1)
+
+
+class StudentChartEncoder:
+    """Same `encode(png) -> logits` contract as ViTChartEncoder."""
+
+    def __init__(self, checkpoint_dir: Path) -> None:
+        self.device = torch.device("cpu")  # sized for CPU inference
+        meta = json.loads((Path(checkpoint_dir) / META_FILE).read_text())
+        self.model = ChartStudent(meta["num_classes"], meta["widths"])
+        self.model.load_state_dict(torch.load(Path(checkpoint_dir) / WEIGHTS_FILE, map_location="cpu"))
+        self.model.eval()
+        log.info("Student encoder loaded from %s", checkpoint_dir)
+
+    @torch.inference_mode()
+    def encode(self, png_bytes: bytes) -> List[float]:
+        try:
+            return self.model(preprocess(png_bytes).unsqueeze(0)).squeeze(0).tolist()
+        except Exception:
+            log.exception("Student encode failed – returning zeros")
+            return [0.0, 0.0, 0.0]
+
+    @torch.inference_mode()
+    def encode_batch(self, pngs: Sequence[bytes], batch_size: int = 256) -> np.ndarray:
+        out = [np.zeros((0, self.model.head[-1].out_features), np.float32)]
+        for i in range(0, len(pngs), batch_size):
+            x = torch.stack([preprocess(p) for p in pngs[i: i + batch_size]])
+            out.append(self.model(x).numpy())
+        return np.concatenate(out)
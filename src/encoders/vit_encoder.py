@@ -1,8 +1,9 @@
 """ViT encoder with graceful fallbacks."""
 from io import BytesIO
 from pathlib import Path
-from typing import List
+from typing import List, Sequence
 
+import numpy as np
 import torch
 from PIL import Image
 from transformers import ViTForImageClassification, ViTImageProcessor
@@ -14,11 +15,11 @@ cfg = load_config()
 log = get_logger("VIT_ENCODER")
 
 class ViTChartEncoder:
-    def __init__(self) -> None:
+    def __init__(self, tag: str = "prod") -> None:
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
         # ── load the *fine-tuned* checkpoint we created with train_vit.py ──
-        checkpoint_dir = Path(cfg["model"]["checkpoint_dir"]) / "prod"
+        checkpoint_dir = Path(cfg["model"]["checkpoint_dir"]) / tag
         if not checkpoint_dir.exists():
             # fallback for first run – create placeholder dir so load still works
             checkpoint_dir.mkdir(parents=True, exist_ok=True)
@@ -40,4 +41,14 @@ class ViTChartEncoder:
             return logits
         except Exception as e:
             log.exception("ViT encode failed – returning zeros")
-            return [0.0, 0.0, 0.0]
\ No newline at end of file
+            return [0.0, 0.0, 0.0]
+
+    @torch.inference_mode()
+    def encode_batch(self, pngs: Sequence[bytes], batch_size: int = 64) -> np.ndarray:
+        """(N, num_classes) logits, `batch_size` charts per forward pass."""
+        out = []
+        for i in range(0, len(pngs), batch_size):
+            imgs = [Image.open(BytesIO(p)).convert("RGB") for p in pngs[i: i + batch_size]]
+            inputs = self.processor(images=imgs, return_tensors="pt").to(self.device)
+            out.append(self.model(**inputs).logits.float().cpu().numpy())
+        return np.concatenate(out) if out else np.zeros((0, self.model.config.num_labels), np.float32)
@@ -16,7 +16,11 @@ from ib_insync import (
 from prometheus_client import Counter, Gauge
 
 from data_ingestion.lob_stream import LobStream, LobTick
-from execution.fill_model import FillModel
+from execution.decision_context import DecisionContext
+from execution.exec_algos import AlgoOrder, AlgoScheduler
+from execution.fill_model import FillModels
+from execution.flatten import Flattener, FlattenReport
+from execution.order_manager import ManagedOrder, OrderManager
 from execution.risk import RiskManager, SizedOrder
 from execution.smart_router import SmartRouter, Route
 from utils.config import load_config
@@ -33,16 +37,18 @@ FILL_PROB = Gauge("fill_probability", "Predicted passive-fill probability")
 
 
 class Broker:
-    def __init__(self, risk_cfg: Dict) -> None:
-        self.ib = IB()
+    def __init__(self, risk_cfg: Dict, ib: IB | None = None) -> None:
+        self.ib = ib or IB()  # FakeIB for offline replays / benchmarks
         self.risk = RiskManager(risk_cfg)
         self.start_nav = 0.0  # set on first nav read
 
         # NEW: micro-structure stack
         self.lob = LobStream(self.ib)
-        symbol = risk_cfg.get("symbol", "UNDEF")  # or pull from contract later
         self.router = SmartRouter(risk_cfg.get("venue_fees", {"SMART": 0.3}))
-        self.fill_model = FillModel(symbol)
+        self.fill_models = FillModels()  # one online model per symbol
+        self.orders = OrderManager(self.ib)
+        self.algos = AlgoScheduler(self.ib, self.fill_models)
+        self.flattener = Flattener(self.ib, self.orders)
 
     # ---------------- helpers ----------------
     def _get_nav(self) -> float:
@@ -80,12 +86,15 @@ class Broker:
             return {"qty": 0, "avg_price": 0.0, "unreal_pnl": 0.0, "real_pnl": 0.0}
 
     # ---------------- main entry ----------------
-    async def execute(self, decision, contract) -> None:
-        nav = self._get_nav()
-        if self.risk.start_nav is None:
-            self.risk.start_nav = nav
-
-        margin = self._margin_usage()
+    async def execute(
+        self, decision, contract, ctx: DecisionContext | None = None
+    ) -> ManagedOrder | AlgoOrder | None:
+        """`ctx`: the candle's snapshots (account, quote, book, sizing) – used instead of re-reading IB."""
+        if ctx is not None and ctx.contract != contract:
+            ctx = None  # e.g. the SPY hedge leg: nothing in the context applies
+        nav = ctx.account.nav if ctx else self._get_nav()  # RiskManager.daily_pnl_pct pins the day's start NAV
+
+        margin = ctx.account.margin_usage if ctx else self._margin_usage()
         DAILY_PNL.set(self.risk.daily_pnl_pct(nav))
 
         # 1. kill-switch
@@ -94,23 +103,30 @@ class Broker:
             return
 
         # 2. macro filter
-        if await self.risk.high_impact_today():
+        if self.risk.macro_blackout():
             log.warning("High-impact macro event – skipping order")
             return
 
         # 3. sizing
-        price = float(self.ib.reqMktData(contract, "", False, False).last or 1)
-        sized = self.risk.size_order(nav, price, margin)
+        if ctx is not None and ctx.sized is not None:
+            sized = ctx.sized
+        else:
+            price = ctx.price if ctx else float(self.ib.reqMktData(contract, "", False, False).last or 1)
+            sized = self.risk.size_order(nav, price, margin)
         if sized.qty == 0:
             return
 
         # 4. micro-structure snapshot
-        lob_gen = self.lob.stream(contract)
-        lob = await lob_gen.__anext__()  # latest order-book
+        if ctx is not None and ctx.lob is not None:
+            lob = ctx.lob
+        else:
+            lob_gen = self.lob.stream(contract)
+            lob = await lob_gen.__anext__()  # latest order-book
 
         # 5. smart route
         route = self.router.route(lob, sized.action, sized.qty)
-        fill_prob = self.fill_model.predict(
+        fill_model = self.fill_models[contract.symbol]
+        fill_prob = fill_model.predict(
             sized.qty,
             route.queue_ahead,
             lob.latency_us,
@@ -119,34 +135,51 @@ class Broker:
         log.info("Routing %s %s fill_prob=%.2f route=%s",
                  sized.action, sized.qty, fill_prob, route)
 
-        # 6. build order
+        # 6. too big for the visible book → slice it over time (TWAP / VWAP / POV)
+        if route.action == "ALGO":
+            parent = self.algos.submit(contract, sized.action, sized.qty, route.algo, lob=lob)
+            ORDERS_SENT.inc(sized.qty)
+            return parent
+
+        # 6b. build order
         order: Order
         if route.action == "PASSIVE":
             order = LimitOrder(sized.action, sized.qty, route.limit_price)
         else:
             order = MarketOrder(sized.action, sized.qty)
 
-        # 7. place & observe
-        trade: Trade = self.ib.placeOrder(contract, order)
+        # 7. place; the order manager enforces the timeout and cancel/replaces
+        mo = self.orders.submit(contract, order)
         ORDERS_SENT.inc(sized.qty)
-        log.info("Order placed: %s", trade)
+        log.info("Order placed: %s", mo.trade)
 
-        # 8. post-trade learning (async callback)
-        def on_fill(tr: Trade, fill):
-            filled = tr.filled == sized.qty
-            self.fill_model.update(lob, sized.qty, filled)
+        # 8. post-trade learning once the parent order is terminal – passive orders only:
+        #    the model is P(fill at the passive price), a market order says nothing about it
+        if route.action == "PASSIVE":
+            def on_done(fut: asyncio.Future) -> None:
+                done: ManagedOrder = fut.result()
+                fill_model.update(sized.qty, route.queue_ahead, lob.latency_us, done.passive_filled)
 
-        trade.filledEvent += on_fill
+            mo.done.add_done_callback(on_done)
+        return mo
 
     # ---------------- emergency ----------------
-    async def flatten_all(self) -> None:
+    async def flatten_all(self, deadline_s: float | None = None) -> FlattenReport | None:
+        """Close everything concurrently and wait for confirmation (see execution.flatten)."""
         try:
-            for pos in self.ib.positions():
-                qty = int(pos.position)
-                if qty == 0:
-                    continue
-                action = "SELL" if qty > 0 else "BUY"
-                order = MarketOrder(action, abs(qty))
-                self.ib.placeOrder(pos.contract, order)
+            # nothing of ours may keep trading while we flatten
+            for parent in self.algos.open_parents():
+                self.algos.cancel(parent)
+            for mo in self.orders.open_orders():
+                self.orders.cancel(mo)
+            report = await self.flattener.run(deadline_s)
         except Exception as e:
-            log.exception("Flatten failed: %s", e)
\ No newline at end of file
+            log.exception("Flatten failed: %s", e)
+            return None
+        if report.complete:
+            log.info("Flattened %d positions in %.2fs (%d orders, %d rounds)",
+                     report.positions, report.elapsed_s, report.orders, report.rounds)
+        else:
+            log.error("Flatten INCOMPLETE after %.2fs – still open: %s; failed: %s",
+                      report.elapsed_s, report.residual, report.failed)
+        return report
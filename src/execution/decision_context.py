@@ -0,0 +1,98 @@
+"""
+Immutable per-candle decision context.
+
+One candle → one set of broker reads: account values and positions,
+quote, order-book snapshot, then sizing / impact / risk derived from them.
+Supervisor builds it stage by stage (dataclasses.replace – never mutated)
+and hands it to Broker.execute, AuditTrail and LabelCollector, so every
+consumer sees the same state and nobody re-queries IB.
+"""
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Tuple
+
+from ib_insync import Contract
+
+from data_ingestion.lob_stream import LobTick
+from execution.impact_model import ImpactEstimate
+from execution.micro_price import MicroPrice
+from utils.clock import get_clock
+
+
+@dataclass(frozen=True)
+class AccountSnapshot:
+    values: Mapping[str, float]          # IB account tag → value, one accountValues() call
+    positions: Tuple[Any, ...]           # one positions() call
+
+    @classmethod
+    def read(cls, ib) -> "AccountSnapshot":
+        values: Dict[str, float] = {}
+        for v in ib.accountValues(account=""):
+            try:
+                values.setdefault(v.tag, float(v.value))
+            except (TypeError, ValueError):
+                pass
+        return cls(values, tuple(ib.positions()))
+
+    @property
+    def nav(self) -> float:
+        return self.values.get("NetLiquidation", 0.0)
+
+    @property
+    def margin_usage(self) -> float:
+        excess = self.values.get("ExcessLiquidity", 0.0)
+        gross = self.values.get("GrossPositionValue", 0.0)
+        return gross / (excess + gross) if excess + gross else 0.0
+
+    def position(self, contract: Contract) -> Dict[str, float]:
+        """Same shape as Broker.position_snapshot."""
+        for p in self.positions:
+            if p.contract == contract:
+                return {
+                    "qty": int(p.position),
+                    "avg_price": float(p.averageCost),
+                    "unreal_pnl": float(getattr(p, "unrealPNL", 0) or 0),
+                    "real_pnl": float(getattr(p, "realPNL", 0) or 0),
+                }
+        return {"qty": 0, "avg_price": 0.0, "unreal_pnl": 0.0, "real_pnl": 0.0}
+
+
+@dataclass(frozen=True)
+class DecisionContext:
+    contract: Contract
+    account: AccountSnapshot
+    price: float
+    ts: dt.datetime = field(default_factory=lambda: get_clock().utcnow())
+    lob: LobTick | None = None
+    sized: Any = None                    # execution.risk.SizedOrder
+    impact: ImpactEstimate | None = None
+    micro: MicroPrice | None = None
+    reg_t: Mapping[str, float] | None = None
+    risk: Any = None                     # risk.portfolio_risk.RiskSnapshot
+
+    @classmethod
+    def capture(cls, ib, contract: Contract) -> "DecisionContext":
+        account = AccountSnapshot.read(ib)
+        price = float(ib.reqMktData(contract, "", False, False).last or 1)
+        return cls(contract, account, price)
+
+    def with_(self, **changes: Any) -> "DecisionContext":
+        return dataclasses.replace(self, **changes)
+
+    def audit(self) -> Dict[str, Any]:
+        """JSON-able summary of what the decision saw."""
+        return {
+            "ts": self.ts.isoformat(),
+            "nav": self.account.nav,
+            "margin_usage": self.account.margin_usage,
+            "price": self.price,
+            "bid": self.lob.bid[0] if self.lob and self.lob.bid else None,
+            "ask": self.lob.ask[0] if self.lob and self.lob.ask else None,
+            "sized": self.sized.dict() if self.sized is not None else None,
+            "impact": dataclasses.asdict(self.impact) if self.impact else None,
+            "micro": dataclasses.asdict(self.micro) if self.micro else None,
+            "reg_t": dict(self.reg_t) if self.reg_t else None,
+        }
@@ -0,0 +1,343 @@
+"""
+Execution algorithms: slice a parent order into child orders over time.
+
+  TWAP – equal slices across the horizon
+  VWAP – slices weighted by the intraday volume curve (`algos.vwap_curve`,
+         half-hour buckets from 09:30 ET)
+  POV  – keeps filled quantity at `algos.pov_rate` of the volume printed
+         since the parent started
+
+Every `algos.slice_s` a parent is topped up to its schedule target. A child
+joins the near touch when the FillModel expects it to fill there. Otherwise
+it is sent as a marketable limit that stops at the level covering its size.
+A child is never larger than `algos.max_child_depth_frac` of the displayed
+opposite depth, which bounds each child's impact. Children go through
+OrderManager with a one-slice timeout and no replace, so whatever doesn't
+fill rolls into the next slice.
+
+Past the horizon (`algos.finish`: "aggressive") the remainder is worked by
+marketable children under the same depth cap, one every
+`algos.finish_slice_s`, until the hard deadline `algos.finish_s` after the
+horizon – never as one order that sweeps the book. What is still unfilled
+then is dropped: the parent ends CANCELLED short of its quantity, and the
+caller owns that residual (with "cancel" it is dropped at the horizon).
+POV is the most exposed, since thin volume leaves most of the parent to
+this phase. Each parent runs as its own task, so many can work at once
+without blocking on_candle. Parents on one symbol share a single depth
+subscription, cancelled when the last of them finishes.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import itertools
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ib_insync import Contract, LimitOrder, Order
+from prometheus_client import Counter, Histogram
+
+from data_ingestion.lob_stream import LobTick
+from execution.fill_model import FillModels
+from execution.order_manager import ManagedOrder, OrderManager, OrderState
+from utils.clock import get_clock
+from utils.config import load_config
+from utils.logger import get_logger
+from utils.market_hours import ET
+
+cfg = load_config()
+log = get_logger("EXEC_ALGOS")
+
+ALGO_CFG = cfg.get("algos", {})
+ALGOS = ("TWAP", "VWAP", "POV")
+# U-shaped intraday volume, 13 half-hour buckets 09:30–16:00 ET
+VWAP_CURVE = ALGO_CFG.get("vwap_curve", [12, 8, 7, 6, 5, 5, 5, 5, 5, 6, 7, 9, 15])
+
+ALGO_PARENTS = Counter("algo_parent_total", "Parent orders handed to an execution algo", ["algo"])
+ALGO_CHILDREN = Counter("algo_child_total", "Child orders sent by execution algos", ["algo", "kind"])
+ALGO_UNFILLED = Counter("algo_unfilled_shares_total", "Parent quantity left unfilled at the hard deadline", ["algo"])
+ALGO_SHORTFALL = Histogram("algo_shortfall_bps", "Parent avg fill vs arrival mid (signed, + = cost)", ["algo"],
+                           buckets=(-10, -5, -2, 0, 2, 5, 10, 20, 50, 100))
+
+
+def slice_weights(algo: str, start: float, n: int, slice_s: float) -> List[float]:
+    """Cumulative share of the parent due by the end of each slice (TWAP / VWAP)."""
+    if algo == "VWAP":
+        w = []
+        for k in range(n):
+            t = dt.datetime.fromtimestamp(start + k * slice_s, ET)
+            mins = (t.hour - 9) * 60 + t.minute - 30
+            w.append(float(VWAP_CURVE[min(max(mins // 30, 0), len(VWAP_CURVE) - 1)]))
+    else:
+        w = [1.0] * n
+    total = sum(w)
+    return list(itertools.accumulate(x / total for x in w))
+
+
+@dataclass
+class AlgoOrder:
+    id: int
+    contract: Contract
+    action: str
+    qty: int
+    algo: str
+    horizon_s: float
+    slice_s: float
+    created: float
+    arrival_mid: float
+    state: OrderState = OrderState.WORKING
+    targets: List[float] = field(default_factory=list)   # cumulative schedule, TWAP / VWAP
+    volume0: float = 0.0                                 # market volume at start, POV
+    children: List[ManagedOrder] = field(default_factory=list)
+    cancel_requested: bool = False
+    done: asyncio.Future | None = None
+
+    @property
+    def n_slices(self) -> int:
+        return max(1, math.ceil(self.horizon_s / self.slice_s))
+
+    @property
+    def filled(self) -> int:
+        return sum(c.filled for c in self.children)
+
+    @property
+    def working(self) -> int:
+        return sum(c.remaining for c in self.children if not c.state.terminal)
+
+    @property
+    def avg_price(self) -> float:
+        return sum(c.filled * c.avg_price for c in self.children) / self.filled if self.filled else 0.0
+
+    async def wait(self) -> "AlgoOrder":
+        return await asyncio.shield(self.done)
+
+
+class AlgoScheduler:
+    def __init__(
+        self,
+        ib,
+        fill_models: FillModels,
+        slice_s: float = ALGO_CFG.get("slice_s", 30),
+        horizon_s: float = ALGO_CFG.get("horizon_s", 300),
+        pov_rate: float = ALGO_CFG.get("pov_rate", 0.1),
+        max_child_depth_frac: float = ALGO_CFG.get("max_child_depth_frac", 0.25),
+        passive_min_prob: float = ALGO_CFG.get("passive_min_prob", 0.6),
+        finish: str = ALGO_CFG.get("finish", "aggressive"),
+        finish_s: float = ALGO_CFG.get("finish_s", 60),
+        finish_slice_s: float = ALGO_CFG.get("finish_slice_s", 5),
+        depth: int = 5,
+    ) -> None:
+        self.ib = ib
+        self.fill_models = fill_models
+        self.slice_s = slice_s
+        self.horizon_s = horizon_s
+        self.pov_rate = pov_rate
+        self.max_child_depth_frac = max_child_depth_frac
+        self.passive_min_prob = passive_min_prob
+        self.finish = finish
+        self.finish_s = finish_s
+        self.finish_slice_s = finish_slice_s
+        self.depth = depth
+        # one slice per child, unfilled quantity rolls into the next slice
+        self.orders = OrderManager(ib, timeout_s=slice_s, max_reprices=0, final="cancel")
+        self.parents: Dict[int, AlgoOrder] = {}
+        self._ids = itertools.count(1)
+        # one depth subscription per symbol shared by its parents (IB caps them): [ticker, users]
+        self._depth: Dict[str, list] = {}
+
+    # ---------- public API ----------
+    def submit(self, contract: Contract, action: str, qty: int, algo: str = "TWAP",
+               horizon_s: float | None = None, lob: LobTick | None = None) -> AlgoOrder:
+        """
+        Start working `qty`; returns immediately (await `.wait()` for the outcome).
+        `lob`: the book the order was routed on, which stamps the arrival mid.
+        Without it the mid is taken from the first depth snapshot.
+        """
+        if algo not in ALGOS:
+            raise ValueError(f"Unknown execution algo {algo!r} (expected one of {ALGOS})")
+        clock = get_clock()
+        ticker = self._subscribe(contract)
+        mid = self._mid(lob if lob is not None else self._book(contract, ticker))
+        parent = AlgoOrder(next(self._ids), contract, action, int(qty), algo,
+                           self.horizon_s if horizon_s is None else horizon_s, self.slice_s,
+                           clock.time(), mid)
+        if algo == "POV":
+            parent.volume0 = self._volume(ticker)
+        else:
+            parent.targets = slice_weights(algo, parent.created, parent.n_slices, self.slice_s)
+        parent.done = asyncio.get_running_loop().create_future()
+        self.parents[parent.id] = parent
+        ALGO_PARENTS.labels(algo=algo).inc()
+        log.info("%s %s %d %s over %.0fs in %d slices", algo, action, qty, contract.symbol,
+                 parent.horizon_s, parent.n_slices)
+        asyncio.create_task(self._run(parent, ticker))
+        return parent
+
+    def cancel(self, parent: AlgoOrder) -> None:
+        parent.cancel_requested = True
+        for c in parent.children:
+            self.orders.cancel(c)
+
+    def open_parents(self) -> List[AlgoOrder]:
+        return [p for p in self.parents.values() if not p.state.terminal]
+
+    # ---------- helpers ----------
+    def _subscribe(self, contract: Contract):
+        sub = self._depth.get(contract.symbol)
+        if sub is None:
+            sub = self._depth[contract.symbol] = [
+                self.ib.reqMktDepth(contract, self.depth, isSmartDepth=True), 0]
+        sub[1] += 1
+        return sub[0]
+
+    def _unsubscribe(self, contract: Contract) -> None:
+        sub = self._depth[contract.symbol]
+        sub[1] -= 1
+        if sub[1] == 0:
+            del self._depth[contract.symbol]
+            self.ib.cancelMktDepth(contract, isSmartDepth=True)
+
+    def _book(self, contract: Contract, ticker) -> LobTick:
+        now = get_clock().time()
+        latency = int((now - ticker.time.timestamp()) * 1e6) if ticker.time else 0
+        return LobTick(contract,
+                       [(b.price, int(b.size)) for b in (ticker.domBids or [])[: self.depth]],
+                       [(a.price, int(a.size)) for a in (ticker.domAsks or [])[: self.depth]],
+                       now, latency)
+
+    @staticmethod
+    def _mid(lob: LobTick) -> float:
+        return (lob.bid[0][0] + lob.ask[0][0]) / 2 if lob.bid and lob.ask else 0.0
+
+    async def _first_book(self, ticker, timeout_s: float) -> None:
+        """Wait (at most timeout_s) for a fresh depth subscription's first snapshot."""
+        got = asyncio.get_running_loop().create_future()
+
+        def on_tickers(tickers) -> None:
+            if ticker.domBids and ticker.domAsks and not got.done():
+                got.set_result(None)
+
+        on_tickers(())
+        sleeper = asyncio.ensure_future(get_clock().sleep(timeout_s))
+        self.ib.pendingTickersEvent += on_tickers
+        try:
+            await asyncio.wait({sleeper, got}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.ib.pendingTickersEvent -= on_tickers
+            sleeper.cancel()
+
+    @staticmethod
+    def _volume(ticker) -> float:
+        v = ticker.volume
+        return 0.0 if v is None or math.isnan(v) else float(v)
+
+    def _target(self, parent: AlgoOrder, k: int, ticker) -> int:
+        if parent.algo == "POV":
+            return int(self.pov_rate * (self._volume(ticker) - parent.volume0))
+        return math.ceil(parent.qty * parent.targets[k] - 1e-9)
+
+    def _child(self, parent: AlgoOrder, want: int, lob: LobTick,
+               passive: bool = True) -> tuple[Order, str] | None:
+        opp = lob.ask if parent.action == "BUY" else lob.bid
+        own = lob.bid if parent.action == "BUY" else lob.ask
+        if not opp:
+            return None
+        cap = max(1, int(self.max_child_depth_frac * sum(s for _, s in opp)))
+        qty = min(want, cap)
+        queue_ahead = own[0][1] if own else 0
+        fill_model = self.fill_models[parent.contract.symbol]
+        if passive and own and fill_model.predict(qty, queue_ahead, lob.latency_us) >= self.passive_min_prob:
+            return LimitOrder(parent.action, qty, own[0][0]), "passive"
+        # marketable limit, no deeper than the level that covers qty
+        cum, px = 0, opp[-1][0]
+        for p, s in opp:
+            cum += s
+            if cum >= qty:
+                px = p
+                break
+        return LimitOrder(parent.action, qty, px), "aggressive"
+
+    def _learn(self, symbol: str, qty: int, queue_ahead: int, latency_us: int):
+        def on_done(fut: asyncio.Future) -> None:
+            self.fill_models[symbol].update(qty, queue_ahead, latency_us, fut.result().passive_filled)
+        return on_done
+
+    async def _settle(self, parent: AlgoOrder, timeout_s: float) -> None:
+        """Wait (at most timeout_s) for working children to reach a terminal state."""
+        clock = get_clock()
+        sleeper = asyncio.ensure_future(clock.sleep(timeout_s))
+        try:
+            for c in parent.children:
+                if not c.state.terminal and not sleeper.done():
+                    await asyncio.wait({sleeper, c.done}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sleeper.cancel()
+
+    # ---------- schedule ----------
+    async def _run(self, parent: AlgoOrder, ticker) -> None:
+        clock = get_clock()
+        try:
+            if not parent.arrival_mid:                 # no book yet: shortfall needs a real arrival mid
+                await self._first_book(ticker, parent.slice_s)
+                parent.arrival_mid = self._mid(self._book(parent.contract, ticker))
+            for k in range(parent.n_slices):
+                if parent.cancel_requested or parent.filled >= parent.qty:
+                    break
+                want = min(self._target(parent, k, ticker), parent.qty) - parent.filled - parent.working
+                if want > 0:
+                    lob = self._book(parent.contract, ticker)
+                    child = self._child(parent, want, lob)
+                    if child is not None:
+                        order, kind = child
+                        mo = self.orders.submit(parent.contract, order)
+                        parent.children.append(mo)
+                        ALGO_CHILDREN.labels(algo=parent.algo, kind=kind).inc()
+                        if kind == "passive":
+                            own = lob.bid if parent.action == "BUY" else lob.ask
+                            mo.done.add_done_callback(
+                                self._learn(parent.contract.symbol, mo.qty, own[0][1], lob.latency_us))
+                await clock.sleep(max(parent.created + (k + 1) * parent.slice_s - clock.time(), 0.0))
+
+            if self.finish != "aggressive":
+                await self._settle(parent, parent.slice_s)
+                return
+            # past the horizon: capped marketable children until the hard deadline
+            hard = parent.created + parent.horizon_s + self.finish_s
+            while not parent.cancel_requested and clock.time() < hard:
+                await self._settle(parent, hard - clock.time())
+                left = parent.qty - parent.filled - parent.working
+                if left <= 0 or clock.time() >= hard:
+                    break
+                child = self._child(parent, left, self._book(parent.contract, ticker), passive=False)
+                if child is not None:
+                    mo = self.orders.submit(parent.contract, child[0], timeout_s=self.finish_slice_s)
+                    parent.children.append(mo)
+                    ALGO_CHILDREN.labels(algo=parent.algo, kind="finish").inc()
+                await clock.sleep(min(self.finish_slice_s, max(hard - clock.time(), 0.0)))
+            if parent.working:                           # deadline: pull what's still out
+                for c in parent.children:
+                    self.orders.cancel(c)
+                await self._settle(parent, self.finish_slice_s)
+        except asyncio.CancelledError:
+            self.cancel(parent)
+            raise
+        finally:
+            self._unsubscribe(parent.contract)
+            self._finish(parent)
+
+    def _finish(self, parent: AlgoOrder) -> None:
+        parent.state = OrderState.FILLED if parent.filled >= parent.qty else OrderState.CANCELLED
+        if parent.state == OrderState.CANCELLED and not parent.cancel_requested:
+            ALGO_UNFILLED.labels(algo=parent.algo).inc(parent.qty - parent.filled)
+            log.warning("%s parent %d hit its deadline with %d/%d unfilled", parent.algo, parent.id,
+                        parent.qty - parent.filled, parent.qty)
+        self.parents.pop(parent.id, None)
+        if parent.filled and parent.arrival_mid:
+            sign = 1 if parent.action == "BUY" else -1
+            ALGO_SHORTFALL.labels(algo=parent.algo).observe(
+                sign * 1e4 * (parent.avg_price - parent.arrival_mid) / parent.arrival_mid)
+        log.info("%s parent %d %s: %d/%d @ %.4f", parent.algo, parent.id, parent.state.value,
+                 parent.filled, parent.qty, parent.avg_price)
+        if not parent.done.done():
+            parent.done.set_result(parent)
@@ -0,0 +1,412 @@
+"""
+Tick-level, event-driven execution simulator.
+
+MatchingEngine replays recorded or synthetic depth and keeps *our* orders
+in price-time queues against it:
+  • order / cancel arrival delayed by a (sampled) latency
+  • aggressive orders walk the book → partial fills across levels
+  • passive orders join the back of the displayed queue; size that leaves
+    the level ahead of us (prints first, then pro-rata cancels) moves us up
+  • a book that trades through our price fills us at our limit
+  • our taken liquidity shifts later replayed prices by ImpactModel.eta
+SimIB wraps one engine per symbol behind the ib_insync calls Broker uses
+(placeOrder / cancelOrder / reqMktDepth / pendingTickersEvent) and drives
+real ib_insync Trade objects and their events.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+import itertools
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+from eventkit import Event
+from ib_insync import (
+    CommissionReport,
+    Contract,
+    DOMLevel,
+    Execution,
+    Fill,
+    Order,
+    OrderStatus,
+    Ticker,
+    Trade,
+)
+
+from data_ingestion.lob_stream import LobTick
+from execution.impact_model import ImpactModel
+from utils.logger import get_logger
+
+log = get_logger("EXEC_SIM")
+
+Level = Tuple[float, int]
+Latency = float | Callable[[], float]
+
+
+@dataclass
+class SimFill:
+    order_id: int
+    ts: float
+    price: float
+    qty: int
+    liquidity: str  # "MAKER" | "TAKER"
+
+
+@dataclass
+class SimOrder:
+    order_id: int
+    side: str                 # "BUY" | "SELL"
+    qty: int
+    limit: float | None       # None → market
+    submit_ts: float
+    active_ts: float
+    filled: int = 0
+    queue_ahead: float = 0.0
+    resting: bool = False
+    done: bool = False
+    fills: List[SimFill] = field(default_factory=list)
+
+    @property
+    def remaining(self) -> int:
+        return self.qty - self.filled
+
+
+class MatchingEngine:
+    def __init__(
+        self,
+        latency_ms: Latency = 0.0,
+        impact: ImpactModel | None = None,
+        on_fill: Callable[[SimOrder, SimFill], None] | None = None,
+        tick: float = 0.01,
+        ids: Iterator[int] | None = None,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.impact = impact
+        self.tick = tick
+        self.on_fill = on_fill
+        self.bid: List[Level] = []
+        self.ask: List[Level] = []
+        self.ts = 0.0
+        self.orders: Dict[int, SimOrder] = {}
+        self._events: List[Tuple[float, int, str, int]] = []   # (ts, seq, kind, order_id)
+        self._seq = itertools.count()
+        self._ids = ids or itertools.count(1)                    # SimIB shares one across symbols
+        self._printed: Dict[Tuple[str, float], int] = {}        # prints since last depth
+        self._impact_px = 0.0                                    # permanent impact offset
+
+    # ---------- helpers ----------
+    def _latency(self) -> float:
+        lat = self.latency_ms() if callable(self.latency_ms) else self.latency_ms
+        return max(0.0, lat) / 1e3
+
+    @staticmethod
+    def _size_at(book: List[Level], px: float) -> int:
+        for p, s in book:
+            if abs(p - px) < 1e-9:
+                return s
+        return 0
+
+    def _fill(self, o: SimOrder, px: float, qty: int, liquidity: str) -> None:
+        qty = min(qty, o.remaining)
+        if qty <= 0:
+            return
+        o.filled += qty
+        f = SimFill(o.order_id, self.ts, px, qty, liquidity)
+        o.fills.append(f)
+        if o.remaining == 0:
+            o.done = True
+            o.resting = False
+        if self.on_fill:
+            self.on_fill(o, f)
+
+    def _shift(self) -> float:
+        """Permanent impact of our own flow, on the tick grid."""
+        return round(self._impact_px / self.tick) * self.tick
+
+    def mid(self) -> float:
+        if self.bid and self.ask:
+            return (self.bid[0][0] + self.ask[0][0]) / 2
+        return self.bid[0][0] if self.bid else self.ask[0][0] if self.ask else 0.0
+
+    # ---------- order entry (caller side) ----------
+    def submit(self, ts: float, side: str, qty: int, limit: float | None = None) -> SimOrder:
+        oid = next(self._ids)
+        o = SimOrder(oid, side, int(qty), limit, ts, ts + self._latency())
+        self.orders[oid] = o
+        heapq.heappush(self._events, (o.active_ts, next(self._seq), "arrive", oid))
+        return o
+
+    def cancel(self, ts: float, order_id: int) -> None:
+        heapq.heappush(self._events, (ts + self._latency(), next(self._seq), "cancel", order_id))
+
+    # ---------- event loop ----------
+    def advance(self, ts: float) -> None:
+        """Process our arrivals / cancels scheduled up to ts."""
+        while self._events and self._events[0][0] <= ts:
+            ev_ts, _, kind, oid = heapq.heappop(self._events)
+            self.ts = ev_ts
+            o = self.orders[oid]
+            if o.done:
+                continue
+            if kind == "cancel":
+                o.done, o.resting = True, False
+            else:
+                self._arrive(o)
+        self.ts = max(self.ts, ts)
+
+    def _arrive(self, o: SimOrder) -> None:
+        self._sweep(o)
+        if o.done:
+            return
+        if o.limit is None:
+            return  # market remainder sweeps again on the next depth update
+        own = self.bid if o.side == "BUY" else self.ask
+        o.queue_ahead = self._size_at(own, o.limit)
+        o.resting = True
+
+    def _sweep(self, o: SimOrder) -> None:
+        """Take liquidity from the opposite side up to the limit."""
+        book = self.ask if o.side == "BUY" else self.bid
+        taken = 0
+        while book and o.remaining:
+            px, size = book[0]
+            if o.limit is not None and (px > o.limit if o.side == "BUY" else px < o.limit):
+                break
+            q = min(size, o.remaining)
+            self._fill(o, px, q, "TAKER")
+            taken += q
+            if q == size:
+                book.pop(0)
+            else:
+                book[0] = (px, size - q)
+        if taken and self.impact is not None:
+            depth = sum(s for _, s in book) + taken
+            sign = 1 if o.side == "BUY" else -1
+            self._impact_px += sign * self.impact.eta * taken / max(depth, 1)
+
+    # ---------- market data (replayed) ----------
+    def on_depth(self, ts: float, bid: List[Level], ask: List[Level]) -> None:
+        self.advance(ts)
+        shift = self._shift()
+        new_bid = [(round(p + shift, 6), int(s)) for p, s in bid]
+        new_ask = [(round(p + shift, 6), int(s)) for p, s in ask]
+
+        for o in self.orders.values():
+            if o.done:
+                continue
+            if not o.resting:               # working market order
+                continue
+            opp = new_ask if o.side == "BUY" else new_bid
+            # book traded through our price → we were filled first
+            if opp and (opp[0][0] <= o.limit if o.side == "BUY" else opp[0][0] >= o.limit):
+                self._fill(o, o.limit, o.remaining, "MAKER")
+                continue
+            own_old = self.bid if o.side == "BUY" else self.ask
+            own_new = new_bid if o.side == "BUY" else new_ask
+            s_old, s_new = self._size_at(own_old, o.limit), self._size_at(own_new, o.limit)
+            gone = max(0, s_old - s_new - self._printed.get((o.side, o.limit), 0))
+            if gone and s_old:
+                o.queue_ahead = max(0.0, o.queue_ahead - gone * o.queue_ahead / s_old)
+
+        self.bid, self.ask = new_bid, new_ask
+        self._printed.clear()
+        for o in self.orders.values():
+            if not o.done and not o.resting and o.active_ts <= ts:
+                self._sweep(o)
+
+    def on_trade(self, ts: float, price: float, size: int) -> None:
+        """Public print: consumes queue ahead of us at that price, then us."""
+        self.advance(ts)
+        price = round(price + self._shift(), 6)
+        for o in sorted(self.orders.values(), key=lambda x: x.active_ts):
+            if o.done or not o.resting or size <= 0:
+                continue
+            through = price < o.limit if o.side == "BUY" else price > o.limit
+            at = abs(price - o.limit) < 1e-9
+            if through:
+                q = min(size, o.remaining)
+                self._fill(o, o.limit, q, "MAKER")
+                size -= q
+            elif at:
+                key = (o.side, o.limit)
+                self._printed[key] = self._printed.get(key, 0) + size
+                eaten = min(size, o.queue_ahead)
+                o.queue_ahead -= eaten
+                q = min(size - int(eaten), o.remaining)
+                self._fill(o, o.limit, q, "MAKER")
+                size -= int(eaten) + q
+
+
+# ---------------- ib_insync-compatible facade ----------------
+class SimIB:
+    """
+    The slice of ib_insync.IB on Broker's order path, backed by MatchingEngines.
+    Time is whatever the replayed events say (clock() for order timestamps).
+    """
+
+    def __init__(
+        self,
+        latency_ms: Latency = 0.0,
+        impact: ImpactModel | None = None,
+        depth: int = 5,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.impact = impact
+        self.depth = depth
+        self.now = 0.0
+        self.engines: Dict[str, MatchingEngine] = {}
+        self.tickers: Dict[str, Ticker] = {}
+        self.trades: Dict[int, Trade] = {}
+        self._order_ids = itertools.count(1)   # like IB: order ids unique across contracts
+        self.arrival_mid: Dict[int, float] = {}
+        self.pendingTickersEvent = Event("pendingTickersEvent")
+        self._contracts: Dict[str, Contract] = {}
+
+    # ---------- plumbing ----------
+    def clock(self) -> float:
+        return self.now
+
+    def _engine(self, contract: Contract) -> MatchingEngine:
+        sym = contract.symbol
+        if sym not in self.engines:
+            self.engines[sym] = MatchingEngine(self.latency_ms, self.impact, self._on_fill, ids=self._order_ids)
+            self._contracts[sym] = contract
+        return self.engines[sym]
+
+    def _ticker(self, contract: Contract) -> Ticker:
+        self._engine(contract)
+        return self.tickers.setdefault(contract.symbol, Ticker(contract=contract))
+
+    def _on_fill(self, o: SimOrder, f: SimFill) -> None:
+        trade = self.trades[o.order_id]
+        st = trade.orderStatus
+        prev = st.filled
+        st.filled = o.filled
+        st.remaining = o.remaining
+        st.avgFillPrice = (st.avgFillPrice * prev + f.price * f.qty) / o.filled
+        st.lastFillPrice = f.price
+        st.status = OrderStatus.Filled if o.done else OrderStatus.Submitted
+        when = dt.datetime.fromtimestamp(f.ts, dt.timezone.utc)
+        fill = Fill(
+            trade.contract,
+            Execution(
+                execId=f"sim-{o.order_id}-{len(o.fills)}", time=when, side="BOT" if o.side == "BUY" else "SLD",
+                shares=f.qty, price=f.price, orderId=o.order_id, cumQty=o.filled,
+                avgPrice=st.avgFillPrice, lastLiquidity=1 if f.liquidity == "MAKER" else 2,
+            ),
+            CommissionReport(),
+            when,
+        )
+        trade.fills.append(fill)
+        trade.fillEvent.emit(trade, fill)
+        trade.statusEvent.emit(trade)
+        if o.done:
+            trade.filledEvent.emit(trade)
+
+    # ---------- IB API subset ----------
+    def placeOrder(self, contract: Contract, order: Order) -> Trade:
+        eng = self._engine(contract)
+        limit = order.lmtPrice if order.orderType == "LMT" else None
+        o = eng.submit(self.now, order.action, int(order.totalQuantity), limit)
+        order.orderId = o.order_id
+        trade = Trade(contract, order, OrderStatus(orderId=o.order_id, status=OrderStatus.PendingSubmit,
+                                                   remaining=order.totalQuantity))
+        self.trades[o.order_id] = trade
+        self.arrival_mid[o.order_id] = eng.mid()
+        return trade
+
+    def cancelOrder(self, order: Order) -> Trade | None:
+        trade = self.trades.get(order.orderId)
+        if trade is None:
+            return None
+        eng = self.engines[trade.contract.symbol]
+        eng.cancel(self.now, order.orderId)
+        trade.orderStatus.status = OrderStatus.PendingCancel
+        return trade
+
+    def reqMktDepth(self, contract: Contract, numRows: int = 5, isSmartDepth: bool = False,
+                    mktDepthOptions=None) -> Ticker:
+        return self._ticker(contract)
+
+    def cancelMktDepth(self, contract: Contract, isSmartDepth: bool = False) -> None:
+        pass
+
+    def reqMarketDataType(self, marketDataType: int) -> None:
+        pass
+
+    # ---------- replay drivers ----------
+    def feed_depth(self, contract: Contract, ts: float, bid: List[Level], ask: List[Level]) -> None:
+        self.now = max(self.now, ts)
+        eng = self._engine(contract)
+        eng.on_depth(ts, bid, ask)
+        self._sync_status(eng)
+        t = self._ticker(contract)
+        t.domBids = [DOMLevel(p, s, "SIM") for p, s in eng.bid[: self.depth]]
+        t.domAsks = [DOMLevel(p, s, "SIM") for p, s in eng.ask[: self.depth]]
+        t.time = dt.datetime.fromtimestamp(ts, dt.timezone.utc)
+        self.pendingTickersEvent.emit({t})
+
+    def feed_trade(self, contract: Contract, ts: float, price: float, size: int) -> None:
+        self.now = max(self.now, ts)
+        eng = self._engine(contract)
+        eng.on_trade(ts, price, size)
+        self._sync_status(eng)
+
+    def replay(self, ticks: Iterable[LobTick]) -> None:
+        for tick in ticks:
+            self.feed_depth(tick.contract, tick.ts, tick.bid, tick.ask)
+
+    def _sync_status(self, eng: MatchingEngine) -> None:
+        """Arrivals → Submitted, cancelled remainders → Cancelled (fills are pushed via _on_fill)."""
+        for oid, o in list(eng.orders.items()):   # handlers may place orders (cancel/replace)
+            trade = self.trades.get(oid)
+            if trade is None or trade.isDone():
+                continue
+            st = trade.orderStatus
+            if o.done and o.remaining:
+                st.status = OrderStatus.Cancelled
+                trade.statusEvent.emit(trade)
+                trade.cancelledEvent.emit(trade)
+            elif st.status == OrderStatus.PendingSubmit and o.active_ts <= eng.ts:
+                st.status = OrderStatus.Submitted
+                trade.statusEvent.emit(trade)
+
+    # ---------- cost report ----------
+    def cost_report(self) -> Dict[str, float]:
+        """Fill ratio, implementation shortfall vs arrival mid (bps, signed cost) and maker share."""
+        rows = []
+        for oid, trade in self.trades.items():
+            st = trade.orderStatus
+            mid = self.arrival_mid.get(oid) or 0.0
+            if not st.filled or not mid:
+                rows.append((0.0, 0.0, 0.0, trade.order.totalQuantity))
+                continue
+            sign = 1 if trade.order.action == "BUY" else -1
+            maker = sum(f.execution.shares for f in trade.fills if f.execution.lastLiquidity == 1)
+            rows.append((sign * (st.avgFillPrice - mid) / mid * 1e4, st.filled, maker, trade.order.totalQuantity))
+        if not rows:
+            return {"orders": 0}
+        a = np.array(rows, dtype=np.float64)
+        filled = a[:, 1].sum()
+        return {
+            "orders": len(rows),
+            "fill_ratio": float(filled / a[:, 3].sum()),
+            "shortfall_bps": float((a[:, 0] * a[:, 1]).sum() / filled) if filled else 0.0,
+            "maker_share": float(a[:, 2].sum() / filled) if filled else 0.0,
+        }
+
+
+def random_walk_depth(
+    contract: Contract, n: int, mid: float = 100.0, tick: float = 0.01, dt_s: float = 0.1,
+    depth: int = 5, seed: int | None = None, t0: float = 0.0,
+) -> Iterator[LobTick]:
+    """Synthetic depth: mid random walk in ticks, lognormal level sizes."""
+    rng = random.Random(seed)
+    for i in range(n):
+        mid += tick * rng.choice((-1, 0, 0, 1))
+        bid = [(round(mid - tick * (k + 1), 4), int(rng.lognormvariate(4.6, 0.6))) for k in range(depth)]
+        ask = [(round(mid + tick * (k + 1), 4), int(rng.lognormvariate(4.6, 0.6))) for k in range(depth)]
+        yield LobTick(contract, bid, ask, t0 + i * dt_s, 0)
@@ -0,0 +1,190 @@
+"""
+In-process stand-in for ib_insync.IB.
+
+FakeIB = SimIB (matching engine, orders, fills, depth) + a cash account:
+accountValues / positions / reqMktData are marked to the replayed prices,
+reqMktDepth answers with a snapshot after a configurable market-data
+latency, and every placeOrder is time-stamped for latency measurement.
+Broker, Supervisor, PortfolioRisk, RegTGuard and PnLTracker run against it
+unchanged (pass it as Broker(..., ib=FakeIB())).
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from ib_insync import Contract, Order, Ticker, Trade
+
+from execution.exec_sim import Latency, SimFill, SimIB, SimOrder
+from execution.impact_model import ImpactModel
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("FAKE_IB")
+
+FAKE_CFG = cfg.get("fake_ib", {})
+
+
+@dataclass
+class FakeAccountValue:
+    tag: str
+    value: str
+    currency: str = "USD"
+    account: str = "SIM"
+    modelCode: str = ""
+    # summary fields read straight off the first row by Broker / PnLTracker
+    netLiquidation: float = 0.0
+    excessLiquidity: float = 0.0
+    grossPositionValue: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return self.tag
+
+
+@dataclass
+class FakePosition:
+    contract: Contract
+    position: float
+    avgCost: float
+    unrealPNL: float = 0.0
+    realPNL: float = 0.0
+    account: str = "SIM"
+
+    @property
+    def averageCost(self) -> float:
+        return self.avgCost
+
+
+@dataclass
+class _Book:
+    qty: int = 0
+    avg: float = 0.0
+    real: float = 0.0
+    contract: Contract | None = field(default=None, repr=False)
+
+
+class FakeIB(SimIB):
+    def __init__(
+        self,
+        nav: float = FAKE_CFG.get("nav", 100_000.0),
+        latency_ms: Latency = FAKE_CFG.get("order_latency_ms", 0.0),
+        md_latency_ms: Latency = FAKE_CFG.get("md_latency_ms", 0.0),
+        impact: ImpactModel | None = None,
+        depth: int = 5,
+    ) -> None:
+        super().__init__(latency_ms, impact, depth)
+        self.cash = float(nav)
+        self.md_latency_ms = md_latency_ms
+        self.book: Dict[str, _Book] = {}
+        self.order_log: List[Tuple[int, int]] = []   # (perf_counter_ns at placeOrder, orderId)
+
+    # ---------- connection (no-ops) ----------
+    def isConnected(self) -> bool:
+        return True
+
+    async def connectAsync(self, *args, **kwargs) -> "FakeIB":
+        return self
+
+    def disconnect(self) -> None:
+        pass
+
+    # ---------- account ----------
+    def _mark(self, symbol: str) -> float:
+        t = self.tickers.get(symbol)
+        if t is not None and t.last is not None and not math.isnan(t.last):
+            return float(t.last)
+        eng = self.engines.get(symbol)
+        return eng.mid() if eng is not None and eng.bid and eng.ask else 0.0
+
+    def _totals(self) -> Tuple[float, float]:
+        value = gross = 0.0
+        for sym, b in self.book.items():
+            v = b.qty * self._mark(sym)
+            value += v
+            gross += abs(v)
+        return self.cash + value, gross
+
+    def accountValues(self, account: str = "") -> List[FakeAccountValue]:
+        nav, gross = self._totals()
+        excess = nav - 0.25 * gross          # maintenance margin 25 %
+        sma = max(nav - 0.5 * gross, 0.0)    # Reg-T initial margin 50 %
+        rows = {
+            "NetLiquidation": nav,
+            "TotalCashValue": self.cash,
+            "GrossPositionValue": gross,
+            "ExcessLiquidity": excess,
+            "SMA": sma,
+            "BuyingPower": 4 * excess,
+        }
+        return [
+            FakeAccountValue(k, f"{v:.2f}", netLiquidation=nav, excessLiquidity=excess, grossPositionValue=gross)
+            for k, v in rows.items()
+        ]
+
+    def positions(self, account: str = "") -> List[FakePosition]:
+        out = []
+        for sym, b in self.book.items():
+            if b.qty:
+                unreal = b.qty * (self._mark(sym) - b.avg)
+                out.append(FakePosition(b.contract, float(b.qty), b.avg, unreal, b.real))
+        return out
+
+    def _on_fill(self, o: SimOrder, f: SimFill) -> None:
+        super()._on_fill(o, f)
+        contract = self.trades[o.order_id].contract
+        b = self.book.setdefault(contract.symbol, _Book(contract=contract))
+        signed = f.qty if o.side == "BUY" else -f.qty
+        if b.qty == 0 or (b.qty > 0) == (signed > 0):
+            b.avg = (b.avg * abs(b.qty) + f.price * f.qty) / (abs(b.qty) + f.qty)
+        else:
+            closed = min(abs(b.qty), f.qty)
+            b.real += closed * (f.price - b.avg) * (1 if b.qty > 0 else -1)
+            if f.qty > abs(b.qty):       # flipped through flat
+                b.avg = f.price
+        b.qty += signed
+        if b.qty == 0:
+            b.avg = 0.0
+        self.cash -= signed * f.price
+
+    # ---------- market data ----------
+    def reqMktData(self, contract: Contract, genericTickList: str = "", snapshot: bool = False,
+                   regulatorySnapshot: bool = False, mktDataOptions=None) -> Ticker:
+        return self._ticker(contract)
+
+    def reqMktDepth(self, contract: Contract, numRows: int = 5, isSmartDepth: bool = False,
+                    mktDepthOptions=None) -> Ticker:
+        """Like IB: returns the ticker and pushes the current book as a pendingTickersEvent."""
+        t = self._ticker(contract)
+        if t.domBids and t.domAsks:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return t
+            lat = self.md_latency_ms() if callable(self.md_latency_ms) else self.md_latency_ms
+            loop.call_later(max(lat, 0.0) / 1e3, self.pendingTickersEvent.emit, {t})
+        return t
+
+    # ---------- orders ----------
+    def placeOrder(self, contract: Contract, order: Order) -> Trade:
+        trade = super().placeOrder(contract, order)
+        self.order_log.append((time.perf_counter_ns(), trade.order.orderId))
+        return trade
+
+    # ---------- replay drivers ----------
+    def feed_trade(self, contract: Contract, ts: float, price: float, size: int) -> None:
+        super().feed_trade(contract, ts, price, size)
+        t = self._ticker(contract)
+        t.last = price
+        t.volume = (0.0 if math.isnan(t.volume) else t.volume) + size   # cumulative, like IB's day volume
+
+    def quote(self, contract: Contract, ts: float, price: float, tick: float = 0.01, size: int = 100) -> None:
+        """Bar-level replay: a synthetic ladder around `price`, which also becomes `last`."""
+        bid = [(round(price - tick * k, 6), size) for k in range(1, self.depth + 1)]
+        ask = [(round(price + tick * k, 6), size) for k in range(1, self.depth + 1)]
+        self._ticker(contract).last = price
+        self.feed_depth(contract, ts, bid, ask)
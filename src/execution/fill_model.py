@@ -1,40 +1,166 @@
-"""Online logistic regression for fill-prob given (qty, queue_ahead, latency)."""
-import joblib
+"""
+Online logistic regression for fill-prob given (qty, queue_ahead, latency).
+
+  • one feature vector for predict() and update() – features()
+  • update() is one AdaGrad step on running-standardised features: O(1), no refits
+  • a model per symbol (FillModels), each persisted to models/fillmodel_<SYM>.npz
+  • snapshots are copied on the loop and written by one background thread
+    every `fill.snapshot_every` updates – the order path never touches disk
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
 import numpy as np
-from sklearn.linear_model import LogisticRegression
+from prometheus_client import Counter
 
 from utils.config import load_config
 from utils.logger import get_logger
-from data_ingestion.lob_stream import LobTick
 
 cfg = load_config()
 log = get_logger("FILL_MODEL")
 
+FILL_CFG = cfg.get("fill", {})
+MODEL_DIR = FILL_CFG.get("model_dir", "models")
+N_FEATURES = 4
+
+FILL_UPDATES = Counter("fill_model_updates_total", "Online fill-model updates", ["symbol"])
+FILL_SNAPSHOTS = Counter("fill_model_snapshots_total", "Fill-model snapshots written", ["result"])
+
+_writer = ThreadPoolExecutor(1, "fill-model")   # one writer: snapshots land in order
+
+
+def features(qty: int, queue_ahead: int, latency_us: int) -> np.ndarray:
+    q, a = max(qty, 0), max(queue_ahead, 0)
+    return np.array([math.log1p(q), math.log1p(a), math.log1p(max(latency_us, 0) / 1e3),
+                     math.log1p(a / (q + 1))])
+
+
 class FillModel:
-    def __init__(self, symbol: str) -> None:
+    def __init__(
+        self,
+        symbol: str,
+        lr: float = FILL_CFG.get("lr", 0.1),
+        l2: float = FILL_CFG.get("l2", 1e-4),
+        min_samples: int = FILL_CFG.get("min_samples", 50),
+        snapshot_every: int = FILL_CFG.get("snapshot_every", 200),
+    ) -> None:
         self.symbol = symbol
-        self.model = LogisticRegression()
-        self._X: list[list[float]] = []
-        self._y: list[int] = []
-        self.path = f"models/fillmodel_{symbol}.joblib"
-        try:
-            self.model = joblib.load(self.path)
-        except FileNotFoundError:
-            pass
+        self.lr = lr
+        self.l2 = l2
+        self.min_samples = min_samples
+        self.snapshot_every = snapshot_every
+        self.path = os.path.join(MODEL_DIR, f"fillmodel_{symbol}.npz")
+        self.w = np.zeros(N_FEATURES)
+        self.b = 0.0
+        self.g2 = np.full(N_FEATURES + 1, 1e-8)   # AdaGrad accumulators (weights + bias)
+        self.mean = np.zeros(N_FEATURES)          # running standardisation (Welford)
+        self.m2 = np.zeros(N_FEATURES)
+        self.n = 0
+        self._dirty = 0
+        self._saving: asyncio.Future | None = None
+        self._load()
+
+    # ---------- inference ----------
+    def _z(self, x: np.ndarray) -> np.ndarray:
+        std = np.sqrt(self.m2 / self.n) if self.n > 1 else np.ones(N_FEATURES)
+        return (x - self.mean) / np.where(std > 1e-9, std, 1.0)
 
     def predict(self, qty: int, queue_ahead: int, latency_us: int) -> float:
         """Return probability[0,1] that entire qty fills at passive price."""
-        if not hasattr(self.model, "coef_"):
+        if self.n < self.min_samples:
             return 0.5  # cold start
-        X = np.array([[qty, queue_ahead, latency_us]])
-        return float(self.model.predict_proba(X)[0, 1])
-
-    def update(self, lob: LobTick, qty: int, filled: bool) -> None:
-        """Online learning after each order."""
-        self._X.append([qty, lob.latency_us, lob.ask[0][1] if lob.ask else 0])
-        self._y.append(int(filled))
-        if len(self._X) > 1000:  # mini-batch
-            self.model.fit(self._X, self._y)
-            joblib.dump(self.model, self.path)
-            self._X.clear()
-            self._y.clear()
\ No newline at end of file
+        s = float(self.w @ self._z(features(qty, queue_ahead, latency_us))) + self.b
+        return 1.0 / (1.0 + math.exp(-max(min(s, 50.0), -50.0)))
+
+    # ---------- learning ----------
+    def update(self, qty: int, queue_ahead: int, latency_us: int, filled: bool) -> None:
+        """Online learning after each order – same features as predict()."""
+        x = features(qty, queue_ahead, latency_us)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+        z = self._z(x)
+        s = float(self.w @ z) + self.b
+        err = 1.0 / (1.0 + math.exp(-max(min(s, 50.0), -50.0))) - float(filled)
+        grad = np.append(err * z + self.l2 * self.w, err)
+        self.g2 += grad * grad
+        step = self.lr * grad / np.sqrt(self.g2)
+        self.w -= step[:-1]
+        self.b -= float(step[-1])
+
+        FILL_UPDATES.labels(symbol=self.symbol).inc()
+        self._dirty += 1
+        if self._dirty >= self.snapshot_every:
+            self.snapshot()
+
+    # ---------- persistence ----------
+    def _state(self) -> Dict[str, np.ndarray]:
+        return {"w": self.w.copy(), "b": np.array(self.b), "g2": self.g2.copy(),
+                "mean": self.mean.copy(), "m2": self.m2.copy(), "n": np.array(self.n)}
+
+    def _load(self) -> None:
+        try:
+            with np.load(self.path) as s:
+                if s["w"].shape != (N_FEATURES,):
+                    raise ValueError(f"feature count {s['w'].shape} != {N_FEATURES}")
+                self.w, self.b, self.g2 = s["w"], float(s["b"]), s["g2"]
+                self.mean, self.m2, self.n = s["mean"], s["m2"], int(s["n"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log.warning("Ignoring fill model %s: %s", self.path, e)
+
+    @staticmethod
+    def _write(path: str, state: Dict[str, np.ndarray]) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **state)
+        os.replace(tmp, path)     # readers never see a half-written file
+
+    def snapshot(self) -> None:
+        """Copy the weights now; write them in the background (synchronously with no loop)."""
+        if self._saving is not None and not self._saving.done():
+            return  # one in flight – the next update retries
+        self._dirty = 0
+        state = self._state()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self.path, state)
+            FILL_SNAPSHOTS.labels(result="ok").inc()
+            return
+        self._saving = loop.run_in_executor(_writer, self._write, self.path, state)
+        self._saving.add_done_callback(self._saved)
+
+    def _saved(self, fut: asyncio.Future) -> None:
+        if fut.exception() is not None:
+            FILL_SNAPSHOTS.labels(result="error").inc()
+            log.warning("Fill model snapshot %s failed: %s", self.path, fut.exception())
+        else:
+            FILL_SNAPSHOTS.labels(result="ok").inc()
+
+
+class FillModels:
+    """Per-symbol fill models, created (and loaded) on first use."""
+
+    def __init__(self, **kwargs) -> None:
+        self.kwargs = kwargs
+        self.models: Dict[str, FillModel] = {}
+
+    def __getitem__(self, symbol: str) -> FillModel:
+        m = self.models.get(symbol)
+        if m is None:
+            m = self.models[symbol] = FillModel(symbol, **self.kwargs)
+        return m
+
+    def snapshot(self) -> None:
+        for m in self.models.values():
+            if m._dirty:
+                m.snapshot()
@@ -0,0 +1,133 @@
+"""
+Flatten every position – concurrently, confirmed, under one deadline.
+
+Each round reads positions once, sends a closing market order for every
+non-flat contract at the same time (through OrderManager, with a per-attempt
+timeout), and waits for all of them to reach a terminal state. The next
+round re-reads positions – the broker's view, not our fill arithmetic – and
+re-sends whatever is left: timed-out orders were cancelled by OrderManager,
+rejections and fills that raced a cancel show up here. Rounds stop when a
+read comes back flat, on `flatten.max_rounds`, or at `flatten.deadline_s`.
+The report's residual always comes from a final positions() read.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from ib_insync import Contract, MarketOrder
+from prometheus_client import Counter, Gauge, Histogram
+
+from execution.order_manager import ManagedOrder, OrderManager, OrderState
+from utils.clock import get_clock
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("FLATTEN")
+
+FLATTEN_CFG = cfg.get("flatten", {})
+
+FLATTEN_SECONDS = Histogram("flatten_seconds", "flatten_all start → final positions read",
+                            buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60))
+FLATTEN_ORDERS = Counter("flatten_orders_total", "Closing orders sent by flatten_all", ["round"])
+FLATTEN_RESIDUAL = Gauge("flatten_residual_positions", "Positions still open after the last flatten_all")
+
+
+@dataclass
+class FlattenReport:
+    started: float
+    positions: int = 0                                    # non-flat at the first read
+    orders: int = 0
+    rounds: int = 0
+    escalations: int = 0                                  # orders re-sent after round 1
+    closed: Dict[str, int] = field(default_factory=dict)  # symbol → signed qty closed by our orders
+    residual: Dict[str, int] = field(default_factory=dict)  # symbol → signed qty still open (final read)
+    failed: List[str] = field(default_factory=list)       # "SYM: state" for orders that ended unfilled
+    elapsed_s: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def complete(self) -> bool:
+        return not self.residual
+
+
+class Flattener:
+    def __init__(
+        self,
+        ib,
+        orders: OrderManager,
+        deadline_s: float = FLATTEN_CFG.get("deadline_s", 30),
+        attempt_timeout_s: float = FLATTEN_CFG.get("attempt_timeout_s", 5),
+        max_rounds: int = FLATTEN_CFG.get("max_rounds", 3),
+    ) -> None:
+        self.ib = ib
+        self.orders = orders
+        self.deadline_s = deadline_s
+        self.attempt_timeout_s = attempt_timeout_s
+        self.max_rounds = max_rounds
+
+    def _open_positions(self) -> Dict[Tuple, Tuple[Contract, int]]:
+        """One positions() read, netted per contract (several accounts may hold the same one)."""
+        out: Dict[Tuple, Tuple[Contract, int]] = {}
+        for p in self.ib.positions():
+            key = (p.contract.conId, p.contract.symbol, p.contract.secType)
+            c, q = out.get(key, (p.contract, 0))
+            out[key] = (c, q + int(p.position))
+        return {k: v for k, v in out.items() if v[1] != 0}
+
+    async def run(self, deadline_s: float | None = None) -> FlattenReport:
+        clock = get_clock()
+        report = FlattenReport(started=clock.time())
+        deadline = report.started + (self.deadline_s if deadline_s is None else deadline_s)
+        open_ = self._open_positions()
+        report.positions = len(open_)
+
+        while open_ and report.rounds < self.max_rounds:
+            remaining = deadline - clock.time()
+            if remaining <= 0:
+                report.timed_out = True
+                break
+            report.rounds += 1
+            sent: List[Tuple[str, int, ManagedOrder]] = []
+            for contract, qty in open_.values():
+                mo = self.orders.submit(contract, MarketOrder("SELL" if qty > 0 else "BUY", abs(qty)),
+                                        timeout_s=min(self.attempt_timeout_s, remaining))
+                sent.append((contract.symbol, 1 if qty > 0 else -1, mo))
+            report.orders += len(sent)
+            if report.rounds > 1:
+                report.escalations += len(sent)
+            FLATTEN_ORDERS.labels(round=str(report.rounds)).inc(len(sent))
+
+            if not await self._settle([mo for _, _, mo in sent], deadline - clock.time()):
+                report.timed_out = True
+            for sym, sign, mo in sent:
+                if mo.filled:
+                    report.closed[sym] = report.closed.get(sym, 0) + sign * mo.filled
+                if mo.state.terminal and mo.state != OrderState.FILLED:
+                    report.failed.append(f"{sym}: {mo.state.value} ({mo.filled}/{mo.qty})")
+            if report.timed_out:
+                break
+            open_ = self._open_positions()
+
+        final = self._open_positions()
+        report.residual = {c.symbol: q for c, q in final.values()}
+        report.elapsed_s = clock.time() - report.started
+        FLATTEN_SECONDS.observe(report.elapsed_s)
+        FLATTEN_RESIDUAL.set(len(report.residual))
+        return report
+
+    async def _settle(self, mos: List[ManagedOrder], timeout_s: float) -> bool:
+        """Wait for every order to be terminal; False if the deadline came first."""
+        pending = {mo.done for mo in mos if not mo.state.terminal}
+        if not pending:
+            return True
+        sleeper = asyncio.ensure_future(get_clock().sleep(max(timeout_s, 0.0)))
+        try:
+            while pending and not sleeper.done():
+                done, _ = await asyncio.wait(pending | {sleeper}, return_when=asyncio.FIRST_COMPLETED)
+                pending -= done
+        finally:
+            sleeper.cancel()
+        return not pending
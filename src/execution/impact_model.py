@@ -1,8 +1,14 @@
 """
 Almgren-Chriss style market-impact + passive-fill probability.
+
+Cumulative depth is built once per book snapshot and side (LobTicks are
+snapshots – never mutated – so the object identity and timestamp give the
+book version). After that, any number of candidate quantities can be
+evaluated in one vectorised call. `max_qty` finds the largest quantity
+that fits a slippage and/or cost budget.
 """
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Dict, Sequence, Tuple
 
 import numpy as np
 
@@ -12,32 +18,143 @@ from data_ingestion.lob_stream import LobTick
 class ImpactEstimate:
     expected_price: float
     expected_participation: float  # % of qty that will fill passively
-    slippage_bps: float
+    slippage_bps: float            # book walk: marginal level vs touch (signed)
+    temporary_impact: float = 0.0  # USD/share, gamma · qty / depth
+    permanent_impact: float = 0.0  # USD/share, eta · qty / depth
+    cost_bps: float = 0.0          # slippage + temporary + permanent, vs touch
+
+
+@dataclass
+class ImpactBatch:
+    """ImpactEstimate fields as arrays, one entry per candidate quantity."""
+    qty: np.ndarray
+    expected_price: np.ndarray
+    expected_participation: np.ndarray
+    slippage_bps: np.ndarray
+    temporary_impact: np.ndarray
+    permanent_impact: np.ndarray
+    cost_bps: np.ndarray
+
+    def __getitem__(self, i: int) -> ImpactEstimate:
+        return ImpactEstimate(float(self.expected_price[i]), float(self.expected_participation[i]),
+                              float(self.slippage_bps[i]), float(self.temporary_impact[i]),
+                              float(self.permanent_impact[i]), float(self.cost_bps[i]))
+
+
+@dataclass(frozen=True)
+class _Depth:
+    px: np.ndarray     # level prices, touch first
+    cum: np.ndarray    # cumulative size per level
+    best: float
+    total: float
+
 
 class ImpactModel:
     def __init__(self, gamma: float = 0.5, eta: float = 0.1):
         self.gamma = gamma  # temporary impact coefficient
         self.eta = eta      # permanent impact coefficient
+        self._cache: Dict[str, Tuple[LobTick, float | None, _Depth | None]] = {}   # side → (lob, ts, depth)
 
-    def estimate(self, qty: int, side: str, lob: LobTick) -> ImpactEstimate:
+    # ---------- book ----------
+    def _depth(self, side: str, lob: LobTick) -> "_Depth | None":
+        ts = getattr(lob, "ts", None)   # backtest mock books carry no timestamp
+        hit = self._cache.get(side)
+        if hit is not None and hit[0] is lob and hit[1] == ts:
+            return hit[2]
         book = lob.ask if side == "BUY" else lob.bid
-        if not book:
+        depth = None
+        if book:
+            px = np.fromiter((p for p, _ in book), dtype=np.float64, count=len(book))
+            cum = np.cumsum(np.fromiter((s for _, s in book), dtype=np.float64, count=len(book)))
+            depth = _Depth(px, cum, float(px[0]), float(cum[-1]))
+        self._cache[side] = (lob, ts, depth)
+        return depth
+
+    # ---------- evaluation ----------
+    def estimate(self, qty: int, side: str, lob: LobTick) -> ImpactEstimate:
+        d = self._depth(side, lob)
+        if d is None:
             return ImpactEstimate(lob.ask[0][0] if side == "BUY" else lob.bid[0][0], 0.0, 0.0)
 
-        price_levels = np.array([p for p, _ in book])
-        sizes = np.array([s for _, s in book])
-        cum_size = np.cumsum(sizes)
-        idx = np.searchsorted(cum_size, qty)
-        if idx >= len(price_levels):
+        idx = int(np.searchsorted(d.cum, qty))
+        if idx >= len(d.px):
             # sweep book
-            expected_price = price_levels[-1]
+            expected_price = float(d.px[-1])
             participation = 0.0
         else:
-            expected_price = price_levels[idx]
-            participation = (cum_size[idx] - qty) / cum_size[idx]
+            expected_price = float(d.px[idx])
+            participation = float((d.cum[idx] - qty) / d.cum[idx])
+
+        temporary_impact = self.gamma * qty / d.total
+        permanent_impact = self.eta * qty / d.total
+        slip = expected_price - d.best
+        slippage = 1e4 * slip / d.best
+        cost = 1e4 * (abs(slip) + temporary_impact + permanent_impact) / d.best
+
+        return ImpactEstimate(expected_price, participation, slippage, temporary_impact, permanent_impact, cost)
 
-        temporary_impact = self.gamma * qty / cum_size[-1]
-        permanent_impact = self.eta * qty / cum_size[-1]
-        slippage = 1e4 * (expected_price - price_levels[0]) / price_levels[0]
+    def estimate_many(self, qty: Sequence[int] | np.ndarray, side: str | Sequence[str],
+                      lob: LobTick) -> ImpactBatch:
+        """`estimate` for a vector of quantities (and sides: one string or one per quantity)."""
+        q = np.asarray(qty, dtype=np.float64)
+        sides = np.full(q.shape, side) if isinstance(side, str) else np.asarray(side)
+        out = {k: np.zeros(q.shape) for k in ("expected_price", "expected_participation", "slippage_bps",
+                                               "temporary_impact", "permanent_impact", "cost_bps")}
+        for s in ("BUY", "SELL"):
+            m = sides == s
+            if not m.any():
+                continue
+            d = self._depth(s, lob)
+            if d is None:
+                out["expected_price"][m] = lob.ask[0][0] if s == "BUY" else lob.bid[0][0]
+                continue
+            qs = q[m]
+            idx = np.searchsorted(d.cum, qs)
+            inside = idx < len(d.px)
+            ci = np.minimum(idx, len(d.px) - 1)
+            price = d.px[ci]
+            temp, perm = self.gamma * qs / d.total, self.eta * qs / d.total
+            slip = price - d.best
+            out["expected_price"][m] = price
+            out["expected_participation"][m] = np.where(inside, (d.cum[ci] - qs) / d.cum[ci], 0.0)
+            out["slippage_bps"][m] = 1e4 * slip / d.best
+            out["temporary_impact"][m] = temp
+            out["permanent_impact"][m] = perm
+            out["cost_bps"][m] = 1e4 * (np.abs(slip) + temp + perm) / d.best
+        return ImpactBatch(q, **out)
 
-        return ImpactEstimate(expected_price, participation, slippage)
\ No newline at end of file
+    # ---------- solver ----------
+    def max_qty(self, side: str, lob: LobTick, max_slippage_bps: float | None = None,
+                max_cost_bps: float | None = None, upper: int | None = None) -> int:
+        """
+        Largest quantity whose |slippage| ≤ max_slippage_bps and cost ≤ max_cost_bps
+        (either budget may be None), capped at `upper` – or at the visible depth when
+        nothing else bounds it. Closed form per book level: slippage is constant
+        within a level and cost rises linearly in qty.
+        """
+        d = self._depth(side, lob)
+        if d is None:
+            return 0
+        hi = float(upper) if upper is not None else np.inf
+        # level j serves qty in (cum[j-1], cum[j]]; past the last level the sweep price holds
+        lo = np.concatenate(([0.0], d.cum))
+        top = np.concatenate((d.cum, [hi]))
+        slip = np.abs(np.concatenate((d.px, d.px[-1:])) - d.best)
+        ok = np.ones(len(top), dtype=bool)
+        if max_slippage_bps is not None:
+            ok &= 1e4 * slip / d.best <= max_slippage_bps + 1e-9
+        if max_cost_bps is not None:
+            room = max_cost_bps * d.best / 1e4 - slip             # USD/share left for impact
+            rate = (self.gamma + self.eta) / d.total              # impact USD/share per share of qty
+            if rate > 0:
+                top = np.minimum(top, np.floor(room / rate + 1e-9))
+            else:
+                ok &= room >= 0
+        top = np.minimum(top, hi)
+        ok &= top > lo                                           # at least one share fits in the level
+        if not ok[0]:
+            return 0
+        # budgets are monotone in qty: stop at the first level that doesn't fit
+        last = len(ok) - 1 if ok.all() else int(np.argmin(ok)) - 1
+        best = top[last]
+        return int(best) if np.isfinite(best) else int(d.cum[-1])
@@ -0,0 +1,245 @@
+"""
+Order lifecycle: one state machine per parent order, driven by IB status events.
+
+  PENDING → WORKING → PARTIAL → FILLED
+                   ↘           ↘ CANCELLED / REJECTED
+
+Each order gets a deadline (risk.max_order_timeout_sec). When it expires
+with quantity left, the working child is cancelled and – once IB confirms
+the cancel – the remainder is re-sent: re-priced at the touch up to
+`orders.max_reprices` times, then as a market order (`orders.final`:
+"aggressive") or left cancelled ("cancel"). Every cancel arms a watchdog
+(`orders.cancel_timeout_s`): if IB never confirms it, the cancel is re-sent
+and the parent is closed as CANCELLED rather than replaced – never more
+quantity while a child may still be live. A parent's `done` future
+resolves once it is terminal, so callers can `await mo.wait()`.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Tuple
+
+from ib_insync import Contract, LimitOrder, MarketOrder, Order, OrderStatus, Trade
+from prometheus_client import Counter, Histogram
+
+from utils.clock import get_clock
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("ORDER_MANAGER")
+
+ORDERS_CFG = cfg.get("orders", {})
+
+ORDER_DONE = Counter("order_terminal_total", "Parent orders by terminal state", ["state"])
+ORDER_REPLACES = Counter("order_replace_total", "Cancel/replace after timeout", ["mode"])
+ORDER_CANCEL_UNCONFIRMED = Counter("order_cancel_unconfirmed_total", "Cancels IB never confirmed")
+ORDER_LIFETIME = Histogram("order_lifetime_seconds", "Submit → terminal, per parent order",
+                           buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 300))
+
+
+class OrderState(str, Enum):
+    PENDING = "PENDING"
+    WORKING = "WORKING"
+    PARTIAL = "PARTIAL"
+    FILLED = "FILLED"
+    CANCELLED = "CANCELLED"
+    REJECTED = "REJECTED"
+
+    @property
+    def terminal(self) -> bool:
+        return self in (OrderState.FILLED, OrderState.CANCELLED, OrderState.REJECTED)
+
+
+@dataclass
+class ManagedOrder:
+    id: int
+    contract: Contract
+    action: str
+    qty: int
+    limit: float | None
+    timeout_s: float
+    created: float
+    state: OrderState = OrderState.PENDING
+    trades: List[Trade] = field(default_factory=list)   # children; the last one is live
+    reprices: int = 0
+    replacing: str | None = None                        # "reprice" | "aggressive" while a cancel is in flight
+    cancel_requested: bool = False
+    history: List[Tuple[float, OrderState]] = field(default_factory=list)
+    done: asyncio.Future | None = None
+
+    @property
+    def trade(self) -> Trade:
+        return self.trades[-1]
+
+    @property
+    def filled(self) -> int:
+        return int(sum(t.orderStatus.filled for t in self.trades))
+
+    @property
+    def remaining(self) -> int:
+        return self.qty - self.filled
+
+    @property
+    def avg_price(self) -> float:
+        notional = sum(t.orderStatus.filled * t.orderStatus.avgFillPrice for t in self.trades)
+        return notional / self.filled if self.filled else 0.0
+
+    @property
+    def passive_filled(self) -> bool:
+        """Filled in full by the first (passive) child, without any replace."""
+        return self.trades[0].orderStatus.filled >= self.qty
+
+    async def wait(self) -> "ManagedOrder":
+        return await asyncio.shield(self.done)
+
+
+class OrderManager:
+    def __init__(
+        self,
+        ib,
+        timeout_s: float = cfg["risk"].get("max_order_timeout_sec", 5),
+        max_reprices: int = ORDERS_CFG.get("max_reprices", 1),
+        final: str = ORDERS_CFG.get("final", "aggressive"),
+        cancel_timeout_s: float = ORDERS_CFG.get("cancel_timeout_s", 5),
+    ) -> None:
+        self.ib = ib
+        self.timeout_s = timeout_s
+        self.max_reprices = max_reprices
+        self.final = final
+        self.cancel_timeout_s = cancel_timeout_s
+        self.orders: Dict[int, ManagedOrder] = {}
+        self._ids = itertools.count(1)
+
+    # ---------- public API ----------
+    def submit(self, contract: Contract, order: Order, timeout_s: float | None = None) -> ManagedOrder:
+        """Place `order` and manage it; returns immediately (await `.wait()` for the outcome)."""
+        limit = order.lmtPrice if order.orderType == "LMT" else None
+        mo = ManagedOrder(next(self._ids), contract, order.action, int(order.totalQuantity), limit,
+                          self.timeout_s if timeout_s is None else timeout_s, get_clock().time())
+        mo.done = asyncio.get_running_loop().create_future()
+        mo.history.append((mo.created, mo.state))
+        self.orders[mo.id] = mo
+        self._place(mo, order)
+        asyncio.create_task(self._watch(mo))
+        return mo
+
+    def cancel(self, mo: ManagedOrder) -> None:
+        if mo.state.terminal:
+            return
+        mo.cancel_requested = True
+        mo.replacing = None
+        self._send_cancel(mo)
+
+    def open_orders(self, contract: Contract | None = None) -> List[ManagedOrder]:
+        return [mo for mo in self.orders.values()
+                if not mo.state.terminal and (contract is None or mo.contract == contract)]
+
+    # ---------- state machine ----------
+    def _send_cancel(self, mo: ManagedOrder) -> None:
+        self.ib.cancelOrder(mo.trade.order)
+        asyncio.create_task(self._watch_cancel(mo, mo.trade))
+
+    def _place(self, mo: ManagedOrder, order: Order) -> None:
+        trade = self.ib.placeOrder(mo.contract, order)
+        mo.trades.append(trade)
+        trade.statusEvent += lambda t, mo=mo: self._on_status(mo, t)
+
+    def _set(self, mo: ManagedOrder, state: OrderState) -> None:
+        if state == mo.state:
+            return
+        now = get_clock().time()
+        mo.state = state
+        mo.history.append((now, state))
+        if state.terminal:
+            self.orders.pop(mo.id, None)
+            ORDER_DONE.labels(state=state.value).inc()
+            ORDER_LIFETIME.observe(max(now - mo.created, 0.0))
+            if not mo.done.done():
+                mo.done.set_result(mo)
+
+    def _on_status(self, mo: ManagedOrder, trade: Trade) -> None:
+        if mo.state.terminal or trade is not mo.trade:
+            return
+        status = trade.orderStatus.status
+        if mo.filled >= mo.qty:
+            self._set(mo, OrderState.FILLED)
+        elif status == OrderStatus.Inactive:
+            log.warning("Order %s rejected: %s", mo.id, trade.log[-1].message if trade.log else "")
+            self._set(mo, OrderState.REJECTED)
+        elif status in OrderStatus.DoneStates:     # child cancelled (with the remainder open)
+            if mo.replacing and not mo.cancel_requested:
+                self._replace(mo)
+            else:
+                self._set(mo, OrderState.CANCELLED)
+        elif mo.filled > 0:
+            self._set(mo, OrderState.PARTIAL)
+        elif status in (OrderStatus.PreSubmitted, OrderStatus.Submitted):
+            self._set(mo, OrderState.WORKING)
+
+    def _touch(self, mo: ManagedOrder) -> float | None:
+        t = self.ib.reqMktData(mo.contract, "", False, False)
+        if mo.action == "BUY":
+            px = t.domAsks[0].price if t.domAsks else t.ask
+        else:
+            px = t.domBids[0].price if t.domBids else t.bid
+        return float(px) if px and not math.isnan(px) and px > 0 else None
+
+    def _replace(self, mo: ManagedOrder) -> None:
+        mode, mo.replacing = mo.replacing, None
+        px = self._touch(mo) if mode == "reprice" else None
+        if px is None:
+            mode = "aggressive"
+            order: Order = MarketOrder(mo.action, mo.remaining)
+        else:
+            mo.reprices += 1
+            order = LimitOrder(mo.action, mo.remaining, px)
+        ORDER_REPLACES.labels(mode=mode).inc()
+        log.info("Order %s timed out with %d left – %s%s", mo.id, mo.remaining, mode,
+                 f" @ {px}" if px is not None else "")
+        self._place(mo, order)
+        self._set(mo, OrderState.PARTIAL if mo.filled else OrderState.PENDING)
+        asyncio.create_task(self._watch(mo))
+
+    async def _expire(self, mo: ManagedOrder, seconds: float) -> None:
+        """Return after `seconds` or once mo is terminal, whichever comes first."""
+        sleeper = asyncio.ensure_future(get_clock().sleep(seconds))
+        try:
+            await asyncio.wait({sleeper, mo.done}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sleeper.cancel()
+
+    async def _watch(self, mo: ManagedOrder) -> None:
+        """Deadline for the live child; on expiry start a cancel/replace (or give up)."""
+        child = mo.trade
+        await self._expire(mo, mo.timeout_s)
+        if mo.state.terminal or child is not mo.trade or mo.cancel_requested:
+            return
+        if child.order.orderType == "MKT":
+            mode = None                                  # a market order that didn't complete: give up
+        elif mo.reprices < self.max_reprices:
+            mode = "reprice"
+        else:
+            mode = "aggressive" if self.final == "aggressive" else None
+        if mode is None:
+            self.cancel(mo)
+        else:
+            mo.replacing = mode
+            self._send_cancel(mo)
+
+    async def _watch_cancel(self, mo: ManagedOrder, child: Trade) -> None:
+        """Watchdog for a cancel in flight: without IB's confirmation nothing else moves mo."""
+        await self._expire(mo, self.cancel_timeout_s)
+        if mo.state.terminal or child is not mo.trade or child.orderStatus.status in OrderStatus.DoneStates:
+            return
+        ORDER_CANCEL_UNCONFIRMED.inc()
+        log.error("Order %s: cancel of %s unconfirmed after %.1fs – re-sent, closing as cancelled (%d/%d filled)",
+                  mo.id, child.order.orderId, self.cancel_timeout_s, mo.filled, mo.qty)
+        mo.replacing = None
+        mo.cancel_requested = True
+        self.ib.cancelOrder(child.order)
+        self._set(mo, OrderState.CANCELLED)
@@ -1,36 +1,195 @@
-"""REST + FIX bridge to Prime-Broker / FCM."""
+"""
+REST + FIX bridge to Prime-Broker / FCM – one long-lived order session.
+
+  ack = await prime.send_order(order, contract)                 # one order
+  acks = await prime.send_legs([(stock, c), (hedge, spy)])      # one round-trip
+  futs = [prime.submit(o, c) for o, c in exits]                 # batched, pipelined
+
+Every order gets a client order id (clOrdId) and joins a queue. A single
+writer task drains whatever is ready at once into one POST /orders/batch,
+up to `prime.max_batch`. It does not wait for that batch's acks before
+sending the next one: up to `prime.max_inflight` batches ride the pooled
+keep-alive client at once. Acks are matched to callers by clOrdId, not by
+position, so the venue may answer in any order. Legs submitted together
+always share a batch. Orders are never retried (see the `http:` prime policy).
+Callers routing to the prime broker use it directly: the IB order path
+(Broker, Flattener, the hedge leg) goes through OrderManager, not here.
+"""
+from __future__ import annotations
+
 import asyncio
+import itertools
 import os
-from typing import Dict
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
 
-import httpx
 from ib_insync import Contract, Order
+from prometheus_client import Counter, Histogram
 
+from utils.config import load_config
+from utils.endpoints import endpoint, stub_base
+from utils.http_clients import http_client
 from utils.logger import get_logger
 
+cfg = load_config()
 log = get_logger("PRIME")
 
+PRIME_CFG = cfg.get("prime", {})
+
+PRIME_ORDERS = Counter("prime_orders_total", "Orders sent to the prime broker", ["status"])
+PRIME_BATCH = Histogram("prime_batch_size", "Orders per prime round-trip", buckets=(1, 2, 4, 8, 16, 32, 64))
+PRIME_ACK = Histogram("prime_ack_seconds", "Submit → ack per order",
+                      buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+
+
+@dataclass
+class PrimeAck:
+    cl_ord_id: str
+    status: str             # accepted | rejected | unacked | mock
+    order_id: str | None
+    reason: str = ""
+
+    def dict(self) -> Dict:
+        return {"clOrdId": self.cl_ord_id, "status": self.status, "order_id": self.order_id, "reason": self.reason}
+
+
+@dataclass
+class _Pending:
+    payload: Dict
+    fut: asyncio.Future
+    t0: float
+
+
 class PrimeConnector:
-    def __init__(self) -> None:
-        self.enabled = bool(os.getenv("PRIME_API_KEY"))
-        self.base = os.getenv("PRIME_BASE_URL", "https://api.prime.example.com")
+    def __init__(
+        self,
+        max_batch: int = PRIME_CFG.get("max_batch", 50),
+        max_inflight: int = PRIME_CFG.get("max_inflight", 4),
+        batch_window_ms: float = PRIME_CFG.get("batch_window_ms", 0.0),
+    ) -> None:
+        self.enabled = bool(os.getenv("PRIME_API_KEY")) or stub_base() is not None
+        self.base = endpoint("prime")
         self.key = os.getenv("PRIME_API_KEY")
+        self.max_batch = max_batch
+        self.max_inflight = max_inflight
+        self.batch_window_ms = batch_window_ms   # 0 → batch whatever is queued by the next loop turn
+        self._prefix = f"{os.getpid():x}{int(time.time()):x}"   # unique across restarts
+        self._ids = itertools.count(1)
+        self._queue: List[List[_Pending]] = []   # units: one order, or all legs of a group
+        self._wake: asyncio.Event | None = None
+        self._inflight: asyncio.Semaphore | None = None
+        self._writer: asyncio.Task | None = None
+        self._closing = False
+        self._posts: set[asyncio.Task] = set()
+
+    # ---------- public API ----------
+    def submit(self, order: Order, contract: Contract) -> "asyncio.Future[PrimeAck]":
+        """Queue one order; the future resolves with its ack."""
+        return self._enqueue([(order, contract)])[0]
 
     async def send_order(self, order: Order, contract: Contract) -> Dict:
-        if not self.enabled:
-            return {"status": "mock", "order_id": "local"}
+        """One order → its ack as {clOrdId, status, order_id, reason} (the batch endpoint's per-order ack)."""
+        return (await self.submit(order, contract)).dict()
+
+    async def send_legs(self, legs: Sequence[Tuple[Order, Contract]]) -> List[PrimeAck]:
+        """Multi-leg action (e.g. stock + hedge): all legs in the same round-trip."""
+        return list(await asyncio.gather(*self._enqueue(legs)))
+
+    async def close(self) -> None:
+        """Flush what's queued and wait for the acks in flight."""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            self._closing = True
+            self._wake.set()
+            await asyncio.wait({writer})          # drains the queue, then returns
+            self._closing = False
+            if not writer.cancelled() and writer.exception() is not None:
+                log.error("Prime writer died: %s", writer.exception())
+        for unit in self._queue:                  # left behind by a dead writer
+            for p in unit:
+                if not p.fut.done():
+                    p.fut.set_exception(ConnectionError("prime session closed before the order was sent"))
+        self._queue.clear()
+        if self._posts:
+            await asyncio.gather(*self._posts, return_exceptions=True)
 
-        payload = {
+    # ---------- session ----------
+    def _payload(self, order: Order, contract: Contract, group: str | None) -> Dict:
+        return {
+            "clOrdId": f"{self._prefix}-{next(self._ids)}",
+            "groupId": group,
             "symbol": contract.symbol,
             "action": order.action,
             "qty": order.totalQuantity,
             "orderType": order.orderType,
-            "limitPrice": order.lmtPrice if hasattr(order, "lmtPrice") else None,
+            "limitPrice": order.lmtPrice if order.orderType == "LMT" else None,
             "tif": order.tif,
             "exchange": contract.exchange,
         }
-        headers = {"Authorization": f"Bearer {self.key}"}
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.post(f"{self.base}/orders", json=payload, headers=headers)
+
+    def _enqueue(self, legs: Sequence[Tuple[Order, Contract]]) -> List[asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        group = f"{self._prefix}-g{next(self._ids)}" if len(legs) > 1 else None
+        unit = [_Pending(self._payload(o, c, group), loop.create_future(), time.perf_counter()) for o, c in legs]
+        if not self.enabled:
+            for p in unit:
+                p.fut.set_result(PrimeAck(p.payload["clOrdId"], "mock", "local"))
+            return [p.fut for p in unit]
+        if self._writer is None or self._writer.done():
+            self._wake = asyncio.Event()
+            self._inflight = asyncio.Semaphore(self.max_inflight)
+            self._writer = asyncio.create_task(self._run())
+        self._queue.append(unit)
+        self._wake.set()
+        return [p.fut for p in unit]
+
+    async def _run(self) -> None:
+        while True:
+            await self._wake.wait()
+            # let everything ready this loop turn (or this window) join the batch
+            await asyncio.sleep(self.batch_window_ms / 1e3)
+            while self._queue:
+                await self._inflight.acquire()   # pipelining: don't wait for acks, only for a slot
+                batch: List[_Pending] = []
+                while self._queue and (not batch or len(batch) + len(self._queue[0]) <= self.max_batch):
+                    batch.extend(self._queue.pop(0))
+                task = asyncio.create_task(self._post(batch))
+                self._posts.add(task)
+                task.add_done_callback(self._posts.discard)
+            if self._closing:
+                return
+            self._wake.clear()
+
+    async def _post(self, batch: List[_Pending]) -> None:
+        PRIME_BATCH.observe(len(batch))
+        try:
+            r = await http_client("prime").post(
+                f"{self.base}/orders/batch",
+                json={"orders": [p.payload for p in batch]},
+                headers={"Authorization": f"Bearer {self.key}"},
+            )
             r.raise_for_status()
-            return r.json()
\ No newline at end of file
+            acks = {a.get("clOrdId"): a for a in r.json().get("acks", [])}
+        except Exception as e:
+            log.error("Prime batch of %d failed: %s", len(batch), e)
+            for p in batch:
+                PRIME_ORDERS.labels(status="error").inc()
+                if not p.fut.done():
+                    p.fut.set_exception(e)
+            return
+        finally:
+            self._inflight.release()
+        now = time.perf_counter()
+        for p in batch:
+            cid = p.payload["clOrdId"]
+            a = acks.get(cid)
+            if a is None:
+                log.error("No ack for %s %s %s – state unknown", cid, p.payload["action"], p.payload["symbol"])
+                ack = PrimeAck(cid, "unacked", None, "missing from batch response")
+            else:
+                ack = PrimeAck(cid, a.get("status", "unknown"), a.get("order_id"), a.get("reason", ""))
+            PRIME_ORDERS.labels(status=ack.status).inc()
+            PRIME_ACK.observe(now - p.t0)
+            if not p.fut.done():
+                p.fut.set_result(ack)
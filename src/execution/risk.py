@@ -1,15 +1,15 @@
 """Zero-defect risk engine – fails successfully."""
 import asyncio
-import datetime as dt
 import logging
 from decimal import Decimal
 from typing import Dict
 
-import httpx
 import pandas as pd
 from pydantic import BaseModel, ValidationError
 
+from data_ingestion.macro_calendar import MacroCalendar
 from utils.config import load_config
+from utils.endpoints import endpoint
 from utils.logger import get_logger
 from utils.market_hours import is_market_hours
 from prometheus_client import Counter, Gauge
@@ -20,7 +20,6 @@ log = get_logger("RISK")
 # ------------- Prometheus counters -------------
 KILL_SWITCH = Counter("risk_kill_switch_total", "Kill-switch activations")
 MARGIN_BREACH = Counter("risk_margin_breach_total", "Margin buffer breaches")
-CALENDAR_FAIL = Counter("risk_calendar_fail_total", "Macro calendar fetch failures")
 
 class SizedOrder(BaseModel):
     action: str
@@ -36,7 +35,7 @@ class RiskManager:
         self.max_position = float(cfg["max_position_pct"])
         self.hard_stop = float(cfg["hard_stop_pct"])
         self.margin_buffer = float(cfg["margin_buffer_pct"])
-        self.calendar_url = cfg["macro_calendar_url"]
+        self.calendar = MacroCalendar(endpoint("calendar", cfg["macro_calendar_url"]))
         self._start_nav: float | None = None
 
     # ---------- public API ----------
@@ -61,21 +60,9 @@ class RiskManager:
             log.exception("Unexpected error in can_trade – defaulting to False: %s", e)
             return False
 
-    async def high_impact_today(self) -> bool:
-        """Macro calendar with graceful degradation."""
-        try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                r = await client.get(
-                    self.calendar_url,
-                    params={"date": dt.date.today().isoformat()},
-                )
-                r.raise_for_status()
-                events = r.json().get("result", [])
-                return any(e.get("impact") == "High" for e in events)
-        except Exception as e:
-            log.warning("Calendar fetch failed – assuming NO high impact: %s", e)
-            CALENDAR_FAIL.inc()
-            return False  # fail-safe: skip only on explicit “High”
+    def macro_blackout(self) -> bool:
+        """High-impact macro event near now – an in-memory lookup, refreshed in the background."""
+        return self.calendar.high_impact_within()
 
     def size_order(
         self, nav: float, price: float, margin_usage: float
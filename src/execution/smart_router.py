@@ -1,22 +1,39 @@
-"""Decides passive vs aggressive, venue, and expected fee."""
+"""Decides passive vs aggressive vs sliced (execution algo), venue, and expected fee."""
 from dataclasses import dataclass
 from typing import List, Literal
 
 from data_ingestion.lob_stream import LobTick
+from utils.config import load_config
+
+cfg = load_config()
+ALGO_CFG = cfg.get("algos", {})
 
 @dataclass
 class Route:
-    action: Literal["PASSIVE", "AGGRESSIVE"]
+    action: Literal["PASSIVE", "AGGRESSIVE", "ALGO"]
     venue: str
     limit_price: float
     expected_fee_bps: float
     queue_ahead: int        # contracts ahead of us on level-1
+    algo: str | None = None  # TWAP / VWAP / POV when action == "ALGO"
 
 class SmartRouter:
-    def __init__(self, venue_fees_bps: dict[str, float]) -> None:
+    def __init__(
+        self,
+        venue_fees_bps: dict[str, float],
+        algo_depth_frac: float = ALGO_CFG.get("route_depth_frac", 0.5),
+        algo: str = ALGO_CFG.get("default", "TWAP"),
+    ) -> None:
         self.venue_fees = venue_fees_bps  # {"SMART": 0.3, "ARCA": 0.2, ...}
+        self.algo_depth_frac = algo_depth_frac  # qty above this share of visible depth → slice it
+        self.algo = algo
 
     def route(self, lob: LobTick, side: str, qty: int) -> Route:
+        book = lob.ask if side == "BUY" else lob.bid
+        depth = sum(s for _, s in book)
+        if depth and qty > self.algo_depth_frac * depth:  # would sweep the book
+            level = book[0]
+            return Route("ALGO", "SMART", level[0], self.venue_fees.get("SMART", 0.3), level[1], self.algo)
         if side == "BUY":
             level = lob.ask[0] if lob.ask else (0, 0)
             fee = self.venue_fees.get("SMART", 0.3)
@@ -32,4 +49,4 @@ class SmartRouter:
             if qty < level[1] * 0.5:
                 return Route("PASSIVE", "SMART", level[0], fee, queue_ahead)
             else:
-                return Route("AGGRESSIVE", "SMART", level[0], fee, 0)
\ No newline at end of file
+                return Route("AGGRESSIVE", "SMART", level[0], fee, 0)
@@ -1,10 +1,38 @@
 """Rule-based labeling: BUY if next 5-min return > +0.5 % else HOLD."""
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
 import numpy as np
 import pandas as pd
-from typing import Tuple
 
+from data_pipeline.binary_dataset import ACTIONS
 from data_pipeline.label_collector import LabelCollector
 
+BUY, SELL, HOLD = ACTIONS.index("BUY"), ACTIONS.index("SELL"), ACTIONS.index("HOLD")
+
+
+@dataclass
+class HistoryLabels:
+    """Labels for a whole bar history, aligned to `index` along the last axis."""
+    index: pd.Index
+    horizons: np.ndarray      # (H,)
+    thresholds: np.ndarray    # (T,)
+    forward_ret: np.ndarray   # (H, N) float64, NaN where the horizon runs past the data
+    action: np.ndarray        # (H, T, N) int8 ACTIONS index
+    reward: np.ndarray        # (H, T, N) float32, 0 on HOLD
+    valid: np.ndarray         # (H, N) bool
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wide frame: ret_{h}, action_{h}_{thr}, reward_{h}_{thr} per bar."""
+        cols = {}
+        for i, h in enumerate(self.horizons):
+            cols[f"ret_{h}"] = self.forward_ret[i]
+            for j, thr in enumerate(self.thresholds):
+                cols[f"action_{h}_{thr:g}"] = self.action[i, j]
+                cols[f"reward_{h}_{thr:g}"] = self.reward[i, j]
+        return pd.DataFrame(cols, index=self.index)
+
+
 class FutureReturnLabeler:
     def __init__(self, horizon_min: int = 5, threshold: float = 0.005) -> None:
         self.horizon_min = horizon_min
@@ -19,4 +47,38 @@ class FutureReturnLabeler:
             return "BUY", future_ret
         elif future_ret < -self.threshold:
             return "SELL", future_ret
-        return "HOLD", 0.0
\ No newline at end of file
+        return "HOLD", 0.0
+
+    def label_history(
+        self,
+        bars: pd.DataFrame | pd.Series,
+        horizons: Sequence[int] | None = None,
+        thresholds: Sequence[float] | None = None,
+    ) -> HistoryLabels:
+        """
+        Forward-looking labels for every bar in one vectorised pass.
+        Bar t is labeled from close[t + h] / close[t] - 1, so row t of the
+        output joins directly onto bar t of the input.
+        """
+        close_s = bars["close"] if isinstance(bars, pd.DataFrame) else bars
+        close = close_s.to_numpy(dtype=np.float64)
+        hs = np.asarray(horizons if horizons is not None else [self.horizon_min], dtype=np.int64)
+        ths = np.asarray(thresholds if thresholds is not None else [self.threshold], dtype=np.float64)
+        if (hs <= 0).any():
+            raise ValueError("Horizons must be positive")
+        n = len(close)
+
+        fwd = np.full((len(hs), n), np.nan)
+        for i, h in enumerate(hs):
+            if h < n:
+                fwd[i, :-h] = close[h:] / close[:-h] - 1
+        valid = np.isfinite(fwd)
+
+        ret = np.where(valid, fwd, 0.0)[:, None, :]          # (H, 1, N)
+        thr = ths[None, :, None]                             # (1, T, 1)
+        action = np.full((len(hs), len(ths), n), HOLD, dtype=np.int8)
+        action[ret > thr] = BUY
+        action[ret < -thr] = SELL
+        reward = np.where(action == HOLD, 0.0, ret).astype(np.float32)
+
+        return HistoryLabels(close_s.index, hs, ths, fwd, action, reward, valid)
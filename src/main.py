@@ -20,6 +20,7 @@ from data_ingestion.ib_stream import IBStreamer
 from execution.broker import Broker
 from services.supervisor import Supervisor
 from utils.config import load_config
+from utils.http_clients import close_all
 from utils.logger import get_logger
 from utils.market_hours import is_market_hours, minutes_to_close
 from utils.adversarial import validate_png
@@ -52,6 +53,15 @@ def run(
     asyncio.run(_async_main())
 
 
+@cli.command()
+def shadow_report(tags: list[str] = typer.Argument(None, help="Shadow tags (default: all recorded)")) -> None:
+    """Compare shadow candidates against prod: agreement + hypothetical PnL."""
+    from performance.shadow import report
+
+    df = report(tags)
+    typer.echo(df.to_string(index=False) if not df.empty else "No shadow records")
+
+
 async def _async_main() -> None:
     stream = IBStreamer(cfg["ib"])
     broker = Broker(cfg["risk"])
@@ -61,16 +71,26 @@ async def _async_main() -> None:
 
     await stream.connect()
     await supervisor.start()
+    try:
+        await tick_loop(stream.tick_stream(), builder, supervisor, broker, latency_guard)
+    finally:
+        broker.fill_models.snapshot()
+        await supervisor.shadow.stop()   # flush each tag's buffered records
+        await close_all()
+
 
+async def tick_loop(ticks, builder, supervisor, broker, latency_guard) -> None:
+    """Candle assembly + Supervisor dispatch; the tick source is live IB or a replay."""
     log.info("Entering tick loop…")
-    async for tick in stream.tick_stream():
+    async for tick in ticks:
         if SHUTDOWN_EVENT.is_set():
             log.info("Shutdown requested – flattening positions")
             await broker.flatten_all()
             break
 
         if not is_market_hours():
-            await asyncio.sleep(1)
+            # no sleep here: the live feed already idles off-hours (IBStreamer.tick_stream), and in a
+            # replay this loop pulls the feed that advances the SimClock – sleeping on it would never wake
             continue
 
         if minutes_to_close() <= cfg["risk"]["flatten_before_close_min"]:
@@ -79,7 +99,7 @@ async def _async_main() -> None:
             break
 
         try:
-            if latency_guard.too_slow():
+            if latency_guard.too_slow(tick.time):
                 log.warning("Latency spike – skipping tick")
                 continue
 
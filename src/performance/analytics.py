@@ -0,0 +1,182 @@
+"""
+Vectorised performance analytics for back-tests and live tracking.
+
+Every series function takes a (T,) or (T, K) array – K strategies, sweep
+points or symbols as columns – and reduces along time in one pass, so
+hundreds of curves are compared without a Python loop.
+"""
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+BARS_PER_YEAR = 252 * 390   # regular-session 1-min bars
+DAYS_PER_YEAR = 252
+
+
+def _2d(x) -> np.ndarray:
+    a = np.asarray(x, dtype=np.float64)
+    return a[:, None] if a.ndim == 1 else a
+
+
+def _out(v: np.ndarray, like) -> np.ndarray | float:
+    return float(v[0]) if np.ndim(like) == 1 else v
+
+
+# ---------- return / risk ratios ----------
+def sharpe(pnl, periods_per_year: int = BARS_PER_YEAR):
+    """Annualised mean / std of per-period returns (or PnL); 0 where flat."""
+    r = _2d(pnl)
+    sd = r.std(axis=0)
+    out = np.divide(r.mean(axis=0), sd, out=np.zeros(r.shape[1]), where=sd > 0) * np.sqrt(periods_per_year)
+    return _out(out, pnl)
+
+
+def sortino(pnl, periods_per_year: int = BARS_PER_YEAR):
+    """Like sharpe but over downside deviation (target 0)."""
+    r = _2d(pnl)
+    dd = np.sqrt((np.minimum(r, 0.0) ** 2).mean(axis=0))
+    out = np.divide(r.mean(axis=0), dd, out=np.zeros(r.shape[1]), where=dd > 0) * np.sqrt(periods_per_year)
+    return _out(out, pnl)
+
+
+def max_drawdown(equity):
+    """(depth, duration) – deepest peak-to-trough drop and longest bars spent below a peak."""
+    e = _2d(equity)
+    if not len(e):
+        z = np.zeros(e.shape[1])
+        return _out(z, equity), _out(z, equity)
+    peak = np.maximum.accumulate(e, axis=0)
+    t = np.arange(len(e))[:, None]
+    last_peak = np.maximum.accumulate(np.where(e >= peak, t, 0), axis=0)
+    depth = (peak - e).max(axis=0)
+    duration = (t - last_peak).max(axis=0).astype(np.float64)
+    return _out(depth, equity), _out(duration, equity)
+
+
+# ---------- rolling variants ----------
+def rolling_sharpe(pnl, window: int, periods_per_year: int = BARS_PER_YEAR) -> np.ndarray:
+    """Trailing-window sharpe via running sums (O(T)); NaN until the window fills."""
+    r = _2d(pnl)
+    c1 = np.vstack([np.zeros((1, r.shape[1])), np.cumsum(r, axis=0)])
+    c2 = np.vstack([np.zeros((1, r.shape[1])), np.cumsum(r * r, axis=0)])
+    out = np.full(r.shape, np.nan)
+    if len(r) >= window:
+        s1 = c1[window:] - c1[:-window]
+        s2 = c2[window:] - c2[:-window]
+        mean = s1 / window
+        sd = np.sqrt(np.maximum(s2 / window - mean * mean, 0.0))
+        out[window - 1:] = np.divide(mean, sd, out=np.zeros_like(mean), where=sd > 1e-12) * np.sqrt(periods_per_year)
+    return out[:, 0] if np.ndim(pnl) == 1 else out
+
+
+def rolling_drawdown(equity, window: int) -> np.ndarray:
+    """Drop from the trailing-window peak at every bar."""
+    e = pd.DataFrame(_2d(equity))
+    out = (e.rolling(window, min_periods=1).max() - e).to_numpy()
+    return out[:, 0] if np.ndim(equity) == 1 else out
+
+
+# ---------- position based ----------
+def turnover(pos):
+    """Shares (or notional) traded: sum |Δpos|, starting from flat."""
+    p = _2d(pos)
+    return _out(np.abs(np.diff(p, axis=0, prepend=0.0)).sum(axis=0), pos)
+
+
+def exposure(pos):
+    """Fraction of periods with a non-zero position."""
+    p = _2d(pos)
+    return _out((p != 0).mean(axis=0) if len(p) else np.zeros(p.shape[1]), pos)
+
+
+def leg_pnl(pos: np.ndarray, pnl: np.ndarray) -> np.ndarray:
+    """
+    PnL per leg (run of constant non-zero position) for one series. pnl[t]
+    is earned on pos[t-1], so it is credited to the leg held into bar t.
+    """
+    pos = np.asarray(pos, dtype=np.float64)
+    if not len(pos):
+        return np.zeros(0)
+    start = (pos != np.concatenate(([0.0], pos[:-1]))) & (pos != 0)
+    leg = np.where(pos != 0, np.cumsum(start) - 1, -1)
+    owner = np.concatenate(([-1], leg[:-1]))
+    keep = owner >= 0
+    return np.bincount(owner[keep], weights=np.asarray(pnl, dtype=np.float64)[keep], minlength=int(start.sum()))
+
+
+def hit_rate(leg_or_trade_pnl) -> float:
+    """Share of winning legs / closing trades (zero-PnL entries ignored)."""
+    x = np.asarray(leg_or_trade_pnl, dtype=np.float64)
+    x = x[x != 0]
+    return float((x > 0).mean()) if len(x) else 0.0
+
+
+# ---------- distributions / tables ----------
+def slippage_stats(bps, q: Sequence[float] = (0.5, 0.9, 0.95, 0.99)) -> Dict[str, float]:
+    x = np.asarray(bps, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    if not len(x):
+        return {"n": 0}
+    out = {"n": int(len(x)), "mean": float(x.mean()), "max": float(x.max())}
+    out.update({f"p{int(round(k * 100))}": float(v) for k, v in zip(q, np.quantile(x, q))})
+    return out
+
+
+def summarize(pnl, pos=None, periods_per_year: int = BARS_PER_YEAR) -> Dict[str, float]:
+    """One-row metrics for a single PnL series (and its position, if known)."""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    equity = np.cumsum(pnl)
+    depth, dur = max_drawdown(equity)
+    out = {
+        "pnl": float(equity[-1]) if len(equity) else 0.0,
+        "sharpe": sharpe(pnl, periods_per_year),
+        "sortino": sortino(pnl, periods_per_year),
+        "max_dd": depth,
+        "dd_duration": dur,
+    }
+    if pos is not None:
+        legs = leg_pnl(pos, pnl)
+        out.update(
+            turnover=turnover(pos),
+            exposure=exposure(pos),
+            legs=int(len(legs)),
+            hit_rate=hit_rate(legs),
+        )
+    return out
+
+
+def compare(pnl_matrix, names: Sequence[str] | None = None, periods_per_year: int = BARS_PER_YEAR) -> pd.DataFrame:
+    """Metrics for every column of a (T, K) PnL matrix → K-row frame."""
+    m = _2d(pnl_matrix)
+    depth, dur = max_drawdown(np.cumsum(m, axis=0))
+    return pd.DataFrame(
+        {
+            "pnl": m.sum(axis=0),
+            "sharpe": sharpe(m, periods_per_year),
+            "sortino": sortino(m, periods_per_year),
+            "max_dd": depth,
+            "dd_duration": dur,
+        },
+        index=pd.Index(names if names is not None else range(m.shape[1]), name="name"),
+    )
+
+
+def by_symbol(equity: pd.DataFrame, periods_per_year: int = DAYS_PER_YEAR) -> pd.DataFrame:
+    """Per-symbol breakdown of a long (date, symbol, pnl) table, as written by the orchestrator."""
+    wide = equity.pivot_table(index="date", columns="symbol", values="pnl", aggfunc="sum", fill_value=0.0)
+    out = compare(wide.to_numpy(), list(wide.columns), periods_per_year)
+    out.index.name = "symbol"
+    return out
+
+
+def trade_report(trades: pd.DataFrame, by: str = "symbol") -> pd.DataFrame:
+    """Count + slippage distribution per group of a trade table with a slippage_bps column."""
+    g = trades.groupby(by)["slippage_bps"] if by in trades else trades.assign(_all="all").groupby("_all")["slippage_bps"]
+    return g.agg(
+        trades="size",
+        slip_mean="mean",
+        slip_p50="median",
+        slip_p95=lambda s: s.quantile(0.95),
+        slip_max="max",
+    )
@@ -1,11 +1,11 @@
 """Monitors model drift and triggers retraining."""
-import datetime as dt
 import joblib
 import pandas as pd
 from pathlib import Path
 from sklearn.metrics import log_loss
 
 from performance.pnl_tracker import PnLTracker
+from utils.clock import get_clock
 from utils.config import load_config
 from utils.logger import get_logger
 
@@ -20,7 +20,7 @@ DRIFT_THRESHOLD = cfg["model"].get("drift_threshold", 0.05)  # increase in log-l
 class DriftGuard:
     def __init__(self, ib) -> None:
         self.tracker = PnLTracker(ib)
-        self.last_check = dt.datetime.utcnow()
+        self.last_check = get_clock().utcnow()
 
     def _load_model(self):
         if MODEL_PATH.exists():
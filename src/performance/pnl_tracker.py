@@ -1,14 +1,17 @@
 # src/performance/pnl_tracker.py
 """Real-time PnL + equity curve writer – lazy init until IB is ready."""
-import datetime as dt
 import json
+from collections import deque
 from pathlib import Path
 from typing import Dict
 
+import numpy as np
 import pandas as pd
 from prometheus_client import Gauge, CollectorRegistry
 from ib_insync import IB
 
+from src.performance.analytics import sharpe
+from utils.clock import get_clock
 from src.utils.config import load_config
 from src.utils.logger import get_logger
 
@@ -20,6 +23,7 @@ REGISTRY = CollectorRegistry(auto_describe=False)
 
 EQUITY_CURVE_FILE = Path("data/equity_curve.jsonl")
 EQUITY_CURVE_FILE.parent.mkdir(parents=True, exist_ok=True)
+LIVE_WINDOW = 30 * 24 * 60   # NAV samples kept in memory for live metrics
 
 NAV_GAUGE = Gauge(
     "net_liquidation",
@@ -32,6 +36,7 @@ class PnLTracker:
     def __init__(self, ib: IB) -> None:
         self.ib = ib
         self.start_nav = self._wait_for_nav()
+        self._navs: deque | None = None   # filled from the file once, then by tick()
 
     def _wait_for_nav(self) -> float:
         while True:
@@ -49,10 +54,20 @@ class PnLTracker:
         with EQUITY_CURVE_FILE.open("a") as f:
             f.write(json.dumps(row) + "\n")
 
-    def tick(self) -> None:
-        nav = float(self.ib.accountValues(account="")[0].netLiquidation)
+    def tick(self, nav: float | None = None) -> None:
+        """Record one NAV sample; pass `nav` when the caller already read the account."""
+        if nav is None:
+            nav = float(self.ib.accountValues(account="")[0].netLiquidation)
         NAV_GAUGE.set(nav)
-        self._append({"ts": dt.datetime.utcnow().isoformat(), "nav": nav})
+        self._append({"ts": get_clock().utcnow().isoformat(), "nav": nav})
+        if self._navs is not None:
+            self._navs.append(nav)
+
+    def recent_navs(self) -> np.ndarray:
+        """Last LIVE_WINDOW NAV samples without re-reading the equity file."""
+        if self._navs is None:
+            self._navs = deque(self.equity_df()["nav"].to_numpy(dtype=np.float64), maxlen=LIVE_WINDOW)
+        return np.fromiter(self._navs, dtype=np.float64, count=len(self._navs))
 
     def equity_df(self) -> pd.DataFrame:
         if not EQUITY_CURVE_FILE.exists():
@@ -62,11 +77,7 @@ class PnLTracker:
         return df.sort_values("ts").reset_index(drop=True)
 
     def live_sharpe(self, days: int = 30) -> float:
-        df = self.equity_df()
-        if len(df) < 2:
-            return 0.0
-        df = df.tail(days * 24 * 60)
-        returns = df["nav"].pct_change().dropna()
-        if returns.std() == 0:
+        navs = self.recent_navs()[-days * 24 * 60:]
+        if len(navs) < 2:
             return 0.0
-        return (returns.mean() / returns.std()) * (252 * 24 * 60) ** 0.5
\ No newline at end of file
+        return sharpe(np.diff(navs) / navs[:-1], 252 * 24 * 60)
\ No newline at end of file
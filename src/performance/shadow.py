@@ -0,0 +1,181 @@
+"""
+Shadow-model evaluation: candidate registry tags score the same live charts
+as prod, strictly off the critical path.
+
+  • submit() is a non-blocking put into a bounded queue – full → drop
+  • one low-priority worker thread runs every candidate encoder
+  • decisions land in a fixed-width binary store per tag (np.tofile)
+  • report() joins consecutive prices per symbol → agreement + hypothetical PnL
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from prometheus_client import Counter
+
+from registry.model_registry import ModelRegistry
+from utils.clock import get_clock
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("SHADOW")
+
+SHADOW_CFG = cfg.get("shadow", {})
+STORE_DIR = Path(SHADOW_CFG.get("store_dir", "./data/shadow"))
+MIN_LOGIT_GAP: float = cfg["model"].get("min_logit_gap", 0.25)
+ACTIONS = ["HOLD", "BUY", "SELL"]          # TechnicalAgent logit order
+SIGN = np.array([0, 1, -1], dtype=np.int8)  # position per action index
+
+SHADOW_SCORED = Counter("shadow_scored_total", "Charts scored by shadow models", ["tag"])
+SHADOW_DROPPED = Counter("shadow_dropped_total", "Shadow jobs dropped under load")
+
+RECORD = np.dtype([
+    ("ts", "f8"),
+    ("symbol", "S8"),
+    ("price", "f4"),
+    ("prod", "i1"),
+    ("shadow", "i1"),
+    ("logits", "f4", (3,)),
+])
+
+
+def gated_action(logits: Sequence[float]) -> int:
+    """Model-only part of TechnicalAgent.decide: argmax if the logit gap clears the gate."""
+    if len(logits) < 2:
+        return 0
+    top2 = sorted(logits, reverse=True)[:2]
+    if top2[0] - top2[1] < MIN_LOGIT_GAP:
+        return 0
+    return int(np.argmax(logits))
+
+
+def _lower_thread_priority() -> None:
+    # Linux: per-thread nice via the native TID, so prod threads are untouched
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+class ShadowEvaluator:
+    def __init__(
+        self,
+        tags: Sequence[str] | None = None,
+        queue_size: int | None = None,
+        flush_every: int = 64,
+    ) -> None:
+        self.tags: List[str] = list(tags if tags is not None else SHADOW_CFG.get("tags", []))
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size or SHADOW_CFG.get("queue_size", 64))
+        self.flush_every = flush_every
+        self._encoders: Dict[str, object] = {}
+        self._pending: Dict[str, list] = {t: [] for t in self.tags}
+        self._pool = ThreadPoolExecutor(1, "shadow", initializer=_lower_thread_priority)
+        self._task: asyncio.Task | None = None
+        STORE_DIR.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.tags)
+
+    # ---------- hot path ----------
+    def submit(self, png: bytes, symbol: str, price: float, prod_logits: Sequence[float]) -> None:
+        """Fire-and-forget; never awaits, never raises into the caller."""
+        if not self.enabled:
+            return
+        try:
+            self.queue.put_nowait((get_clock().time(), png, symbol, price, gated_action(prod_logits)))
+        except asyncio.QueueFull:
+            SHADOW_DROPPED.inc()
+
+    # ---------- background ----------
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            log.info("Shadow evaluation on for %s", self.tags)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await asyncio.get_running_loop().run_in_executor(self._pool, self._flush_all)
+        self._pool.shutdown(wait=False)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                await loop.run_in_executor(self._pool, self._score, job)
+            except Exception as e:
+                log.warning("Shadow scoring failed: %s", e)
+
+    def _encoder(self, tag: str):
+        if tag not in self._encoders:
+            self._encoders[tag] = ModelRegistry.load_encoder(tag)
+        return self._encoders[tag]
+
+    def _score(self, job) -> None:
+        ts, png, symbol, price, prod = job
+        for tag in self.tags:
+            logits = self._encoder(tag).encode(png)
+            self._pending[tag].append(
+                (ts, symbol.encode()[:8], price, prod, gated_action(logits), logits[:3])
+            )
+            SHADOW_SCORED.labels(tag=tag).inc()
+            if len(self._pending[tag]) >= self.flush_every:
+                self._flush(tag)
+
+    def _flush(self, tag: str) -> None:
+        rows = self._pending[tag]
+        if not rows:
+            return
+        with (STORE_DIR / f"{tag}.bin").open("ab") as f:
+            np.array(rows, dtype=RECORD).tofile(f)
+        rows.clear()
+
+    def _flush_all(self) -> None:
+        for tag in self.tags:
+            self._flush(tag)
+
+
+# ---------- offline report ----------
+def load_records(tag: str) -> np.ndarray:
+    path = STORE_DIR / f"{tag}.bin"
+    return np.fromfile(path, dtype=RECORD) if path.exists() else np.empty(0, dtype=RECORD)
+
+
+def report(tags: Sequence[str] | None = None) -> pd.DataFrame:
+    """Per-tag agreement with prod and next-candle hypothetical PnL (bps)."""
+    tags = list(tags) if tags else sorted(p.stem for p in STORE_DIR.glob("*.bin"))
+    rows = []
+    for tag in tags:
+        rec = load_records(tag)
+        if not len(rec):
+            continue
+        rec = rec[np.lexsort((rec["ts"], rec["symbol"]))]
+        same_sym = rec["symbol"][1:] == rec["symbol"][:-1]
+        fwd = np.zeros(len(rec))
+        fwd[:-1] = np.where(same_sym, rec["price"][1:] / rec["price"][:-1] - 1, 0.0)
+
+        shadow_pos, prod_pos = SIGN[rec["shadow"]], SIGN[rec["prod"]]
+        shadow_pnl, prod_pnl = shadow_pos * fwd * 1e4, prod_pos * fwd * 1e4
+        active = shadow_pos != 0
+        rows.append({
+            "tag": tag,
+            "n": len(rec),
+            "agreement": float((rec["shadow"] == rec["prod"]).mean()),
+            "shadow_trades": int(active.sum()),
+            "prod_trades": int((prod_pos != 0).sum()),
+            "shadow_pnl_bps": float(shadow_pnl.sum()),
+            "prod_pnl_bps": float(prod_pnl.sum()),
+            "shadow_hit_rate": float((shadow_pnl[active] > 0).mean()) if active.any() else 0.0,
+        })
+    return pd.DataFrame(rows)
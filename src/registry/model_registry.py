@@ -31,6 +31,17 @@ class ModelRegistry:
         processor = ViTImageProcessor.from_pretrained(str(path))
         return model, processor
 
+    @staticmethod
+    def load_encoder(tag: str = "prod"):
+        """Chart encoder for tag – distilled student if present, else ViT."""
+        from encoders.student_encoder import META_FILE, StudentChartEncoder
+        from encoders.vit_encoder import ViTChartEncoder
+
+        path = ModelRegistry.root / tag
+        if (path / META_FILE).exists():
+            return StudentChartEncoder(path)
+        return ViTChartEncoder(tag)
+
     @staticmethod
     def promote(tag: str) -> None:
         """Symlink 'prod' to tag for atomic swaps."""
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import datetime as dt
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Sequence
 
 import numpy as np
 import pandas as pd
@@ -11,6 +11,7 @@ from ib_insync import PortfolioItem
 from prometheus_client import Gauge
 from scipy.stats import norm
 
+from utils.clock import get_clock
 from utils.config import load_config
 from utils.logger import get_logger
 
@@ -44,11 +45,11 @@ class PortfolioRisk:
         self.lookback_days = cfg["risk"]["var_lookback_days"]
         self.confidence = cfg["risk"]["var_confidence"]
 
-    def snapshot(self) -> RiskSnapshot:
+    def snapshot(self, positions: Sequence | None = None) -> RiskSnapshot:
         try:
-            positions = self.ib.positions()
+            positions = self.ib.positions() if positions is None else positions
             if not positions:
-                return RiskSnapshot(0.0, {}, 0.0, dt.datetime.utcnow())
+                return RiskSnapshot(0.0, {}, 0.0, get_clock().utcnow())
 
             # Build DF of positions
             rows = []
@@ -85,11 +86,11 @@ class PortfolioRisk:
                 SECTOR_DELTA.labels(sector=sec).set(delta)
             PORTFOLIO_VAR.set(var_95)
 
-            return RiskSnapshot(net, sector_deltas, var_95, dt.datetime.utcnow())
+            return RiskSnapshot(net, sector_deltas, var_95, get_clock().utcnow())
 
         except Exception as e:
             log.exception("Portfolio risk calculation failed: %s", e)
-            return RiskSnapshot(0.0, {}, 0.0, dt.datetime.utcnow())
+            return RiskSnapshot(0.0, {}, 0.0, get_clock().utcnow())
 
     # ---------- helpers ----------
     def _historical_net_returns(self, current_net: float, days: int) -> pd.Series:
@@ -1,7 +1,7 @@
 """Real-time Reg-T / SMA buffer tracking."""
 import datetime as dt
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, Mapping
 
 from ib_insync import IB
 from utils.config import load_config
@@ -13,8 +13,9 @@ class RegTGuard:
         self.ib = ib
         self.min_sma_ratio = cfg["reg_t"]["min_sma_ratio"]
 
-    def snapshot(self) -> Dict[str, float]:
-        vals = {v.key: float(v.value) for v in self.ib.accountValues()}
+    def snapshot(self, values: Mapping[str, float] | None = None) -> Dict[str, float]:
+        """`values`: account tag → value already read this candle (else read from IB)."""
+        vals = values if values is not None else {v.key: float(v.value) for v in self.ib.accountValues()}
         sma = vals.get("SMA", 0.0)
         equity = vals.get("NetLiquidation", 0.0)
         buying_power = vals.get("BuyingPower", 0.0)
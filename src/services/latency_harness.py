@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tick-to-order latency through the real order path, against FakeIB.
+
+  broker      depth tick → Broker.execute (risk, LOB, router, fill model) → placeOrder
+  supervisor  closed candle → Supervisor.on_candle (full stack)          → placeOrder
+
+Each iteration feeds one quote, runs the stage and, if it placed an order,
+records placeOrder time − tick time. Positions are flattened between
+iterations so sizing stays comparable.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from ib_insync import Contract, Stock
+
+from execution.broker import Broker
+from execution.fake_ib import FakeIB
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("LATENCY_HARNESS")
+
+Stage = Callable[[int], Awaitable[None]]
+
+
+def latency_stats(ns: List[int]) -> Dict[str, float]:
+    if not ns:
+        return {"n": 0}
+    ms = np.asarray(ns, dtype=np.float64) / 1e6
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {"n": int(len(ms)), "mean_ms": float(ms.mean()), "p50_ms": float(p50),
+            "p90_ms": float(p90), "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+
+class LatencyHarness:
+    def __init__(self, ib: FakeIB, contract: Contract, mid: float = 100.0, interval_s: float = 1.0, seed: int = 0):
+        self.ib = ib
+        self.contract = contract
+        self.mid = mid
+        self.interval_s = interval_s
+        self.rng = np.random.default_rng(seed)
+        self.broker = Broker(cfg["risk"], ib=ib)
+        self.ts = 0.0
+
+    def tick(self) -> None:
+        self.ts += self.interval_s
+        self.mid = round(self.mid * float(np.exp(self.rng.normal(0, 5e-4))), 2)
+        self.ib.quote(self.contract, self.ts, self.mid)
+
+    async def flatten(self) -> None:
+        """flatten_all, feeding quotes until it returns (FakeIB only matches on market data)."""
+        task = asyncio.create_task(self.broker.flatten_all())
+        while not task.done():
+            for _ in range(3):   # let it place / re-read before the next quote
+                await asyncio.sleep(0)
+            if not task.done():
+                self.tick()
+        await task
+
+    async def measure(self, stage: Stage, n: int, warmup: int = 3) -> Dict[str, float]:
+        to_order: List[int] = []
+        stage_ns: List[int] = []
+        for i in range(n + warmup):
+            self.tick()
+            seen = len(self.ib.order_log)
+            t0 = time.perf_counter_ns()
+            await stage(i)
+            t1 = time.perf_counter_ns()
+            placed = self.ib.order_log[seen:]
+            if i >= warmup:
+                stage_ns.append(t1 - t0)
+                if placed:
+                    to_order.append(placed[0][0] - t0)
+            if placed:
+                await self.flatten()
+        out = latency_stats(to_order)
+        out["stage_p50_ms"] = float(np.median(stage_ns) / 1e6) if stage_ns else 0.0
+        out["orders_per_stage"] = len(to_order) / max(len(stage_ns), 1)
+        return out
+
+    # ---------- stages ----------
+    def broker_stage(self) -> Stage:
+        async def run(_: int) -> None:
+            await self.broker.execute(None, self.contract)
+        return run
+
+    def supervisor_stage(self, lookback: int = 60) -> Stage:
+        from data_ingestion.candle_builder import CandleBuilder
+        from services.supervisor import Supervisor
+
+        sup = Supervisor(self.broker, cfg["risk"])
+        builder = CandleBuilder(lookback=lookback)
+        closes: List[float] = []
+
+        async def run(_: int) -> None:
+            closes.append(self.mid)
+            c = np.asarray(closes[-lookback:])
+            idx = pd.date_range("2024-01-02 09:30", periods=len(c), freq="1min")
+            o = np.concatenate(([c[0]], c[:-1]))
+            df = pd.DataFrame({"open": o, "high": np.maximum(o, c) + 0.01,
+                               "low": np.minimum(o, c) - 0.01, "close": c}, index=idx)
+            await sup.on_candle(builder.render_png(df), self.contract)
+        return run
+
+
+async def _main(args: argparse.Namespace) -> None:
+    srv = None
+    if args.stubs:
+        from services.stub_servers import StubServer
+
+        srv = await StubServer(port=0, seed=args.seed).start()
+        os.environ["TRADER_STUBS"] = f"{srv.host}:{srv.port}"   # before any client reads its URL
+    ib = FakeIB(latency_ms=args.order_latency_ms, md_latency_ms=args.md_latency_ms)
+    harness = LatencyHarness(ib, Stock(args.symbol, "SMART", "USD"), seed=args.seed)
+    stage = harness.broker_stage() if args.mode == "broker" else harness.supervisor_stage()
+    stats = await harness.measure(stage, args.n)
+    stats.update(mode=args.mode, md_latency_ms=args.md_latency_ms, order_latency_ms=args.order_latency_ms)
+    if srv is not None:
+        stats["stub_calls"] = dict(srv.stats)
+        await srv.stop()
+    print(json.dumps(stats, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=("broker", "supervisor"), default="broker")
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--symbol", default=cfg["symbols"]["stocks"][0])
+    parser.add_argument("--md_latency_ms", type=float, default=cfg.get("fake_ib", {}).get("md_latency_ms", 0.0))
+    parser.add_argument("--order_latency_ms", type=float, default=cfg.get("fake_ib", {}).get("order_latency_ms", 0.0))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stubs", action="store_true", help="serve external HTTP from in-process stubs")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
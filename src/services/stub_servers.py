@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for every outbound HTTP dependency, one asyncio server.
+
+  /kimi                POST  chat completions (decision JSON or sentiment score)
+  /finnhub             GET   news headlines
+  /calendar            GET   macro calendar events
+  /audit               POST  regulatory drop-copy
+  /prime/orders        POST  prime-broker order entry
+  /prime/orders/batch  POST  batched entry – acks keyed by clOrdId, out of order
+
+Each service has its own latency distribution (lognormal around a median),
+error rate (HTTP 503) and timeout rate (request hangs past the client's
+timeout), all from the `stubs:` config section. A malformed request gets a
+400 (and the connection closed if its framing is lost). Keep-alive
+HTTP/1.1, no third-party server dependency.
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("STUBS")
+
+STUB_CFG = cfg.get("stubs", {})
+SERVICES = ("kimi", "finnhub", "calendar", "audit", "prime")
+
+
+@dataclass
+class Profile:
+    median_ms: float = 50.0
+    sigma: float = 0.5          # lognormal shape; 0 → fixed latency
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    hang_s: float = 60.0        # how long a "timed out" request hangs
+
+    def delay_s(self, rng: random.Random) -> float:
+        if self.sigma <= 0:
+            return self.median_ms / 1e3
+        return self.median_ms * rng.lognormvariate(0.0, self.sigma) / 1e3
+
+
+def profiles_from_cfg(section: Dict[str, Any] = STUB_CFG) -> Dict[str, Profile]:
+    default = section.get("default", {})
+    return {s: Profile(**{**default, **section.get("services", {}).get(s, {})}) for s in SERVICES}
+
+
+# ---------------- canned responses ----------------
+def _kimi(body: Dict[str, Any], seq: int) -> Dict[str, Any]:
+    msgs = body.get("messages") or [{}]
+    content = msgs[-1].get("content", "")
+    if isinstance(content, str) and content.startswith("Rate sentiment"):
+        text = f"{((seq * 37) % 21 - 10) / 10:.1f} stub sentiment"
+    else:
+        actions = STUB_CFG.get("kimi_actions", ["HOLD", "BUY", "SELL"])
+        digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).digest()
+        text = json.dumps({
+            "action": actions[digest[0] % len(actions)],
+            "stop_loss": 0.0,
+            "take_profit": 0.0,
+            "reasoning": "stub decision",
+        })
+    return {"choices": [{"message": {"role": "assistant", "content": text}}]}
+
+
+def _prime_batch(body: Dict[str, Any], seq: int) -> Dict[str, Any]:
+    acks = []
+    for i, o in enumerate(body.get("orders", [])):
+        ok = o.get("qty", 0) > 0 and o.get("action") in ("BUY", "SELL")
+        acks.append({"clOrdId": o.get("clOrdId"), "status": "accepted" if ok else "rejected",
+                     "order_id": f"stub-{seq}-{i}" if ok else None, "reason": "" if ok else "bad order"})
+    # legs of a group are acked together; otherwise the venue answers out of order
+    acks.sort(key=lambda a: hashlib.sha256(str(a["clOrdId"]).encode()).digest())
+    return {"acks": acks}
+
+
+def _respond(service: str, method: str, body: Dict[str, Any], seq: int, path: str = "") -> Tuple[int, Any]:
+    if service == "kimi" and method == "POST":
+        return 200, _kimi(body, seq)
+    if service == "finnhub" and method == "GET":
+        return 200, [{"headline": f"Stub headline #{seq}", "datetime": seq, "source": "stub"}]
+    if service == "calendar" and method == "GET":
+        impact = "High" if STUB_CFG.get("calendar_high_impact", False) else "Low"
+        return 200, {"result": [{"title": "Stub event", "impact": impact}]}
+    if service == "audit" and method == "POST":
+        return 200, {"status": "ok"}
+    if service == "prime" and method == "POST" and path.endswith("/batch"):
+        return 200, _prime_batch(body, seq)
+    if service == "prime" and method == "POST":
+        return 200, {"status": "accepted", "order_id": f"stub-{seq}"}
+    return 404, {"error": f"no stub for {method} /{service}"}
+
+
+# ---------------- server ----------------
+class StubServer:
+    def __init__(
+        self,
+        host: str = STUB_CFG.get("host", "127.0.0.1"),
+        port: int = STUB_CFG.get("port", 8765),
+        profiles: Dict[str, Profile] | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.profiles = profiles or profiles_from_cfg()
+        self.rng = random.Random(seed)
+        self.stats: Counter = Counter()       # also "<service>.max_inflight": peak overlapping requests
+        self._inflight: Counter = Counter()
+        self._seq = itertools.count()
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "StubServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]   # port=0 → ephemeral
+        log.info("Stub servers on %s (%s)", self.url, ", ".join(SERVICES))
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "StubServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    @staticmethod
+    async def _reply(writer: asyncio.StreamWriter, status: int, payload: Any, close: bool = False) -> None:
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'ERR'}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats["connections"] += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, _ = line.decode().split(" ", 2)
+                    headers: Dict[str, str] = {}
+                    while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        k, sep, v = h.decode().partition(":")
+                        if not sep:
+                            raise ValueError(f"bad header line {h[:80]!r}")
+                        headers[k.strip().lower()] = v.strip()
+                    length = int(headers.get("content-length", 0))
+                except ValueError as e:   # request framing is lost: answer and hang up
+                    self.stats["bad_requests"] += 1
+                    log.warning("Malformed request %r: %s", line[:80], e)
+                    await self._reply(writer, 400, {"error": f"malformed request: {e}"}, close=True)
+                    break
+                raw = await reader.readexactly(length)
+                status, payload = await self._dispatch(method, target, raw)
+                await self._reply(writer, status, payload)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, raw: bytes) -> Tuple[int, Any]:
+        path = target.split("?", 1)[0].strip("/")
+        service = path.split("/", 1)[0]
+        prof = self.profiles.get(service)
+        if prof is None:
+            return 404, {"error": f"unknown service {service}"}
+        self.stats[f"{service}.requests"] += 1
+        self._inflight[service] += 1
+        peak = f"{service}.max_inflight"
+        self.stats[peak] = max(self.stats[peak], self._inflight[service])
+        try:
+            u = self.rng.random()
+            if u < prof.timeout_rate:
+                self.stats[f"{service}.timeouts"] += 1
+                await asyncio.sleep(prof.hang_s)
+            await asyncio.sleep(prof.delay_s(self.rng))
+            if u < prof.timeout_rate + prof.error_rate:
+                self.stats[f"{service}.errors"] += 1
+                return 503, {"error": "injected failure"}
+            try:
+                body = json.loads(raw) if raw else {}
+                if not isinstance(body, dict):
+                    raise ValueError(f"expected a JSON object, got {type(body).__name__}")
+            except ValueError as e:
+                self.stats["bad_requests"] += 1
+                log.warning("Malformed JSON body for %s %s: %s", method, target, e)
+                return 400, {"error": f"malformed JSON body: {e}"}
+            return _respond(service, method, body, next(self._seq), path)
+        finally:
+            self._inflight[service] -= 1
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    async with StubServer(args.host, args.port, seed=args.seed) as srv:
+        log.info("Point the app here with stubs.enabled: true or TRADER_STUBS=%s:%d", srv.host, srv.port)
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=STUB_CFG.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=STUB_CFG.get("port", 8765))
+    parser.add_argument("--seed", type=int, default=None)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,13 @@ import asyncio
 import datetime as dt
 import json
 import os
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 
-import httpx
 import pandas as pd
 import torch
+from prometheus_client import Counter, Histogram
 
 from agents.sentiment_agent import SentimentAgent
 from agents.technical_agent import TechnicalAgent
@@ -23,25 +24,39 @@ from brain import Decision, KimiDecisionMaker
 from compliance.audit_trail import AuditTrail
 from data_ingestion.candle_builder import CandleBuilder
 from data_ingestion.ib_stream import IBStreamer
-from data_ingestion.lob_stream import LobStream
+from data_ingestion.lob_stream import LobStream, LobTick
 from data_pipeline.label_collector import LabelCollector
 from encoders.multimodal import MultiModalEncoder
 from execution.broker import Broker
+from execution.decision_context import DecisionContext
 from execution.impact_model import ImpactEstimate, ImpactModel
 from execution.micro_price import MicroPriceEngine
 from performance.drift_guard import DriftGuard
 from performance.pnl_tracker import PnLTracker
+from performance.shadow import ShadowEvaluator
 from registry.model_registry import ModelRegistry
 from risk.hedge_engine import HedgeEngine
 from risk.portfolio_risk import PortfolioRisk
 from risk.reg_t_guard import RegTGuard
 from training.train_vit import ViTTrainer
 from utils.config import load_config
+from utils.endpoints import endpoint
+from utils.http_clients import http_client
 from utils.logger import get_logger
 
 cfg = load_config()
 log = get_logger("SUPERVISOR")
 
+SUP_CFG = cfg.get("supervisor", {})
+DEADLINES_MS: Dict[str, float] = SUP_CFG.get("deadlines_ms", {})
+SPECULATIVE_LLM: bool = SUP_CFG.get("speculative_llm", False)
+REQUIRED = object()   # _stage default: no fallback, errors propagate
+
+STAGE_LATENCY = Histogram("supervisor_stage_seconds", "on_candle stage latency", ["stage"],
+                          buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+STAGE_SKIPPED = Counter("supervisor_stage_skipped_total", "on_candle stages degraded", ["stage", "reason"])
+IMPACT_RESIZED = Counter("supervisor_impact_resized_total", "Orders shrunk to fit the impact budget")
+
 
 class Supervisor:
     """High-level orchestrator with multimodal alpha, impact model, synthetic data, Reg-T, hedge."""
@@ -58,6 +73,8 @@ class Supervisor:
         self.builder = CandleBuilder(lookback=cfg["timeframes"]["lookback_bars"])
         self.pnl = PnLTracker(broker.ib)
         self.drift = DriftGuard(broker.ib)
+        self.shadow = ShadowEvaluator()  # candidate tags, off the critical path
+        self._agent_call: asyncio.Future | None = None  # TechnicalAgent.decide thread, at most one
 
         # ---------------- risk & infra ----------------
         self.port_risk = PortfolioRisk(broker.ib)
@@ -89,95 +106,186 @@ class Supervisor:
         except FileNotFoundError:
             log.warning("No multimodal weights – cold-start with base")
 
+        # macro calendar: prefetch the day now, refresh in the background
+        await self.broker.risk.calendar.refresh()
+        self.broker.risk.calendar.start()
+
+        self.shadow.start()
         log.info("Supervisor started")
 
     # ---------- headline ----------
     async def _top_headline(self) -> str:
-        url = "https://finnhub.io/api/v1/news"
+        url = endpoint("finnhub")
         params = {"category": "general", "token": os.getenv("FINNHUB_KEY", "")}
-        async with httpx.AsyncClient(timeout=5) as client:
-            r = await client.get(url, params=params)
-            r.raise_for_status()
-            return r.json()[0]["headline"]
+        r = await http_client("finnhub").get(url, params=params)
+        r.raise_for_status()
+        return r.json()[0]["headline"]
+
+    # ---------- stages ----------
+    async def _stage(self, name: str, make: Callable[[], Awaitable[Any]], default: Any = REQUIRED) -> Any:
+        """
+        Run one stage under its deadline; a skippable stage (default given) degrades to `default`.
+        `make` builds the awaitable only once the stage starts, so a stage cancelled before
+        it ever ran leaves no un-awaited coroutine behind.
+        """
+        limit = DEADLINES_MS.get(name)
+        t0 = time.perf_counter()
+        try:
+            return await asyncio.wait_for(make(), limit / 1e3 if limit else None)
+        except Exception as e:
+            if default is REQUIRED:
+                raise
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+            STAGE_SKIPPED.labels(stage=name, reason=reason).inc()
+            log.debug("Stage %s skipped (%s): %s", name, reason, e)
+            return default
+        finally:
+            STAGE_LATENCY.labels(stage=name).observe(time.perf_counter() - t0)
+
+    async def _decide(self, png: bytes, df: pd.DataFrame) -> Tuple[str, float]:
+        """
+        TechnicalAgent.decide in a worker thread. A thread abandoned at the stage deadline
+        can't be cancelled – shielded, it runs to completion, and on_candle skips candles
+        until it has, so two calls never mutate the agent's history / last_logits at once.
+        """
+        self._agent_call = asyncio.ensure_future(asyncio.to_thread(self.agent.decide, png, df))
+        self._agent_call.add_done_callback(lambda f: f.cancelled() or f.exception())  # retrieved if abandoned
+        return await asyncio.shield(self._agent_call)
+
+    async def _lob(self, contract) -> LobTick | None:
+        gen = LobStream(self.broker.ib).stream(contract)
+        try:
+            return await anext(gen, None)
+        finally:
+            await gen.aclose()
 
     # ---------- main tick ----------
     async def on_candle(self, png: bytes, contract) -> None:
-        try:
-            # 1. equity snapshot
-            self.pnl.tick()
+        """
+        Stage graph – everything that only needs the candle starts at once:
+
+          headline ─→ sentiment ───────────────┬─→ llm ─┐
+          agent (thread) ─→ HOLD? ─────────────┘        │
+          lob ─→ size / impact / micro gates ───────────┼─→ execute → hedge → audit
+          reg-T, VaR (account reads) ───────────────────┘
+          lob + headline ─→ multimodal encode (skippable, off the gate path)
+
+        The paid LLM call waits for the risk gates; with `speculative_llm` it
+        starts as soon as its inputs are ready and is cancelled if a gate
+        rejects the trade. Every stage still in flight – the multimodal encode
+        included – is cancelled when the tick returns. A candle arriving while
+        the previous agent thread still runs is skipped.
+
+        Account, positions and quote are read once into a DecisionContext that
+        grows (immutably) with the book, sizing, impact and risk snapshots and
+        is handed to the broker, audit trail and labeller.
+        """
+        tasks: List[asyncio.Task] = []
+
+        def spawn(name: str, make: Callable[[], Awaitable[Any]], default: Any = REQUIRED) -> asyncio.Task:
+            task = asyncio.create_task(self._stage(name, make, default))
+            tasks.append(task)
+            return task
 
-            # 2. drift → async retrain
+        try:
+            # 1. one read of account, positions and quote for the whole candle
+            ctx = DecisionContext.capture(self.broker.ib, contract)
+            account = ctx.account
+            self.pnl.tick(account.nav)
             if self.drift.check_and_retrain():
                 asyncio.create_task(self._retrain_and_swap())
 
-            # 3. sentiment
-            headline, sent_score = None, 0.0
-            try:
-                headline = await self._top_headline()
-                sent = await self.sent_agent.score_headline(headline)
-                sent_score = sent.score
-            except Exception as e:
-                log.debug("Sentiment failed: %s", e)
+            # 2. fan out: news chain + LOB snapshot, while the agent scores the chart
+            headline_t = spawn("headline", self._top_headline, None)
 
-            # 4. memory
-            memory = "\n".join(self._reason_memory[-3:])
+            async def sentiment() -> float:
+                headline = await headline_t
+                return (await self.sent_agent.score_headline(headline)).score if headline else 0.0
+
+            sentiment_t = spawn("sentiment", sentiment, 0.0)
+            lob_t = spawn("lob", lambda: self._lob(contract), None)
 
-            # 5. agent decision
             df = self.builder.to_df()
-            action, confidence = self.agent.decide(png, df)
+            if self._agent_call is not None and not self._agent_call.done():
+                STAGE_SKIPPED.labels(stage="agent", reason="busy").inc()
+                log.warning("Agent still scoring an earlier candle – skip %s", contract.symbol)
+                return
+            action, confidence = await self._stage("agent", lambda: self._decide(png, df))
+            if not df.empty:
+                self.shadow.submit(png, contract.symbol, float(df["close"].iloc[-1]), self.agent.last_logits)
             if action == "HOLD":
                 return
 
-            # 6. LOB snapshot
-            lob_gen = LobStream(self.broker.ib).stream(contract)
-            lob = await lob_gen.__anext__()
+            # 3. LLM decision – needs only the chart, position and news
+            memory = "\n".join(self._reason_memory[-3:])
 
-            # 7. multimodal encoding
-            vec = self.encoder.encode_live(png, lob, headline or "")
-            # (vec can be fed into agent / RL later)
+            async def decide() -> Decision:
+                headline, sent_score = await headline_t, await sentiment_t
+                pos = account.position(contract)
+                return await self.brain.decide(png, self.agent, pos, headline or "", sent_score, memory)
 
-            # 8. impact / micro-price
-            nav = self.broker._get_nav()
-            price = float(self.broker.ib.reqMktData(contract, "", False, False).last or 1)
-            margin = self.broker._margin_usage()
-            sized = self.broker.risk.size_order(nav, price, margin)
-            impact: ImpactEstimate = self.impact.estimate(sized.qty, sized.action, lob)
+            decision_t = spawn("llm", decide) if SPECULATIVE_LLM else None
 
-            if impact.slippage_bps > cfg["impact"]["max_slippage_bps"]:
-                log.debug("Impact too high – skip")
+            # 4. sizing + risk snapshots from the captured account (on the loop: ib_insync is not thread-safe)
+            sized = self.broker.risk.size_order(account.nav, ctx.price, account.margin_usage)
+            reg = self.reg_t.snapshot(account.values)
+            snap = self.port_risk.snapshot(account.positions)
+            ctx = ctx.with_(sized=sized, reg_t=reg, risk=snap)
+
+            # 5. LOB-dependent gates
+            lob = await lob_t
+            if lob is None:
+                log.warning("No LOB snapshot for %s – skip", contract.symbol)
                 return
 
-            # 9. micro-price cost check
+            async def encode() -> List[float]:
+                headline = await headline_t
+                return await asyncio.to_thread(self.encoder.encode_live, png, lob, headline or "")
+
+            spawn("encode", encode, None)   # best effort, never awaited (vec can be fed into agent / RL later)
+
+            # impact-optimal size: the largest qty inside the slippage / cost budget. The budget
+            # prices one immediate sweep, so it binds orders sent whole; an ALGO parent is
+            # sliced under the depth cap instead (execution.exec_algos) and keeps its size
+            route = self.broker.router.route(lob, sized.action, sized.qty)
+            if route.action != "ALGO":
+                best_qty = self.impact.max_qty(sized.action, lob, cfg["impact"]["max_slippage_bps"],
+                                               cfg["impact"].get("max_cost_bps"), upper=sized.qty)
+                if best_qty < sized.qty:
+                    if best_qty == 0:
+                        log.debug("Impact too high – skip")
+                        return
+                    log.debug("Impact budget: %d → %d", sized.qty, best_qty)
+                    IMPACT_RESIZED.inc()
+                    sized = sized.copy(update={"qty": best_qty})
+            impact: ImpactEstimate = self.impact.estimate(sized.qty, sized.action, lob)
+            ctx = ctx.with_(sized=sized, lob=lob, impact=impact)
+
             micro = self.micro.compute(lob, sized.qty)
+            ctx = ctx.with_(micro=micro)
             if micro.cost_bps > cfg["micro"]["max_cost_bps"]:
                 log.debug("Adverse-selection cost too high – skip")
                 return
 
-            # 10. Reg-T guard
-            reg = self.reg_t.snapshot()
+            # 6. Reg-T guard
             if reg["breach"]:
                 log.warning("Reg-T SMA breach – flatten")
                 await self.broker.flatten_all()
                 return
 
-            # 11. portfolio risk
-            snap = self.port_risk.snapshot()
+            # 7. portfolio risk
             if snap.var_95 > cfg["risk"]["max_var_usd"]:
                 log.warning("VAR breach – flatten")
                 await self.broker.flatten_all()
                 return
 
-            # 12. assemble final decision
-            pos = self.broker.position_snapshot(contract)
-            raw_decision = await self.brain.decide(
-                png, self.agent, pos, headline or "", sent_score, memory
-            )
-            decision = Decision(**raw_decision)
+            # 8. final decision
+            decision = await (decision_t if decision_t is not None else self._stage("llm", decide))
 
-            # 13. execute with impact-aware sizing
-            await self.broker.execute(decision, contract)
+            # 9. execute with impact-aware sizing
+            await self.broker.execute(decision, contract, ctx)
 
-            # 14. beta-hedge
+            # 10. beta-hedge
             hedge_qty = self.hedge.hedge_qty(contract.symbol, sized.qty)
             if hedge_qty != 0:
                 from execution.micro_price import SizedOrder
@@ -192,7 +300,7 @@ class Supervisor:
                 )
                 await self.broker.execute(hedge_order, self.hedge.spy_contract)
 
-            # 15. audit
+            # 11. audit
             await self.audit.record(
                 {
                     "type": "ORDER",
@@ -200,19 +308,24 @@ class Supervisor:
                     "decision": decision.dict(),
                     "impact": impact.__dict__,
                     "portfolio": snap.__dict__,
+                    "context": ctx.audit(),
                 }
             )
 
-            # 16. synthetic or live labelling
+            # 12. synthetic or live labelling
             if cfg["ib"]["paper"]:
                 asyncio.create_task(
                     LabelCollector.log(
-                        self.broker.ib, png, decision.action, contract, horizon_sec=300
+                        self.broker.ib, png, decision.action, contract, horizon_sec=300, entry_px=ctx.price
                     )
                 )
 
         except Exception as e:
             log.exception("Supervisor tick failed safely: %s", e)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
 
     # ---------- helpers ----------
     async def _retrain_and_swap(self) -> None:
@@ -0,0 +1,227 @@
+"""
+Knowledge distillation: registry ViT teacher → compact CNN student.
+
+Teacher logits are computed once over labels.jsonl + synthetic shards, the
+student is trained on temperature-softened KL (+ CE where a real label
+exists) and saved into the registry next to an agreement / latency report.
+"""
+import json
+import os
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+
+from data_pipeline.binary_dataset import iter_pngs, list_shards, read_shard
+from data_pipeline.synthetic import PREFIX as SYNTH_PREFIX
+from encoders.student_encoder import (
+    INPUT_HW,
+    META_FILE,
+    WEIGHTS_FILE,
+    ChartStudent,
+    StudentChartEncoder,
+    preprocess,
+)
+from registry.model_registry import ModelRegistry
+from training.train_vit import reward_to_label
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("DISTILL")
+
+NO_LABEL = -1  # synthetic rows: soft targets only
+
+
+class _ChartSet(Dataset):
+    def __init__(self, pngs: List[bytes], soft: np.ndarray, hard: np.ndarray) -> None:
+        self.pngs, self.soft, self.hard = pngs, soft, hard
+
+    def __len__(self) -> int:
+        return len(self.pngs)
+
+    def __getitem__(self, i: int):
+        return preprocess(self.pngs[i]), torch.from_numpy(self.soft[i]), int(self.hard[i])
+
+
+def _param_bytes(model: torch.nn.Module) -> int:
+    return sum(t.numel() * t.element_size() for t in [*model.parameters(), *model.buffers()])
+
+
+def _latency_ms(fn, inputs: List, warmup: int = 5) -> Dict[str, float]:
+    for x in inputs[:warmup]:
+        fn(x)
+    times = []
+    for x in inputs:
+        t0 = time.perf_counter()
+        fn(x)
+        times.append((time.perf_counter() - t0) * 1e3)
+    return {"p50_ms": float(np.percentile(times, 50)), "p99_ms": float(np.percentile(times, 99))}
+
+
+class Distiller:
+    def __init__(
+        self,
+        student_tag: str,
+        teacher_tag: str = "prod",
+        temperature: float = 2.0,
+        alpha: float = 0.9,
+        epochs: int = 10,
+        batch_size: int = 128,
+        seed: int = 42,
+        num_workers: int | None = cfg["training"].get("num_workers"),
+    ) -> None:
+        self.student_tag = student_tag
+        self.teacher_tag = teacher_tag
+        self.T = temperature
+        self.alpha = alpha
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.seed = seed
+        self.num_workers = min(4, os.cpu_count() or 1) if num_workers is None else num_workers
+        self.dataset_dir = Path(cfg["dataset"]["raw_dir"])
+        self.output_dir = ModelRegistry.root / student_tag
+
+    # ---------- data ----------
+    def load_corpus(self) -> Tuple[List[bytes], np.ndarray]:
+        """Return (pngs, hard labels) from live labels + synthetic shards."""
+        pngs: List[bytes] = []
+        hard: List[int] = []
+        labels = self.dataset_dir / "labels.jsonl"
+        if labels.exists():
+            with labels.open() as f:
+                for line in f:
+                    row = json.loads(line)
+                    pngs.append(bytes.fromhex(row["png_b64"]))
+                    hard.append(reward_to_label(row["reward"]))
+        for path in list_shards(self.dataset_dir, SYNTH_PREFIX):
+            shard = read_shard(path)
+            for png in iter_pngs(shard):
+                pngs.append(png)
+                hard.append(NO_LABEL)
+        log.info("Distillation corpus: %d charts (%d labeled)", len(pngs), sum(h >= 0 for h in hard))
+        return pngs, np.asarray(hard, dtype=np.int64)
+
+    @torch.inference_mode()
+    def teacher_logits(self, model, processor, pngs: List[bytes]) -> np.ndarray:
+        device = next(model.parameters()).device
+        out = []
+        for i in range(0, len(pngs), 64):
+            imgs = [Image.open(BytesIO(p)).convert("RGB") for p in pngs[i: i + 64]]
+            pix = processor(images=imgs, return_tensors="pt")["pixel_values"].to(device)
+            out.append(model(pixel_values=pix).logits.float().cpu().numpy())
+        return np.concatenate(out)
+
+    # ---------- training ----------
+    def _loss(self, logits: torch.Tensor, soft: torch.Tensor, hard: torch.Tensor) -> torch.Tensor:
+        kd = F.kl_div(
+            F.log_softmax(logits / self.T, -1),
+            F.softmax(soft / self.T, -1),
+            reduction="batchmean",
+        ) * self.T ** 2
+        mask = hard != NO_LABEL
+        if not mask.any():
+            return kd
+        ce = F.cross_entropy(logits[mask], hard[mask])
+        return self.alpha * kd + (1 - self.alpha) * ce
+
+    def train_student(self, pngs: List[bytes], soft: np.ndarray, hard: np.ndarray) -> ChartStudent:
+        torch.manual_seed(self.seed)
+        student = ChartStudent(num_classes=soft.shape[1])
+        opt = torch.optim.AdamW(student.parameters(), lr=3e-3, weight_decay=1e-4)
+        sched = torch.optim.lr_scheduler.OneCycleLR(
+            opt, max_lr=3e-3, total_steps=self.epochs * -(-len(pngs) // self.batch_size)
+        )
+        loader = DataLoader(
+            _ChartSet(pngs, soft.astype(np.float32), hard),
+            batch_size=self.batch_size,
+            shuffle=True,
+            num_workers=self.num_workers,
+            generator=torch.Generator().manual_seed(self.seed),
+        )
+        student.train()
+        for epoch in range(self.epochs):
+            total = 0.0
+            for x, s, h in loader:
+                loss = self._loss(student(x), s, h)
+                opt.zero_grad(set_to_none=True)
+                loss.backward()
+                opt.step()
+                sched.step()
+                total += loss.item() * len(x)
+            log.info("epoch %d distill loss %.4f", epoch, total / len(pngs))
+        return student.eval()
+
+    # ---------- report ----------
+    @torch.inference_mode()
+    def report(self, teacher, processor, student: StudentChartEncoder, pngs: List[bytes],
+               soft: np.ndarray) -> Dict[str, Any]:
+        """Top-1 agreement + single-candle CPU latency + weight memory, teacher vs student."""
+        student_logits = student.encode_batch(pngs)
+        sample = pngs[: min(200, len(pngs))]
+
+        def teacher_one(png: bytes):
+            self.teacher_logits(teacher, processor, [png])
+
+        return {
+            "n_eval": len(pngs),
+            "top1_agreement": float((student_logits.argmax(1) == soft.argmax(1)).mean()),
+            "teacher_params": sum(p.numel() for p in teacher.parameters()),
+            "student_params": sum(p.numel() for p in student.model.parameters()),
+            "teacher_bytes": _param_bytes(teacher),
+            "student_bytes": _param_bytes(student.model),
+            "teacher_latency": _latency_ms(teacher_one, sample),
+            "student_latency": _latency_ms(student.encode, sample),
+            "student_model_only": _latency_ms(
+                student.model, [preprocess(p).unsqueeze(0) for p in sample]
+            ),
+        }
+
+    def run(self) -> Dict[str, Any]:
+        teacher, processor = ModelRegistry.load_vit(self.teacher_tag)
+        teacher.eval()
+        pngs, hard = self.load_corpus()
+        if not pngs:
+            raise ValueError(f"No charts found under {self.dataset_dir}")
+        soft = self.teacher_logits(teacher, processor, pngs)
+
+        # hold out 10 % for the agreement report
+        order = np.random.default_rng(self.seed).permutation(len(pngs))
+        n_eval = max(1, len(pngs) // 10)
+        ev, tr = order[:n_eval], order[n_eval:]
+        student = self.train_student([pngs[i] for i in tr], soft[tr], hard[tr])
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        torch.save(student.state_dict(), self.output_dir / WEIGHTS_FILE)
+        (self.output_dir / META_FILE).write_text(json.dumps({
+            "num_classes": soft.shape[1],
+            "widths": [blk[0].out_channels for blk in student.features],
+            "input_hw": list(INPUT_HW),
+            "teacher": self.teacher_tag,
+            "temperature": self.T,
+            "alpha": self.alpha,
+        }, indent=2))
+
+        rep = self.report(
+            teacher, processor, StudentChartEncoder(self.output_dir), [pngs[i] for i in ev], soft[ev]
+        )
+        (self.output_dir / "distill_report.json").write_text(json.dumps(rep, indent=2))
+        log.info("Student %s saved: %s", self.student_tag, rep)
+        return rep
+
+
+if __name__ == "__main__":
+    import argparse, datetime as dt
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--student_tag", default=f"student-{dt.date.today().isoformat()}")
+    parser.add_argument("--teacher_tag", default="prod")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    args = parser.parse_args()
+    Distiller(args.student_tag, args.teacher_tag, args.temperature, epochs=args.epochs).run()
@@ -1,12 +1,26 @@
-"""Distributed ViT fine-tuning with W&B, early-stop, model registry."""
+"""Distributed ViT fine-tuning with W&B, early-stop, model registry.
+
+`train()` runs the single-process HF Trainer; `train_ddp()` runs CPU data-
+parallel training over N local processes (torch.distributed, gloo backend).
+"""
+import contextlib
+import json
+import socket
+import time
 from io import BytesIO
 from PIL import Image
 import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
 
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
 import wandb
 from datasets import Dataset, load_dataset
+from torch.nn.parallel import DistributedDataParallel as DDP
+from torch.utils.data import DataLoader
+from torch.utils.data.distributed import DistributedSampler
 from transformers import (
     ViTForImageClassification,
     ViTImageProcessor,
@@ -22,13 +36,18 @@ cfg = load_config()
 log = get_logger("TRAIN_VIT")
 os.environ["WANDB_PROJECT"] = "trader-vit"
 
+def reward_to_label(reward: float) -> int:
+    """Class index the chart models are trained on (0 down, 1 up, 2 flat)."""
+    return 0 if reward < -0.001 else 1 if reward > 0.001 else 2
+
+
 class ViTTrainer:
     def __init__(self, run_name: str) -> None:
         self.run_name = run_name
         self.dataset_dir = Path(cfg["dataset"]["raw_dir"])
         self.output_dir = Path(cfg["model"]["checkpoint_dir"]) / run_name
 
-    def load_dataset(self) -> Dataset:
+    def load_dataset(self, seed: int | None = None) -> Dataset:
         ds = load_dataset("json", data_files=str(self.dataset_dir / "labels.jsonl"))["train"]
         processor = ViTImageProcessor.from_pretrained("google/vit-base-patch16-224-in21k")
 
@@ -36,19 +55,22 @@ class ViTTrainer:
             png = bytes.fromhex(example["png_b64"])
             img = processor(Image.open(BytesIO(png)).convert("RGB"), return_tensors="pt")
             example["pixel_values"] = img["pixel_values"][0]
-            example["labels"] = 0 if example["reward"] < -0.001 else 1 if example["reward"] > 0.001 else 2
+            example["labels"] = reward_to_label(example["reward"])
             return example
 
         ds = ds.map(_process, remove_columns=["png_b64", "reward", "metadata"])
-        return ds.train_test_split(test_size=0.1)
+        return ds.train_test_split(test_size=0.1, seed=seed)
 
-    def train(self) -> None:
-        dataset = self.load_dataset()
-        model = ViTForImageClassification.from_pretrained(
+    def _build_model(self) -> ViTForImageClassification:
+        return ViTForImageClassification.from_pretrained(
             "google/vit-base-patch16-224-in21k",
             num_labels=3,
             ignore_mismatched_sizes=True,
         )
+
+    def train(self) -> None:
+        dataset = self.load_dataset()
+        model = self._build_model()
         args = TrainingArguments(
             output_dir=str(self.output_dir),
             run_name=self.run_name,
@@ -75,9 +97,169 @@ class ViTTrainer:
         trainer.save_model(self.output_dir)
         log.info("Training done. Saved to %s", self.output_dir)
 
+    # ---------- CPU data-parallel ----------
+    def train_ddp(
+        self,
+        world_size: int,
+        grad_accum: int = 1,
+        seed: int = 42,
+        max_steps: int | None = None,
+        save: bool = True,
+    ) -> Dict[str, float]:
+        """
+        Data-parallel CPU training over `world_size` local gloo processes.
+        Each rank sees a disjoint DistributedSampler shard of the train split;
+        gradients are all-reduced once per `grad_accum` micro-batches.
+        Rank 0 writes the checkpoint into the registry dir after a barrier.
+        """
+        ctx = mp.get_context("spawn")
+        results = ctx.SimpleQueue()
+        os.environ.setdefault("MASTER_ADDR", "127.0.0.1")
+        os.environ["MASTER_PORT"] = str(_free_port())
+        mp.spawn(
+            _ddp_worker,
+            args=(world_size, self, grad_accum, seed, max_steps, save, results),
+            nprocs=world_size,
+            join=True,
+        )
+        stats = results.get()
+        log.info("DDP x%d done: %s", world_size, stats)
+        return stats
+
+    def scaling_report(
+        self, workers: Sequence[int] = (1, 2, 4, 8), steps: int = 20, grad_accum: int = 1
+    ) -> Dict[int, float]:
+        """Samples/sec at each world size (fixed per-rank batch, no checkpoint)."""
+        report: Dict[int, float] = {}
+        for n in workers:
+            stats = self.train_ddp(n, grad_accum=grad_accum, max_steps=steps, save=False)
+            report[n] = stats["samples_per_sec"]
+        base = report[workers[0]] or 1.0
+        for n, sps in report.items():
+            log.info("workers=%d  samples/s=%.1f  speedup=%.2fx", n, sps, sps / base)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / "scaling_report.json").write_text(json.dumps(report, indent=2))
+        return report
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _ddp_worker(
+    rank: int,
+    world_size: int,
+    trainer: ViTTrainer,
+    grad_accum: int,
+    seed: int,
+    max_steps: int | None,
+    save: bool,
+    results,
+) -> None:
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+    # split cores between ranks instead of every rank grabbing all of them
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // world_size))
+    torch.manual_seed(seed)
+    try:
+        # rank 0 builds the HF map cache, the others then read it
+        if rank == 0:
+            dataset = trainer.load_dataset(seed)
+        dist.barrier()
+        if rank != 0:
+            dataset = trainer.load_dataset(seed)
+        cols = ["pixel_values", "labels"]
+        train_ds = dataset["train"].with_format("torch", columns=cols)
+        test_ds = dataset["test"].with_format("torch", columns=cols)
+
+        batch_size = cfg["training"]["batch_size"]
+        sampler = DistributedSampler(train_ds, world_size, rank, shuffle=True, seed=seed)
+        loader = DataLoader(train_ds, batch_size=batch_size, sampler=sampler)
+
+        model = DDP(trainer._build_model())
+        opt = torch.optim.AdamW(model.parameters(), lr=cfg["training"].get("lr", 5e-5))
+
+        step, samples, t0 = 0, 0, None
+        model.train()
+        for epoch in range(cfg["training"]["epochs"]):
+            sampler.set_epoch(epoch)
+            for i, batch in enumerate(loader):
+                sync = (i + 1) % grad_accum == 0 or i + 1 == len(loader)
+                with contextlib.nullcontext() if sync else model.no_sync():
+                    loss = model(**batch).loss / grad_accum
+                    loss.backward()
+                if t0 is not None:
+                    samples += len(batch["labels"])
+                if not sync:
+                    continue
+                opt.step()
+                opt.zero_grad(set_to_none=True)
+                step += 1
+                if t0 is None:
+                    t0 = time.perf_counter()  # first step = warm-up, not timed
+                if rank == 0 and step % 50 == 0:
+                    log.info("epoch %d step %d loss %.4f", epoch, step, loss.item() * grad_accum)
+                if max_steps and step >= max_steps:
+                    break
+            if max_steps and step >= max_steps:
+                break
+        elapsed = time.perf_counter() - t0 if t0 is not None else 0.0
+
+        # global throughput + eval accuracy via all-reduce
+        model.eval()
+        correct = total = 0
+        eval_loader = DataLoader(
+            test_ds, batch_size=batch_size,
+            sampler=DistributedSampler(test_ds, world_size, rank, shuffle=False),
+        )
+        with torch.inference_mode():
+            for batch in eval_loader:
+                pred = model(pixel_values=batch["pixel_values"]).logits.argmax(-1)
+                correct += int((pred == batch["labels"]).sum())
+                total += len(batch["labels"])
+        agg = torch.tensor([samples, correct, total], dtype=torch.float64)
+        dist.all_reduce(agg)
+        wall = torch.tensor([elapsed], dtype=torch.float64)
+        dist.all_reduce(wall, op=dist.ReduceOp.MAX)
+
+        dist.barrier()
+        if rank == 0:
+            stats = {
+                "world_size": world_size,
+                "steps": step,
+                "samples_per_sec": float(agg[0] / wall[0]) if wall[0] else 0.0,
+                "eval_accuracy": float(agg[1] / agg[2]) if agg[2] else 0.0,
+            }
+            if save:
+                trainer.output_dir.mkdir(parents=True, exist_ok=True)
+                model.module.save_pretrained(trainer.output_dir, safe_serialization=True)
+                ViTImageProcessor.from_pretrained("google/vit-base-patch16-224-in21k").save_pretrained(
+                    trainer.output_dir
+                )
+                (trainer.output_dir / "train_meta.json").write_text(
+                    json.dumps({**stats, "seed": seed, "grad_accum": grad_accum}, indent=2)
+                )
+                log.info("DDP checkpoint saved to %s", trainer.output_dir)
+            results.put(stats)
+        dist.barrier()
+    finally:
+        dist.destroy_process_group()
+
+
 if __name__ == "__main__":
     import argparse, datetime as dt
     parser = argparse.ArgumentParser()
     parser.add_argument("--run_name", default=f"vit-{dt.date.today().isoformat()}")
+    parser.add_argument("--ddp", type=int, default=0, help="CPU data-parallel processes (0 = HF Trainer)")
+    parser.add_argument("--grad_accum", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scaling_report", action="store_true")
     args = parser.parse_args()
-    ViTTrainer(args.run_name).train()
\ No newline at end of file
+    trainer = ViTTrainer(args.run_name)
+    if args.scaling_report:
+        trainer.scaling_report(grad_accum=args.grad_accum)
+    elif args.ddp:
+        trainer.train_ddp(args.ddp, grad_accum=args.grad_accum, seed=args.seed)
+    else:
+        trainer.train()
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Pluggable clock: wall time in production, simulated time in replays.
+
+Modules read time via get_clock() at call time, never at import, so a
+replay can install a SimClock and drive the live stack faster than real
+time. SimClock only moves when the replay feed advances it; sleepers wake
+in deadline order as it passes their deadline.
+"""
+import asyncio
+import datetime as dt
+import heapq
+import itertools
+import time
+from typing import List, Tuple
+
+
+class Clock:
+    def time(self) -> float:
+        """Epoch seconds."""
+        raise NotImplementedError
+
+    async def sleep(self, seconds: float) -> None:
+        raise NotImplementedError
+
+    def utcnow(self) -> dt.datetime:
+        """Naive UTC, like datetime.utcnow()."""
+        return dt.datetime.fromtimestamp(self.time(), dt.timezone.utc).replace(tzinfo=None)
+
+    def now(self, tz: dt.tzinfo) -> dt.datetime:
+        return dt.datetime.fromtimestamp(self.time(), tz)
+
+
+class WallClock(Clock):
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class SimClock(Clock):
+    def __init__(self, start: float = 0.0) -> None:
+        self._t = float(start)
+        self._seq = itertools.count()
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+
+    def time(self) -> float:
+        return self._t
+
+    async def sleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._t + seconds, next(self._seq), fut))
+        await fut
+
+    @property
+    def pending(self) -> int:
+        return len(self._sleepers)
+
+    async def advance_to(self, t: float) -> None:
+        """Move to t, waking every sleeper due on the way at its own deadline."""
+        while self._sleepers and self._sleepers[0][0] <= t:
+            deadline, _, fut = heapq.heappop(self._sleepers)
+            self._t = max(self._t, deadline)
+            if not fut.done():
+                fut.set_result(None)
+            # let the woken task run up to its next await before time moves on
+            for _ in range(3):
+                await asyncio.sleep(0)
+        self._t = max(self._t, t)
+
+    async def advance(self, seconds: float) -> None:
+        await self.advance_to(self._t + seconds)
+
+    async def drain(self) -> None:
+        """Run every pending sleeper to completion (end of a replay)."""
+        while self._sleepers:
+            await self.advance_to(self._sleepers[0][0])
+
+
+_clock: Clock = WallClock()
+
+
+def get_clock() -> Clock:
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    """Install `clock` process-wide; returns the previous one."""
+    global _clock
+    prev, _clock = _clock, clock
+    return prev
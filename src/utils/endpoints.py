@@ -0,0 +1,43 @@
+"""
+Outbound HTTP endpoints, switchable to the local stub servers.
+
+Set `stubs.enabled: true` in config (or TRADER_STUBS=host:port) and every
+external call – Kimi, Finnhub, macro calendar, audit gateway, prime broker –
+goes to services.stub_servers instead of the real API.
+"""
+import os
+from typing import Dict
+
+from utils.config import load_config
+
+cfg = load_config()
+
+STUB_CFG = cfg.get("stubs", {})
+
+
+def real_urls() -> Dict[str, str]:
+    return {
+        "kimi": "https://api.moonshot.cn/v1/chat/completions",
+        "finnhub": "https://finnhub.io/api/v1/news",
+        "calendar": cfg["risk"]["macro_calendar_url"],
+        "audit": cfg.get("compliance", {}).get("audit_endpoint", ""),
+        "prime": os.getenv("PRIME_BASE_URL", "https://api.prime.example.com"),
+    }
+
+
+def stub_base() -> str | None:
+    """http://host:port of the stub suite, or None when talking to the real services."""
+    env = os.getenv("TRADER_STUBS")
+    if env:
+        return env if env.startswith("http") else f"http://{env}"
+    if STUB_CFG.get("enabled"):
+        return f"http://{STUB_CFG.get('host', '127.0.0.1')}:{STUB_CFG.get('port', 8765)}"
+    return None
+
+
+def endpoint(name: str, real: str | None = None) -> str:
+    """Stub URL for `name` when stubs are on, else `real` (default: the known production URL)."""
+    base = stub_base()
+    if base:
+        return f"{base}/{name}"
+    return real if real is not None else real_urls()[name]
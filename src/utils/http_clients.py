@@ -0,0 +1,159 @@
+"""
+Shared, long-lived HTTP clients – one pooled keep-alive client per upstream.
+
+    r = await http_client("kimi").post(url, json=payload)
+
+Every outbound service (Kimi, Finnhub, macro calendar, audit gateway, prime
+broker, Polygon) gets its own httpx.AsyncClient with a connection pool,
+HTTP/2 when `h2` is installed, and a policy from the `http:` config section:
+timeouts, a concurrency limit, and a retry budget (retries are capped at a
+fraction of recent traffic, so a failing upstream never sees a retry storm).
+Orders to the prime broker are never retried.
+
+Clients are per event loop: asyncio pools can't cross loops, and replays,
+tests and benchmarks each run their own.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import random
+import time
+import weakref
+from dataclasses import dataclass, fields
+from typing import Any, Dict
+
+import httpx
+from prometheus_client import Counter, Histogram
+
+from utils.config import load_config
+from utils.logger import get_logger
+
+cfg = load_config()
+log = get_logger("HTTP")
+
+HTTP_CFG = cfg.get("http", {})
+HAS_H2 = importlib.util.find_spec("h2") is not None
+RETRY_STATUS = {502, 503, 504}
+
+HTTP_REQUESTS = Counter("http_client_requests_total", "Outbound HTTP requests", ["service", "status"])
+HTTP_RETRIES = Counter("http_client_retries_total", "Outbound HTTP retries", ["service"])
+HTTP_CONNECTS = Counter("http_client_connections_total", "New TCP connections opened (requests − this = reuse)",
+                        ["service"])
+HTTP_LATENCY = Histogram("http_client_latency_seconds", "Outbound HTTP latency incl. retries", ["service"],
+                         buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+
+
+@dataclass
+class Policy:
+    timeout_s: float | None = 5.0      # None → no read timeout (streams)
+    connect_timeout_s: float = 2.0
+    max_connections: int = 10
+    keepalive_s: float = 60.0
+    concurrency: int = 10              # in-flight requests per service
+    retries: int = 1                   # per call, on transport errors / 502-504
+    backoff_ms: float = 50.0
+    retry_ratio: float = 0.2           # retry budget: tokens earned per request…
+    retry_burst: float = 5.0           # …up to this many banked retries
+    http2: bool = True
+
+
+def policy(service: str, section: Dict[str, Any] = HTTP_CFG) -> Policy:
+    known = {f.name for f in fields(Policy)}
+    merged = {**section.get("default", {}), **section.get("services", {}).get(service, {})}
+    return Policy(**{k: v for k, v in merged.items() if k in known})
+
+
+class RetryBudget:
+    def __init__(self, ratio: float, burst: float) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self.balance = burst
+
+    def deposit(self) -> None:
+        self.balance = min(self.burst, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.balance >= 1.0:
+            self.balance -= 1.0
+            return True
+        return False
+
+
+class ServiceClient:
+    def __init__(self, service: str, pol: Policy | None = None) -> None:
+        self.service = service
+        self.policy = pol or policy(service)
+        p = self.policy
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(p.timeout_s, connect=p.connect_timeout_s),
+            limits=httpx.Limits(max_connections=p.max_connections, max_keepalive_connections=p.max_connections,
+                                keepalive_expiry=p.keepalive_s),
+            http2=p.http2 and HAS_H2,
+        )
+        self.budget = RetryBudget(p.retry_ratio, p.retry_burst)
+        self._sem = asyncio.Semaphore(p.concurrency)
+        self._connects = HTTP_CONNECTS.labels(service=service)
+
+    async def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            self._connects.inc()
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """One logical call: pooled, concurrency-limited, retried within budget. Caller checks status."""
+        kwargs.setdefault("extensions", {})["trace"] = self._trace
+        t0 = time.perf_counter()
+        attempt = 0
+        async with self._sem:
+            self.budget.deposit()
+            while True:
+                try:
+                    r = await self.http.request(method, url, **kwargs)
+                    status, err = str(r.status_code), None
+                except httpx.TransportError as e:
+                    r, status, err = None, type(e).__name__, e
+                retryable = err is not None or r.status_code in RETRY_STATUS
+                if retryable and attempt < self.policy.retries and self.budget.withdraw():
+                    HTTP_REQUESTS.labels(service=self.service, status=status).inc()
+                    HTTP_RETRIES.labels(service=self.service).inc()
+                    attempt += 1
+                    await asyncio.sleep(self.policy.backoff_ms / 1e3 * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+                    continue
+                HTTP_REQUESTS.labels(service=self.service, status=status).inc()
+                HTTP_LATENCY.labels(service=self.service).observe(time.perf_counter() - t0)
+                if err is not None:
+                    raise err
+                return r
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs: Any):
+        """Long-lived streaming response on the pooled client (no retries, no concurrency slot)."""
+        return self.http.stream(method, url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+
+# ---------------- registry ----------------
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ServiceClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def http_client(service: str) -> ServiceClient:
+    """The shared client for `service` on the running loop (created on first use)."""
+    per_loop = _clients.setdefault(asyncio.get_running_loop(), {})
+    if service not in per_loop:
+        per_loop[service] = ServiceClient(service)
+        log.debug("HTTP client for %s: %s", service, per_loop[service].policy)
+    return per_loop[service]
+
+
+async def close_all() -> None:
+    for c in _clients.pop(asyncio.get_running_loop(), {}).values():
+        await c.aclose()
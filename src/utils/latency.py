@@ -1,8 +1,8 @@
 """Latency guard."""
-import asyncio
-import time
+import datetime as dt
 from typing import Final
 
+from utils.clock import get_clock
 from utils.config import load_config
 
 cfg = load_config()
@@ -12,5 +12,8 @@ class LatencyGuard:
     def __init__(self, max_ms: int) -> None:
         self.max_ms = max_ms
 
-    def too_slow(self) -> bool:
-        return time.perf_counter_ns() // 1_000_000 > self.max_ms
\ No newline at end of file
+    def too_slow(self, tick_time: dt.datetime | None) -> bool:
+        """Tick older than max_ms on the session clock (no timestamp → let it through)."""
+        if tick_time is None:
+            return False
+        return (get_clock().time() - tick_time.timestamp()) * 1e3 > self.max_ms
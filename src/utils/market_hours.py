@@ -4,10 +4,12 @@ from typing import Tuple
 
 import pytz
 
+from utils.clock import get_clock
+
 ET = pytz.timezone("US/Eastern")
 
 def is_market_hours() -> bool:
-    now = dt.datetime.now(ET)
+    now = get_clock().now(ET)
     if now.weekday() >= 5:
         return False
     open_time = now.replace(hour=9, minute=30, second=0, microsecond=0)
@@ -15,6 +17,6 @@ def is_market_hours() -> bool:
     return open_time <= now <= close_time
 
 def minutes_to_close() -> int:
-    now = dt.datetime.now(ET)
+    now = get_clock().now(ET)
     close = now.replace(hour=16, minute=0, second=0, microsecond=0)
     return max(0, int((close - now).total_seconds() / 60))
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Shared fixtures.
+
+Tests of modules that register Prometheus metrics or read the clock import
+them flat (`from execution.order_manager import …`), the way app code does,
+not as `src.execution…`: the two spellings are separate module objects, so
+mixing them registers every metric twice and `set_clock()` would install a
+clock the code under test never reads. `src/` goes on sys.path for that.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.clock import SimClock, set_clock  # noqa: E402
+
+
+@pytest.fixture
+def sim_clock():
+    """A SimClock at t=0 installed process-wide for the test, then the previous clock back."""
+    clock = SimClock(0.0)
+    prev = set_clock(clock)
+    yield clock
+    set_clock(prev)
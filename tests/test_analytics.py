@@ -0,0 +1,29 @@
+"""Unit test."""
+import numpy as np
+import pandas as pd
+
+from src.performance import analytics
+
+
+def test_matrix_metrics_match_columns() -> None:
+    rng = np.random.default_rng(0)
+    pnl = rng.normal(0.01, 1.0, (500, 4))
+    cols = [analytics.summarize(pnl[:, k]) for k in range(4)]
+    table = analytics.compare(pnl)
+    for k, row in enumerate(cols):
+        assert np.isclose(table["sharpe"][k], row["sharpe"])
+        assert np.isclose(table["max_dd"][k], row["max_dd"])
+    ref = pd.Series(pnl[:, 0]).rolling(50)
+    np.testing.assert_allclose(
+        analytics.rolling_sharpe(pnl[:, 0], 50, 1)[49:],
+        (ref.mean() / ref.std(ddof=0)).to_numpy()[49:],
+    )
+
+
+def test_drawdown_and_legs() -> None:
+    equity = np.array([0, 2, 1, -1, 3, 2, 2])
+    assert analytics.max_drawdown(equity) == (3.0, 2.0)
+    pos = np.array([0, 1, 1, 0, -1, -1, 1])
+    pnl = np.array([0, 0, 2, -1, 0, 3, -2])   # earned on pos[t-1]
+    assert analytics.leg_pnl(pos, pnl).tolist() == [1.0, 1.0, 0.0]
+    assert analytics.hit_rate([1.0, -1.0, 2.0, 0.0]) == 2 / 3
@@ -0,0 +1,51 @@
+"""Unit test."""
+import numpy as np
+import pandas as pd
+
+from backtest import orchestrator as orch_mod
+from backtest.engine import BackTestEngine
+from backtest.orchestrator import BacktestOrchestrator, make_shards
+
+
+def _engine(lookback: int = 60) -> BackTestEngine:
+    engine = BackTestEngine.__new__(BackTestEngine)  # no encoder load
+    engine.lookback, engine.qty = lookback, 100
+    return engine
+
+
+def _bars(n: int) -> pd.DataFrame:
+    close = 100 + np.arange(n, dtype=np.float64)
+    idx = pd.date_range("2024-01-02 09:30", periods=n, freq="min")
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close}, index=idx)
+
+
+def test_fewer_bars_than_lookback_give_no_trades() -> None:
+    engine = _engine()
+    for n in (0, 10, 59):
+        assert engine.windows(_bars(n)).shape == (0, 60, 4)
+        trades = engine.run(_bars(n))
+        assert trades.empty and list(trades.columns) == ["ts", "action", "confidence", "price", "slippage_bps"]
+        assert engine.daily_pnl(_bars(n), trades).sum() == 0.0
+    assert engine.windows(_bars(60)).shape == (1, 60, 4)
+
+
+def _init_worker(lookback: int, qty: int, threads: int) -> None:
+    orch_mod._engine = _engine(lookback)
+
+
+def test_orchestrator_marks_short_shards_done(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(orch_mod, "_init_worker", _init_worker)   # forked workers inherit it
+    bars_dir = tmp_path / "bars"
+    bars_dir.mkdir()
+    for sym, start, n in (("OLD", "2024-01-02 09:30", 3 * 1440), ("NEW", "2024-01-04 09:30", 10)):
+        idx = pd.date_range(start, periods=n, freq="min", name="timestamp")
+        pd.DataFrame({"open": 10.0, "high": 10.0, "low": 10.0, "close": 10.0, "volume": 1},
+                     index=idx).to_csv(bars_dir / f"{sym}_1m.csv")
+    shards = make_shards(["OLD", "NEW"], "2024-01-02", "2024-01-05", period="D")
+
+    orch = BacktestOrchestrator(out_dir=tmp_path / "out", bars_dir=bars_dir, workers=2)
+    assert orch.run(shards) == {}            # NEW: no bars, then 10 bars < lookback
+    assert all(orch.done(s) for s in shards)
+    merged = orch.merge()
+    assert merged["trades"].empty
+    assert set(merged["equity"]["symbol"]) == {"OLD", "NEW"} and merged["equity"]["pnl"].eq(0).all()
@@ -0,0 +1,27 @@
+"""Unit test."""
+from src.benchmarks.harness import Case, baseline, load_history, record, regressions, run_case
+
+
+def test_run_case_and_skip() -> None:
+    buf = []
+    res = run_case(Case("append", lambda: (lambda: buf.append(bytearray(4096))), number=50, alloc_calls=5))
+    assert res["n"] == 50 and res["p50_us"] <= res["p99_us"]
+    assert res["ops_per_s"] > 0 and res["alloc_peak_kb"] >= 4
+
+    def broken():
+        raise ImportError("no weights")
+    assert "skipped" in run_case(Case("broken", broken))
+
+
+def test_gate_against_history(tmp_path) -> None:
+    path = tmp_path / "history.jsonl"
+    for p50 in (100.0, 110.0, 90.0):
+        record({"x": {"p50_us": p50, "p99_us": 200.0, "alloc_peak_kb": 10.0}}, path)
+    base = baseline(load_history(path))
+    assert base["x"]["p50_us"] == 100.0
+    ok = {"x": {"p50_us": 110.0, "p99_us": 250.0, "alloc_peak_kb": 10.0}}
+    slow = {"x": {"p50_us": 130.0, "p99_us": 200.0, "alloc_peak_kb": 20.0}}
+    assert regressions(ok, base) == []
+    bad = regressions(slow, base)
+    assert len(bad) == 2 and bad[0].startswith("x.p50_us")
+    assert regressions({"x": {"skipped": "ImportError"}}, base) == []
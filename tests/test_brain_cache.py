@@ -0,0 +1,32 @@
+"""Unit test."""
+import asyncio
+
+from brain import KimiDecisionMaker
+from brain_cache import STUB, CachedDecisionMaker, DecisionCache
+
+
+def test_round_trip_after_reload_including_nul_terminated_keys(tmp_path) -> None:
+    cache = DecisionCache(tmp_path)
+    keys = [bytes(range(1, 16)) + b"\0", b"\0" * 16, DecisionCache.key("kimi", "prompt", b"png")]
+    for i, k in enumerate(keys):
+        cache.put(k, f'{{"action": "BUY", "i": {i}}}')
+
+    again = DecisionCache(tmp_path)
+    assert len(again) == 3
+    for i, k in enumerate(keys):
+        assert k in again and again.get(k) == f'{{"action": "BUY", "i": {i}}}'
+
+
+def test_record_caches_only_valid_decisions(tmp_path, monkeypatch) -> None:
+    answers = ['{"action": "BUY", "stop_loss": 1.0}', STUB]   # truncated JSON, then a valid one
+
+    async def complete(self, png, prompt):
+        return answers.pop(0)
+    monkeypatch.setattr(KimiDecisionMaker, "complete", complete)
+    maker = CachedDecisionMaker({"kimi_model": "kimi"}, "record", DecisionCache(tmp_path))
+
+    assert asyncio.run(maker.complete(b"png", "prompt")).startswith('{"action": "BUY"')
+    assert len(maker.cache) == 0                               # asked again, not replayed
+    assert asyncio.run(maker.complete(b"png", "prompt")) == STUB
+    assert len(maker.cache) == 1 and maker.misses == 2
+    assert asyncio.run(maker.complete(b"png", "prompt")) == STUB and maker.hits == 1
@@ -0,0 +1,38 @@
+"""Unit test."""
+import asyncio
+
+from ib_insync import Stock
+
+from data_ingestion.lob_stream import LobStream
+from execution.broker import Broker
+from execution.decision_context import DecisionContext
+from execution.fake_ib import FakeIB
+from execution.risk import SizedOrder
+from utils.config import load_config
+
+
+def test_only_passive_orders_train_the_fill_model() -> None:
+    c = Stock("BRKTEST", "SMART", "USD")
+    ib = FakeIB(nav=1_000_000, latency_ms=0)
+    ib.quote(c, 0.0, 20.0, size=1_000)
+    broker = Broker(load_config()["risk"], ib=ib)
+    broker.risk.macro_blackout = lambda: False
+    model = broker.fill_models[c.symbol]
+
+    async def send(qty: int, t: float):
+        lob = await LobStream(ib).stream(c).__anext__()
+        ctx = DecisionContext.capture(ib, c).with_(lob=lob, sized=SizedOrder(
+            action="BUY", qty=qty, limit=20.0, stop=19.0, take=21.0))
+        route = broker.router.route(lob, "BUY", qty)
+        mo = await broker.execute(None, c, ctx)
+        ib.quote(c, t, 20.0, size=1_000)
+        await mo.wait()
+        await asyncio.sleep(0)
+        return route.action, model.n
+
+    async def run():
+        n0 = model.n
+        assert await send(600, 1.0) == ("AGGRESSIVE", n0)        # market order: no update
+        assert await send(100, 2.0) == ("PASSIVE", n0 + 1)
+
+    asyncio.run(run())
@@ -0,0 +1,24 @@
+"""Unit test."""
+import asyncio
+
+from src.utils.clock import SimClock
+
+
+def test_sim_clock_wakes_sleepers_in_deadline_order() -> None:
+    clock = SimClock(start=100.0)
+    woke = []
+
+    async def sleeper(name: str, s: float) -> None:
+        await clock.sleep(s)
+        woke.append((name, clock.time()))
+
+    async def main() -> None:
+        tasks = [asyncio.create_task(sleeper("late", 300)), asyncio.create_task(sleeper("early", 5))]
+        await asyncio.sleep(0)
+        await clock.advance_to(160.0)
+        assert woke == [("early", 105.0)] and clock.time() == 160.0
+        await clock.drain()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert woke == [("early", 105.0), ("late", 400.0)]
@@ -0,0 +1,37 @@
+"""Unit test."""
+import asyncio
+from collections import Counter
+
+from ib_insync import MarketOrder, Stock
+
+from src.data_ingestion.lob_stream import LobStream
+from execution.broker import Broker
+from src.execution.decision_context import DecisionContext
+from src.execution.fake_ib import FakeIB
+from src.utils.config import load_config
+
+
+def test_broker_consumes_context_without_requerying() -> None:
+    c = Stock("INTC", "SMART", "USD")
+    ib = FakeIB(nav=100_000, latency_ms=0)
+    ib.quote(c, 0.0, 20.0)
+    ib.placeOrder(c, MarketOrder("BUY", 100))
+    ib.quote(c, 1.0, 20.0, size=10_000)   # deep enough that the order isn't sliced by an algo
+    broker = Broker(load_config()["risk"], ib=ib)
+    broker.risk.macro_blackout = lambda: False
+
+    async def run() -> Counter:
+        lob = await LobStream(ib).stream(c).__anext__()
+        ctx = DecisionContext.capture(ib, c)
+        assert ctx.account.nav == 100_000 - 1.0 and ctx.account.position(c)["qty"] == 100   # bought at 20.01
+        ctx = ctx.with_(lob=lob, sized=broker.risk.size_order(ctx.account.nav, ctx.price, ctx.account.margin_usage))
+        calls = Counter()
+        for name in ("accountValues", "positions", "reqMktData", "reqMktDepth"):
+            orig = getattr(ib, name)
+            setattr(ib, name, lambda *a, _o=orig, _n=name, **k: calls.update([_n]) or _o(*a, **k))
+        seen = len(ib.order_log)
+        await broker.execute(None, c, ctx)
+        assert len(ib.order_log) == seen + 1
+        return calls
+
+    assert asyncio.run(run()) == Counter()
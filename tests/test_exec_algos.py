@@ -0,0 +1,106 @@
+"""Unit test."""
+import asyncio
+
+from ib_insync import Stock
+
+from data_ingestion.lob_stream import LobTick
+from execution.exec_algos import AlgoScheduler, slice_weights
+from execution.fake_ib import FakeIB
+from execution.fill_model import FillModels
+from execution.order_manager import OrderState
+
+
+def _run(clock, qty: int, horizon_s: float, **kw):
+    async def run():
+        c = Stock("INTC", "SMART", "USD")
+        ib = FakeIB(latency_ms=0)
+        ib.quote(c, 0.0, 100.0)                       # 5 levels × 100 a side
+        sched = AlgoScheduler(ib, FillModels(), slice_s=10, passive_min_prob=0.6, **kw)
+        parent = sched.submit(c, "BUY", qty, "TWAP", horizon_s=horizon_s)
+        t = 0.0
+        while not parent.done.done() and t < 100:
+            for _ in range(3):
+                await asyncio.sleep(0)
+            ib.quote(c, t + 0.5, 100.0)               # children arrive and trade
+            t += 5.0
+            await clock.advance_to(t)
+        return parent
+    return asyncio.run(run())
+
+
+def test_twap_slices_evenly(sim_clock) -> None:
+    parent = _run(sim_clock, 300, horizon_s=30, max_child_depth_frac=0.25)
+    assert parent.state == OrderState.FILLED and parent.filled == 300
+    assert [c.qty for c in parent.children] == [100, 100, 100]
+    assert all(c.limit == 100.01 for c in parent.children)   # cold FillModel → marketable at level 1
+
+
+def test_remainder_after_the_horizon_stays_depth_capped(sim_clock) -> None:
+    parent = _run(sim_clock, 300, horizon_s=10, max_child_depth_frac=0.1, finish_s=60, finish_slice_s=5)
+    assert parent.filled == 300 and parent.state == OrderState.FILLED
+    assert len(parent.children) == 6 and all(c.qty <= 50 and c.limit is not None for c in parent.children)
+
+
+def test_hard_deadline_leaves_the_rest_unfilled(sim_clock) -> None:
+    parent = _run(sim_clock, 300, horizon_s=10, max_child_depth_frac=0.1, finish_s=12, finish_slice_s=5)
+    assert parent.state == OrderState.CANCELLED and parent.filled == 200
+    assert max(c.qty for c in parent.children) == 50
+
+
+def test_parents_share_one_depth_subscription(sim_clock) -> None:
+    async def run():
+        c = Stock("INTC", "SMART", "USD")
+        ib = FakeIB(latency_ms=0)
+        ib.quote(c, 0.0, 100.0)
+        subs = []
+        req, cancel = ib.reqMktDepth, ib.cancelMktDepth
+        ib.reqMktDepth = lambda *a, **kw: subs.append("req") or req(*a, **kw)
+        ib.cancelMktDepth = lambda *a, **kw: subs.append("cancel") or cancel(*a, **kw)
+        sched = AlgoScheduler(ib, FillModels(), slice_s=10, finish="cancel")
+        parents = [sched.submit(c, "BUY", 100, "TWAP", horizon_s=20) for _ in range(3)]
+        t = 0.0
+        while t < 120:
+            for _ in range(3):
+                await asyncio.sleep(0)
+            if len(parents) == 3 and all(p.done.done() for p in parents):
+                assert subs == ["req", "cancel"] and sched._depth == {}
+                parents.append(sched.submit(c, "SELL", 10, "TWAP", horizon_s=20))   # subscribes afresh
+            ib.quote(c, t + 0.5, 100.0)
+            t += 5.0
+            await sim_clock.advance_to(t)
+        assert len(parents) == 4 and parents[-1].done.done()
+        assert subs == ["req", "cancel", "req", "cancel"]
+    asyncio.run(run())
+
+
+def test_arrival_mid_waits_for_the_first_book(sim_clock) -> None:
+    async def run():
+        c = Stock("INTC", "SMART", "USD")
+        ib = FakeIB(latency_ms=0)
+        sched = AlgoScheduler(ib, FillModels(), slice_s=10, finish="cancel")
+        routed = sched.submit(c, "BUY", 10, "TWAP", horizon_s=10,
+                              lob=LobTick(c, [(49.99, 100)], [(50.01, 100)], 0.0, 0))
+        fresh = sched.submit(c, "BUY", 10, "TWAP", horizon_s=10)
+        assert routed.arrival_mid == 50.0 and fresh.arrival_mid == 0.0   # nothing subscribed yet
+        for _ in range(3):
+            await asyncio.sleep(0)
+        ib.quote(c, 0.5, 100.0)                    # first depth snapshot lands
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert fresh.arrival_mid == 100.0
+        t = 0.0
+        while t < 60:
+            ib.quote(c, t + 0.5, 100.0)
+            t += 5.0
+            await sim_clock.advance_to(t)
+            for _ in range(3):
+                await asyncio.sleep(0)
+        assert fresh.done.done() and fresh.filled == 10
+    asyncio.run(run())
+
+
+def test_vwap_weights_follow_the_curve() -> None:
+    open_ts = 1704205800.0                                 # 2024-01-02 09:30 ET
+    w = slice_weights("VWAP", open_ts, 2, 1800)
+    assert abs(w[-1] - 1.0) < 1e-9 and w[0] > 0.5         # opening bucket is the heavier one
+    assert slice_weights("TWAP", open_ts, 4, 60) == [0.25, 0.5, 0.75, 1.0]
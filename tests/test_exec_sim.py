@@ -0,0 +1,30 @@
+"""Unit test."""
+from ib_insync import LimitOrder, MarketOrder, Stock
+
+from src.execution.exec_sim import SimIB
+
+
+def test_sweep_queue_and_cancel() -> None:
+    c = Stock("INTC", "SMART", "USD")
+    ib = SimIB(latency_ms=5)
+    book = ([(99.99, 100), (99.98, 200)], [(100.01, 50), (100.02, 100), (100.03, 100)])
+    ib.feed_depth(c, 0.0, *book)
+
+    mkt = ib.placeOrder(c, MarketOrder("BUY", 120))
+    lmt = ib.placeOrder(c, LimitOrder("BUY", 30, 99.99))
+    ib.feed_depth(c, 0.01, *book)  # both arrive after 5 ms
+    assert mkt.orderStatus.status == "Filled"
+    assert abs(mkt.orderStatus.avgFillPrice - (50 * 100.01 + 70 * 100.02) / 120) < 1e-9
+    assert ib.engines["INTC"].orders[lmt.order.orderId].queue_ahead == 100
+
+    # 40 shares cancelled at our level → pro-rata, all of it was ahead of us
+    ib.feed_depth(c, 0.02, [(99.99, 60), (99.98, 200)], [(100.01, 50)])
+    # 70 print: 60 ahead of us, then 10 to us
+    ib.feed_trade(c, 0.03, 99.99, 70)
+    assert lmt.orderStatus.filled == 10 and lmt.orderStatus.status == "Submitted"
+
+    ib.cancelOrder(lmt.order)
+    ib.feed_depth(c, 0.032, [(99.99, 60)], [(100.01, 50)])
+    assert lmt.orderStatus.status == "PendingCancel"  # cancel still in flight
+    ib.feed_depth(c, 0.04, [(99.99, 60)], [(100.01, 50)])
+    assert lmt.orderStatus.status == "Cancelled" and lmt.orderStatus.filled == 10
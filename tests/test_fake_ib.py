@@ -0,0 +1,27 @@
+"""Unit test."""
+import asyncio
+
+from ib_insync import MarketOrder, Stock
+
+from src.data_ingestion.lob_stream import LobStream
+from src.execution.fake_ib import FakeIB
+
+
+def test_account_tracks_fills_and_depth_snapshot() -> None:
+    c = Stock("INTC", "SMART", "USD")
+    ib = FakeIB(nav=10_000, latency_ms=1)
+    ib.quote(c, 0.0, 20.0)
+    ib.placeOrder(c, MarketOrder("BUY", 100))
+    ib.quote(c, 0.01, 20.5)   # order arrived at 0.001 against the 20.0 book
+
+    pos = ib.positions()
+    assert pos[0].position == 100 and pos[0].averageCost == 20.01
+    nav = ib.accountValues()[0]
+    assert nav.key == "NetLiquidation"
+    assert abs(nav.netLiquidation - (10_000 + 100 * (20.5 - 20.01))) < 1e-6
+
+    async def snapshot():
+        return await LobStream(ib).stream(c).__anext__()
+
+    lob = asyncio.run(snapshot())
+    assert lob.bid[0] == (20.49, 100) and lob.ask[0] == (20.51, 100)
@@ -0,0 +1,29 @@
+"""Unit test."""
+import asyncio
+
+import numpy as np
+
+from execution.fill_model import FillModel, FillModels
+
+
+def test_online_updates_learn_queue_effect_and_snapshot(tmp_path) -> None:
+    m = FillModel("TEST", min_samples=20, snapshot_every=100)
+    m.path = str(tmp_path / "fillmodel_TEST.npz")
+    assert m.predict(100, 50, 1000) == 0.5                     # cold start
+    rng = np.random.default_rng(0)
+
+    async def feed():
+        for _ in range(400):
+            qty, ahead = int(rng.integers(50, 500)), int(rng.integers(0, 5000))
+            m.update(qty, ahead, int(rng.integers(200, 3000)), filled=ahead < 1000)
+        await m._saving                                        # written off the loop
+        m.snapshot()                                           # updates since the one in flight
+        await m._saving
+
+    asyncio.run(feed())
+    assert m.predict(100, 100, 1000) > 0.8 > 0.2 > m.predict(100, 4000, 1000)
+
+    again = FillModels(min_samples=20)
+    again["TEST"].path = m.path
+    again["TEST"]._load()
+    assert again["TEST"].n == 400 and abs(again["TEST"].predict(100, 100, 1000) - m.predict(100, 100, 1000)) < 1e-12
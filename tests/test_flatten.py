@@ -0,0 +1,48 @@
+"""Unit test."""
+import asyncio
+
+from ib_insync import Stock
+
+from execution.fake_ib import FakeIB, _Book
+from execution.flatten import Flattener
+from execution.order_manager import OrderManager
+
+
+def _flatten(clock, n: int, illiquid_until: float = 0.0):
+    """n positions; the first one has no liquidity until `illiquid_until` (sim seconds)."""
+    async def run():
+        ib = FakeIB(latency_ms=0)
+        contracts = [Stock(f"S{i:03d}", "SMART", "USD") for i in range(n)]
+        for i, c in enumerate(contracts):
+            ib.quote(c, 0.0, 50.0 + i, size=0 if i == 0 and illiquid_until else 100)
+            ib.book[c.symbol] = _Book(qty=100 * (i % 4 + 1) * (-1) ** i, avg=50.0 + i, contract=c)
+        flattener = Flattener(ib, OrderManager(ib), deadline_s=30, attempt_timeout_s=5, max_rounds=3)
+        task = asyncio.create_task(flattener.run())
+        for _ in range(3):
+            await asyncio.sleep(0)
+        placed_before_any_fill = len(ib.order_log)
+        t = 0.0
+        while not task.done():
+            t += 0.5
+            for i, c in enumerate(contracts):
+                dry = i == 0 and t < illiquid_until
+                ib.quote(c, t, 50.0 + i, size=0 if dry else 100)
+            await clock.advance_to(t)
+            for _ in range(3):
+                await asyncio.sleep(0)
+        return await task, placed_before_any_fill, ib
+    return asyncio.run(run())
+
+
+def test_flattens_200_positions_concurrently_and_confirms(sim_clock) -> None:
+    report, placed_before_any_fill, ib = _flatten(sim_clock, 200)
+    assert placed_before_any_fill == 200                       # all sent before the first fill
+    assert report.complete and report.rounds == 1 and report.orders == 200
+    assert ib.positions() == [] and not report.failed
+    assert sum(abs(q) for q in report.closed.values()) == sum(100 * (i % 4 + 1) for i in range(200))
+
+
+def test_unfilled_residual_escalates_to_the_next_round(sim_clock) -> None:
+    report, _, ib = _flatten(sim_clock, 3, illiquid_until=6.0)
+    assert report.complete and ib.positions() == []
+    assert report.rounds == 2 and report.escalations == 1 and report.failed == ["S000: CANCELLED (0/100)"]
@@ -0,0 +1,21 @@
+"""Unit test."""
+import numpy as np
+import pandas as pd
+
+from src.labeling.future_return_labeler import FutureReturnLabeler
+
+
+def test_label_history_matches_forward_returns() -> None:
+    close = pd.Series([100.0, 101.0, 99.0, 99.4, 102.0, 102.0])
+    out = FutureReturnLabeler().label_history(close, horizons=[1, 2], thresholds=[0.005, 0.02])
+
+    assert out.action.shape == (2, 2, len(close))
+    assert np.isclose(out.forward_ret[0, 0], 0.01)
+    assert not out.valid[0, -1] and not out.valid[1, -2:].any()
+
+    # h=1, thr=0.5 %: +1 %, -1.98 %, +0.4 %, +2.6 %, 0 %, tail
+    assert out.action[0, 0].tolist() == [1, 2, 0, 1, 0, 0]
+    # thr=2 % only keeps the +2.6 % move
+    assert out.action[0, 1].tolist() == [0, 0, 0, 1, 0, 0]
+    assert out.reward[0, 1, 3] > 0.02 and out.reward[0, 1, 0] == 0.0
+    assert list(out.to_frame().index) == list(close.index)
@@ -0,0 +1,35 @@
+"""Unit test."""
+import asyncio
+
+from services.stub_servers import SERVICES, Profile, StubServer
+from utils.http_clients import Policy, RetryBudget, ServiceClient, policy
+
+
+def test_policy_and_budget() -> None:
+    section = {"default": {"timeout_s": 5, "retries": 1}, "services": {"prime": {"retries": 0}}}
+    assert policy("prime", section).retries == 0 and policy("kimi", section).retries == 1
+    assert policy("prime").retries == policy("audit").retries == 0   # non-idempotent POSTs
+    budget = RetryBudget(ratio=0.5, burst=1.0)
+    assert budget.withdraw() and not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_keepalive_reuse_and_retries() -> None:
+    async def run():
+        srv = await StubServer(port=0, seed=0, profiles={
+            s: Profile(median_ms=0, sigma=0, error_rate=0.5 if s == "audit" else 0.0) for s in SERVICES
+        }).start()
+        ok = ServiceClient("test_reuse", Policy(retries=0))
+        for _ in range(10):
+            assert (await ok.get(f"{srv.url}/finnhub")).status_code == 200
+        flaky = ServiceClient("test_retry", Policy(retries=3, backoff_ms=0, retry_ratio=0.0, retry_burst=2))
+        codes = [(await flaky.post(f"{srv.url}/audit", json={})).status_code for _ in range(20)]
+        await ok.aclose(), await flaky.aclose()
+        await srv.stop()
+        return ok._connects._value.get(), codes, srv.stats
+    connects, codes, stats = asyncio.run(run())
+    assert connects == 1
+    assert stats["audit.requests"] == 20 + 2          # budget allowed exactly two retries
+    assert codes.count(503) == stats["audit.errors"] - 2
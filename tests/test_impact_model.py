@@ -0,0 +1,34 @@
+"""Unit test."""
+import numpy as np
+
+from src.data_ingestion.lob_stream import LobTick
+from src.execution.impact_model import ImpactModel
+
+BOOK = LobTick(None, [(round(100 - 0.01 * k, 2), 300 * k) for k in range(1, 6)],
+               [(round(100 + 0.01 * k, 2), 300 * k) for k in range(1, 6)], 0.0, 0)
+
+
+def test_batch_matches_scalar_and_includes_impact_terms() -> None:
+    m = ImpactModel(gamma=0.05, eta=0.01)
+    qty = np.arange(0, 6000, 37)
+    sides = np.where(qty % 2, "BUY", "SELL")
+    batch = m.estimate_many(qty, sides, BOOK)
+    for i, (q, s) in enumerate(zip(qty, sides)):
+        assert m.estimate(int(q), s, BOOK) == batch[i]
+    e = m.estimate(900, "BUY", BOOK)
+    assert e.temporary_impact == 0.05 * 900 / 4500 and e.cost_bps > e.slippage_bps > 0
+
+
+def test_max_qty_is_the_largest_quantity_inside_the_budget() -> None:
+    m = ImpactModel(gamma=0.05, eta=0.01)
+    qty = np.arange(0, 8001)
+    for side in ("BUY", "SELL"):
+        batch = m.estimate_many(qty, side, BOOK)
+        for slip, cost in ((0, None), (2, None), (None, 3.0), (3, 4.5)):
+            fits = np.ones(len(qty), bool)
+            if slip is not None:
+                fits &= np.abs(batch.slippage_bps) <= slip + 1e-9
+            if cost is not None:
+                fits &= batch.cost_bps <= cost + 1e-9
+            assert m.max_qty(side, BOOK, slip, cost, upper=8000) == np.argmin(fits) - 1
+    assert m.max_qty("BUY", BOOK, 15, upper=700) == 700
@@ -0,0 +1,37 @@
+"""Unit test."""
+import asyncio
+import datetime as dt
+
+from data_ingestion.macro_calendar import MacroCalendar, MacroEvent, parse_event
+
+DAY = dt.date(2024, 1, 2)
+NFP = dt.datetime(2024, 1, 2, 13, 30, tzinfo=dt.timezone.utc).timestamp()
+
+
+def test_window_lookup() -> None:
+    cal = MacroCalendar(url="http://unused")
+    cal.load([parse_event({"title": "NFP", "importance": 1, "date": "2024-01-02T13:30:00Z"}),
+              MacroEvent(NFP - 3600, "PMI", "Low")], DAY)
+    assert cal.high_impact_within(30, 15, now=NFP - 29 * 60)
+    assert not cal.high_impact_within(30, 15, now=NFP - 31 * 60)
+    assert cal.high_impact_within(30, 15, now=NFP + 14 * 60)
+    assert not cal.high_impact_within(30, 15, now=NFP + 16 * 60)
+    assert cal.high_impact_within(30, 15, impact="Low", now=NFP - 3600)
+
+
+def test_untimed_event_blocks_its_day_only() -> None:
+    cal = MacroCalendar(url="http://unused")
+    cal.load([parse_event({"title": "FOMC", "impact": "High"})], DAY)
+    assert cal.high_impact_within(now=NFP)
+    assert not cal.high_impact_within(now=NFP + 86_400)
+
+
+def test_failed_refresh_keeps_last_snapshot() -> None:
+    cal = MacroCalendar(url="http://unused")
+    cal.load([MacroEvent(NFP, "NFP", "High")], DAY)
+
+    async def down(day):
+        raise ConnectionError("calendar down")
+    cal._fetch = down
+    assert asyncio.run(cal.refresh()) is False
+    assert cal.day == DAY and cal.high_impact_within(now=NFP)
@@ -0,0 +1,77 @@
+"""Unit test."""
+import numpy as np
+import pandas as pd
+
+from backtest import orchestrator as orch_mod
+from backtest.orchestrator import BacktestOrchestrator, make_shards
+
+DAYS = ("2024-01-02", "2024-01-05")
+
+
+class _Engine:
+    """BackTestEngine's run / daily_pnl contract without the model: flip every 7th bar."""
+
+    lookback, qty = 5, 100
+
+    def run(self, bars: pd.DataFrame) -> pd.DataFrame:
+        t = np.arange(self.lookback - 1, len(bars), 7)
+        return pd.DataFrame({
+            "ts": bars.index[t],
+            "action": np.where(np.arange(len(t)) % 2, "SELL", "BUY"),
+            "confidence": 1.0,
+            "price": bars["close"].to_numpy()[t],
+            "slippage_bps": 1.0,
+        })
+
+    def daily_pnl(self, bars: pd.DataFrame, trades: pd.DataFrame) -> pd.Series:
+        signed = pd.Series(np.where(trades["action"] == "BUY", self.qty, -self.qty),
+                           index=pd.DatetimeIndex(trades["ts"]))
+        pos = signed.reindex(bars.index).ffill().fillna(0.0)
+        pnl = pos.shift(fill_value=0.0) * bars["close"].diff().fillna(0.0)
+        return pnl.groupby(pnl.index.floor("1D")).sum()
+
+
+def _init_worker(lookback: int, qty: int, threads: int) -> None:
+    orch_mod._engine = _Engine()
+
+
+def _write_bars(bars_dir, symbol: str, seed: int) -> None:
+    ts = pd.date_range(DAYS[0], DAYS[1], freq="h", inclusive="left")
+    close = 100 + np.random.default_rng(seed).standard_normal(len(ts)).cumsum()
+    pd.DataFrame({"timestamp": ts, "open": close, "high": close, "low": close, "close": close,
+                  "volume": 1}).to_csv(bars_dir / f"{symbol}_1m.csv", index=False)
+
+
+def test_rerun_resumes_a_partial_run(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(orch_mod, "_init_worker", _init_worker)   # forked workers inherit it
+    bars = tmp_path / "bars"
+    bars.mkdir()
+    _write_bars(bars, "AAA", 0)
+    shards = make_shards(["AAA", "BBB"], *DAYS, period="D")
+    assert len(shards) == 6
+
+    orch = BacktestOrchestrator(out_dir=tmp_path / "out", bars_dir=bars, workers=2)
+    failed = orch.run(shards)                       # no BBB bars yet: its shards fail
+    assert sorted(failed) == sorted(s.key for s in shards if s.symbol == "BBB")
+    done = {s.key for s in shards if orch.done(s)}
+    assert done == {s.key for s in shards if s.symbol == "AAA"}
+    stamps = {p.name: p.stat().st_mtime_ns for p in orch.shard_dir.iterdir()}
+
+    # a worker killed mid-write: half a pair plus a stray temp file is not "done"
+    bbb = shards[3]
+    pd.DataFrame({"junk": [1]}).to_pickle(orch.shard_dir / f"{bbb.key}.trades.pkl")
+    (orch.shard_dir / f"{bbb.key}.equity.pkl.tmp").write_bytes(b"partial")
+    assert not orch.done(bbb)
+
+    _write_bars(bars, "BBB", 1)
+    assert orch.run(shards) == {}
+    assert all(orch.done(s) for s in shards)
+    assert {n: (orch.shard_dir / n).stat().st_mtime_ns for n in stamps} == stamps   # not re-run
+    resumed = orch.merge()
+
+    fresh = BacktestOrchestrator(out_dir=tmp_path / "fresh", bars_dir=bars, workers=2)
+    assert fresh.run(shards) == {}
+    ref = fresh.merge()
+    pd.testing.assert_frame_equal(resumed["trades"], ref["trades"])
+    pd.testing.assert_frame_equal(resumed["equity"], ref["equity"])
+    assert set(resumed["equity"]["symbol"]) == {"AAA", "BBB"}
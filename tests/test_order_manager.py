@@ -0,0 +1,48 @@
+"""Unit test."""
+import asyncio
+
+from ib_insync import LimitOrder, Stock
+
+from execution.fake_ib import FakeIB
+from execution.order_manager import OrderManager, OrderState
+
+
+def _run(clock, max_reprices: int, final: str, confirm_cancels: bool = True):
+    async def run():
+        c = Stock("INTC", "SMART", "USD")
+        ib = FakeIB(latency_ms=0)
+        if not confirm_cancels:
+            ib.cancelOrder = lambda order: None                 # IB never answers the cancel
+        ib.quote(c, 0.0, 100.0)
+        om = OrderManager(ib, timeout_s=5, max_reprices=max_reprices, final=final, cancel_timeout_s=2)
+        mo = om.submit(c, LimitOrder("BUY", 100, 99.95))       # rests below the bid
+        for _ in range(3):                                       # let the watcher arm its deadline
+            await asyncio.sleep(0)
+        ib.quote(c, 1.0, 100.0)
+        assert mo.state == OrderState.WORKING and om.open_orders() == [mo]
+        await clock.advance_to(5.0)                              # deadline → cancel sent
+        ib.quote(c, 5.1, 100.0)                                  # cancel confirmed → replace
+        ib.quote(c, 5.2, 100.0)
+        for _ in range(3):                                       # …and the cancel watchdog arm
+            await asyncio.sleep(0)
+        await clock.advance_to(7.5)                              # past the cancel watchdog
+        return mo, om
+    return asyncio.run(run())
+
+
+def test_timeout_reprices_at_touch(sim_clock) -> None:
+    mo, om = _run(sim_clock, max_reprices=1, final="aggressive")
+    assert mo.state == OrderState.FILLED and mo.done.done()
+    assert mo.reprices == 1 and mo.trades[1].order.lmtPrice == 100.01
+    assert mo.avg_price == 100.01 and not mo.passive_filled and om.open_orders() == []
+
+
+def test_timeout_without_replace_cancels(sim_clock) -> None:
+    mo, _ = _run(sim_clock, max_reprices=0, final="cancel")
+    assert mo.state == OrderState.CANCELLED and mo.filled == 0 and len(mo.trades) == 1
+
+
+def test_unconfirmed_cancel_closes_the_parent_without_replacing(sim_clock) -> None:
+    mo, om = _run(sim_clock, max_reprices=1, final="aggressive", confirm_cancels=False)
+    assert mo.state == OrderState.CANCELLED and mo.done.done() and mo.cancel_requested
+    assert len(mo.trades) == 1 and mo.reprices == 0 and om.open_orders() == []
@@ -0,0 +1,77 @@
+"""Unit test."""
+import asyncio
+import os
+from types import SimpleNamespace
+
+from ib_insync import LimitOrder, MarketOrder, Stock
+
+from execution.prime_connector import PrimeConnector
+from services.stub_servers import SERVICES, Profile, StubServer
+from utils.http_clients import close_all
+
+
+def _session(median_ms: float, fn, **kw):
+    async def run():
+        srv = await StubServer(port=0, seed=0, profiles={s: Profile(median_ms=median_ms, sigma=0) for s in SERVICES}
+                               ).start()
+        prev = os.environ.get("TRADER_STUBS")
+        os.environ["TRADER_STUBS"] = f"{srv.host}:{srv.port}"
+        try:
+            prime = PrimeConnector(**kw)
+            out = await fn(prime)
+            await prime.close()
+            await close_all()
+            return out, srv.stats
+        finally:
+            await srv.stop()
+            if prev is None:
+                os.environ.pop("TRADER_STUBS", None)
+            else:
+                os.environ["TRADER_STUBS"] = prev
+    return asyncio.run(run())
+
+
+def test_batches_and_correlates_acks_by_client_id() -> None:
+    async def flatten(prime):
+        orders = [(MarketOrder("SELL", 10 * (i + 1)), Stock(f"S{i}", "SMART", "USD")) for i in range(20)]
+        futs = [prime.submit(o, c) for o, c in orders]
+        await asyncio.gather(*futs)
+        return [f.result() for f in futs]
+    acks, stats = _session(0, flatten)
+    assert stats["prime.requests"] == 1 and stats["connections"] == 1
+    # the stub acks out of order: each caller still gets its own clOrdId back
+    assert all(a.status == "accepted" and a.cl_ord_id.endswith(f"-{i + 1}") for i, a in enumerate(acks))
+
+
+def test_legs_share_a_round_trip_and_batches_pipeline() -> None:
+    async def legs(prime):
+        c, spy = Stock("INTC", "SMART", "USD"), Stock("SPY", "SMART", "USD")
+        acks = await prime.send_legs([(LimitOrder("BUY", 100, 20.0), c), (MarketOrder("SELL", 0), spy)])
+        await asyncio.gather(*(prime.submit(MarketOrder("BUY", 1), c) for _ in range(24)))
+        return acks
+    acks, stats = _session(100, legs, max_batch=8, max_inflight=4)
+    assert [a.status for a in acks] == ["accepted", "rejected"]    # per-leg acks, one request
+    assert stats["prime.requests"] == 1 + 3
+    assert stats["prime.max_inflight"] == 3                         # the 3 batches overlap at the venue
+
+
+def test_close_flushes_the_queue() -> None:
+    async def fire_and_close(prime):
+        futs = [prime.submit(MarketOrder("BUY", 1), Stock("INTC", "SMART", "USD")) for _ in range(5)]
+        await prime.close()                                        # nothing awaited the acks yet
+        return [f.result().status for f in futs]
+    statuses, stats = _session(0, fire_and_close)
+    assert statuses == ["accepted"] * 5 and stats["prime.requests"] == 1
+
+
+def test_close_returns_when_the_writer_died() -> None:
+    async def dead_writer(prime):
+        fut = prime.submit(MarketOrder("BUY", 1), Stock("INTC", "SMART", "USD"))
+
+        async def broken():
+            raise RuntimeError("writer crashed")
+        prime._inflight = SimpleNamespace(acquire=broken)
+        await asyncio.wait_for(prime.close(), 1.0)
+        return fut
+    fut, stats = _session(0, dead_writer)
+    assert isinstance(fut.exception(), ConnectionError) and stats.get("prime.requests", 0) == 0
@@ -0,0 +1,58 @@
+"""Unit test."""
+import asyncio
+
+import numpy as np
+from prometheus_client import REGISTRY
+
+from performance import shadow
+from performance.shadow import ShadowEvaluator
+
+
+class _Encoder:
+    def __init__(self, logits):
+        self.logits = logits
+
+    def encode(self, png: bytes):
+        return self.logits
+
+
+def test_submit_drops_when_full_and_stop_flushes(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(shadow, "STORE_DIR", tmp_path)
+    ev = ShadowEvaluator(tags=["cand"], queue_size=2, flush_every=64)
+    ev._encoders["cand"] = _Encoder([0.0, 2.0, 0.0])      # always BUY
+
+    async def run():
+        dropped = REGISTRY.get_sample_value("shadow_dropped_total")
+        for i in range(3):                                 # worker not started: the third is dropped
+            ev.submit(b"png", "INTC", 100.0 + i, [2.0, 0.0, 0.0])
+        assert ev.queue.qsize() == 2 and REGISTRY.get_sample_value("shadow_dropped_total") == dropped + 1
+        ev.start()
+        while not ev.queue.empty():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        assert len(shadow.load_records("cand")) == 0      # still buffered: below flush_every
+        await ev.stop()
+
+    asyncio.run(run())
+    rec = shadow.load_records("cand")
+    assert len(rec) == 2 and rec["shadow"].tolist() == [1, 1] and rec["prod"].tolist() == [0, 0]
+
+
+def test_report_agreement_and_next_candle_pnl(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(shadow, "STORE_DIR", tmp_path)
+    rows = [  # ts, symbol, price, prod, shadow, logits – two symbols interleaved
+        (1.0, b"AAA", 100.0, 1, 1, (0, 1, 0)),
+        (1.0, b"BBB", 50.0, 0, 2, (0, 0, 1)),
+        (2.0, b"AAA", 101.0, 1, 2, (0, 0, 1)),
+        (2.0, b"BBB", 49.0, 0, 0, (1, 0, 0)),
+        (3.0, b"AAA", 100.0, 0, 0, (1, 0, 0)),
+    ]
+    np.array(rows, dtype=shadow.RECORD).tofile(tmp_path / "cand.bin")
+
+    row = shadow.report(["cand"]).iloc[0]
+    assert row["n"] == 5 and row["agreement"] == 3 / 5
+    assert row["shadow_trades"] == 3 and row["prod_trades"] == 2
+    # shadow: AAA long +1 %, AAA short −(−0.99 %), BBB short −(−2 %); last bar of each symbol earns nothing
+    np.testing.assert_allclose(row["shadow_pnl_bps"], 100 + 1e4 * (1 - 100 / 101) + 200, atol=1e-3)
+    np.testing.assert_allclose(row["prod_pnl_bps"], 100 - 1e4 * (1 - 100 / 101), atol=1e-3)   # f4 prices
+    assert row["shadow_hit_rate"] == 1.0
@@ -0,0 +1,96 @@
+"""Unit test."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services.stub_servers import SERVICES, Profile, StubServer
+from utils import endpoints
+
+
+def _serve(fn, **profile):
+    async def run():
+        srv = await StubServer(port=0, seed=0, profiles={s: Profile(median_ms=0, sigma=0, **profile)
+                                                         for s in SERVICES}).start()
+        try:
+            async with httpx.AsyncClient(base_url=srv.url, timeout=2) as client:
+                return await fn(srv, client), srv.stats
+        finally:
+            await srv.stop()
+    return asyncio.run(run())
+
+
+def test_endpoint_switches_between_real_and_stub(monkeypatch) -> None:
+    monkeypatch.delenv("TRADER_STUBS", raising=False)
+    monkeypatch.setattr(endpoints, "STUB_CFG", {"enabled": False})
+    assert endpoints.stub_base() is None
+    assert endpoints.endpoint("finnhub") == "https://finnhub.io/api/v1/news"
+    assert endpoints.endpoint("audit", real="https://gw.example/drop") == "https://gw.example/drop"
+
+    monkeypatch.setattr(endpoints, "STUB_CFG", {"enabled": True, "host": "10.0.0.1", "port": 9000})
+    assert endpoints.endpoint("kimi") == "http://10.0.0.1:9000/kimi"
+    monkeypatch.setenv("TRADER_STUBS", "127.0.0.1:1234")   # the env var wins over config
+    assert endpoints.endpoint("prime") == "http://127.0.0.1:1234/prime"
+    monkeypatch.setenv("TRADER_STUBS", "https://stubs.local")
+    assert endpoints.stub_base() == "https://stubs.local"
+
+
+def test_every_service_route_answers() -> None:
+    async def calls(srv, client):
+        chat = {"messages": [{"role": "user", "content": "chart"}]}
+        decision = json.loads((await client.post("/kimi", json=chat)).json()["choices"][0]["message"]["content"])
+        sentiment = (await client.post("/kimi", json={"messages": [{"content": "Rate sentiment: x"}]})).json()
+        orders = [{"clOrdId": f"c{i}", "action": "BUY", "qty": 10} for i in range(5)] + \
+                 [{"clOrdId": "bad", "action": "HOLD", "qty": 0}]
+        batch = (await client.post("/prime/orders/batch", json={"orders": orders})).json()["acks"]
+        return {
+            "decision": decision["action"],
+            "sentiment": sentiment["choices"][0]["message"]["content"].split()[0],
+            "finnhub": (await client.get("/finnhub", params={"category": "general"})).json()[0]["headline"],
+            "calendar": (await client.get("/calendar")).json()["result"][0]["impact"],
+            "audit": (await client.post("/audit", json={"type": "ORDER"})).json()["status"],
+            "prime": (await client.post("/prime/orders", json={"symbol": "INTC"})).json()["status"],
+            "batch": {a["clOrdId"]: a["status"] for a in batch},
+            "unknown": (await client.get("/nowhere")).status_code,
+            "wrong_method": (await client.get("/audit")).status_code,
+        }
+
+    out, stats = _serve(calls)
+    assert out["decision"] in ("HOLD", "BUY", "SELL") and -1.0 <= float(out["sentiment"]) <= 1.0
+    assert out["finnhub"].startswith("Stub headline") and out["calendar"] in ("High", "Low")
+    assert out["audit"] == "ok" and out["prime"] == "accepted"
+    assert out["batch"] == {**{f"c{i}": "accepted" for i in range(5)}, "bad": "rejected"}
+    assert out["unknown"] == 404 and out["wrong_method"] == 404
+    assert stats["connections"] == 1 and stats["kimi.requests"] == 2 and stats["prime.requests"] == 2
+
+
+def test_injected_errors_and_timeouts() -> None:
+    async def failing(srv, client):
+        return [(await client.get("/finnhub")).status_code for _ in range(3)]
+
+    codes, stats = _serve(failing, error_rate=1.0)
+    assert codes == [503] * 3 and stats["finnhub.errors"] == 3
+
+    async def hanging(srv, client):
+        with pytest.raises(httpx.ReadTimeout):
+            await client.get("/calendar", timeout=0.2)
+
+    _, stats = _serve(hanging, timeout_rate=1.0, hang_s=5.0)
+    assert stats["calendar.timeouts"] == 1
+
+
+def test_malformed_requests_get_a_400() -> None:
+    async def raw(srv, client):
+        reader, writer = await asyncio.open_connection(srv.host, srv.port)
+        writer.write(b"GARBAGE\r\n\r\n")
+        await writer.drain()
+        bad_line = await reader.read()                    # answered, then closed
+        writer.close()
+        bad_json = await client.post("/audit", content=b"{not json", headers={"content-type": "application/json"})
+        still_ok = await client.post("/audit", json={})   # body errors keep the connection usable
+        return bad_line, bad_json.status_code, still_ok.status_code
+
+    (bad_line, bad_json, still_ok), stats = _serve(raw)
+    assert bad_line.startswith(b"HTTP/1.1 400") and b"Connection: close" in bad_line
+    assert bad_json == 400 and still_ok == 200 and stats["bad_requests"] == 2
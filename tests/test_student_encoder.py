@@ -0,0 +1,59 @@
+"""Unit test."""
+import json
+from io import BytesIO
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import ViTConfig, ViTForImageClassification, ViTImageProcessor
+
+from encoders.student_encoder import INPUT_HW, ChartStudent, StudentChartEncoder, preprocess
+from registry.model_registry import ModelRegistry
+from training.distill import Distiller
+
+
+def _png(seed: int) -> bytes:
+    px = np.random.default_rng(seed).integers(0, 256, (60, 100, 3), dtype=np.uint8)
+    buf = BytesIO()
+    Image.fromarray(px).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _teacher(tag=None):
+    """One-layer 32px ViT standing in for the registry checkpoint."""
+    torch.manual_seed(0)
+    model = ViTForImageClassification(ViTConfig(
+        image_size=32, patch_size=16, hidden_size=16, num_hidden_layers=1,
+        num_attention_heads=2, intermediate_size=32, num_labels=3,
+    ))
+    return model, ViTImageProcessor(size={"height": 32, "width": 32})
+
+
+def test_student_logits_shape() -> None:
+    x = preprocess(_png(0))
+    assert x.shape == (3, *INPUT_HW) and 0.0 <= float(x.min()) and float(x.max()) <= 1.0
+    assert ChartStudent().eval()(torch.stack([x, x])).shape == (2, 3)
+
+
+def test_distilled_student_loads_from_the_registry(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(ModelRegistry, "root", tmp_path / "registry")
+    monkeypatch.setattr(ModelRegistry, "load_vit", staticmethod(_teacher))
+    data = tmp_path / "data"
+    data.mkdir()
+    with (data / "labels.jsonl").open("w") as f:
+        for i in range(20):
+            f.write(json.dumps({"png_b64": _png(i).hex(), "reward": (i % 3 - 1) * 0.01}) + "\n")
+
+    distiller = Distiller("student-test", epochs=1, batch_size=8)
+    distiller.dataset_dir = data
+    rep = distiller.run()
+    assert rep["n_eval"] == 2 and 0.0 <= rep["top1_agreement"] <= 1.0
+    assert (ModelRegistry.root / "student-test" / "distill_report.json").exists()
+
+    enc = ModelRegistry.load_encoder("student-test")
+    assert isinstance(enc, StudentChartEncoder)
+    pngs = [_png(i) for i in range(3)]
+    one = enc.encode(pngs[0])
+    batch = enc.encode_batch(pngs)
+    assert len(one) == 3 and batch.shape == (3, 3)
+    np.testing.assert_allclose(batch[0], one, atol=1e-5)
@@ -0,0 +1,170 @@
+"""Unit test."""
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from ib_insync import Stock
+from prometheus_client import REGISTRY
+
+from data_ingestion.candle_builder import CandleBuilder
+from execution.broker import Broker
+from execution.fake_ib import FakeIB
+from execution.impact_model import ImpactModel
+from execution.micro_price import MicroPrice
+from performance.shadow import ShadowEvaluator
+from risk.portfolio_risk import PortfolioRisk
+from risk.reg_t_guard import RegTGuard
+from services import supervisor as sup_mod
+from services.stub_servers import SERVICES, Profile, StubServer
+from services.supervisor import Supervisor
+from utils.config import load_config
+from utils.http_clients import close_all
+
+C = Stock("INTC", "SMART", "USD")
+
+
+class _Agent:
+    def __init__(self, action: str, block_s: float = 0.0) -> None:
+        self.action, self.block_s, self.calls = action, block_s, 0
+        self.last_logits = [0.0, 1.0, 0.0]
+
+    def decide(self, png, df):
+        self.calls += 1
+        time.sleep(self.block_s)        # a worker thread the stage deadline can't cancel
+        return self.action, 1.0
+
+
+class _Brain:
+    def __init__(self) -> None:
+        self.started = self.cancelled = 0
+
+    async def decide(self, *args):
+        self.started += 1
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def _supervisor(agent: _Agent, micro_cost_bps: float = 0.0, level_size: int = 1_000_000) -> Supervisor:
+    """Real broker / risk / impact on a FakeIB; agent, LLM and micro-price are test doubles."""
+    ib = FakeIB(nav=100_000, latency_ms=0)
+    ib.quote(C, 0.0, 20.0, size=level_size)
+    sup = Supervisor.__new__(Supervisor)   # skip encoder / model loading
+    sup.broker = Broker(load_config()["risk"], ib=ib)
+    sup.broker.risk.macro_blackout = lambda: False
+    sup.brain, sup.agent = _Brain(), agent
+    sup.builder = CandleBuilder(lookback=10)
+    sup.builder.add_tick(C, SimpleNamespace(last=20.0, close=None, volume=100))
+    sup.pnl = SimpleNamespace(tick=lambda nav: None)
+    sup.drift = SimpleNamespace(check_and_retrain=lambda: False)
+    sup.shadow = ShadowEvaluator(tags=[])
+    sup.sent_agent = SimpleNamespace(score_headline=lambda h: asyncio.sleep(0, SimpleNamespace(score=0.1)))
+    sup.port_risk, sup.reg_t = PortfolioRisk(ib), RegTGuard(ib)
+    sup.impact = ImpactModel(gamma=0.05, eta=0.01)
+    sup.micro = SimpleNamespace(compute=lambda lob, qty: MicroPrice(20.0, micro_cost_bps, 0))
+    sup.encoder = SimpleNamespace(encode_live=lambda png, lob, headline: [0.0])
+    sup._reason_memory, sup._agent_call = [], None
+    return sup
+
+
+def _with_stubs(fn):
+    """Run `fn()` with every outbound call (the headline) served by the local stubs."""
+    async def run():
+        srv = await StubServer(port=0, seed=0, profiles={s: Profile(median_ms=0, sigma=0) for s in SERVICES}
+                               ).start()
+        prev = os.environ.get("TRADER_STUBS")
+        os.environ["TRADER_STUBS"] = f"{srv.host}:{srv.port}"
+        try:
+            return await fn()
+        finally:
+            await close_all()
+            await srv.stop()
+            if prev is None:
+                os.environ.pop("TRADER_STUBS", None)
+            else:
+                os.environ["TRADER_STUBS"] = prev
+    return asyncio.run(run())
+
+
+def _skipped(stage: str, reason: str) -> float:
+    return REGISTRY.get_sample_value("supervisor_stage_skipped_total", {"stage": stage, "reason": reason}) or 0.0
+
+
+def test_hold_short_circuits_before_the_book_and_the_llm() -> None:
+    sup = _supervisor(_Agent("HOLD"))
+    sup.broker.ib.md_latency_ms = 5_000          # a tick that waited for the book would time out
+
+    async def run():
+        await asyncio.wait_for(sup.on_candle(b"png", C), 2.0)
+
+    _with_stubs(run)
+    assert sup.agent.calls == 1 and sup.brain.started == 0
+    assert sup.broker.ib.order_log == []
+
+
+def test_llm_waits_for_the_gates_by_default() -> None:
+    assert sup_mod.SPECULATIVE_LLM is False
+    sup = _supervisor(_Agent("BUY"), micro_cost_bps=1e6)
+
+    _with_stubs(lambda: asyncio.wait_for(sup.on_candle(b"png", C), 2.0))
+    assert sup.brain.started == 0 and sup.broker.ib.order_log == []
+
+
+def test_gate_rejection_cancels_the_speculative_llm_call(monkeypatch) -> None:
+    monkeypatch.setattr(sup_mod, "SPECULATIVE_LLM", True)
+    sup = _supervisor(_Agent("BUY"), micro_cost_bps=1e6)
+    sup.broker.ib.md_latency_ms = 300            # the book lands once the LLM call is in flight
+
+    async def run():
+        tick = asyncio.create_task(sup.on_candle(b"png", C))
+        for _ in range(100):
+            if sup.brain.started:
+                break
+            await asyncio.sleep(0.01)
+        assert sup.brain.started == 1 and not tick.done()
+        await asyncio.wait_for(tick, 2.0)        # book → micro-price gate rejects
+        await asyncio.sleep(0)
+
+    _with_stubs(run)
+    assert sup.brain.cancelled == 1 and sup.broker.ib.order_log == []
+
+
+def test_agent_timeout_skips_candles_until_the_thread_finishes(monkeypatch) -> None:
+    monkeypatch.setattr(sup_mod, "DEADLINES_MS", {"agent": 50})
+    sup = _supervisor(_Agent("HOLD", block_s=0.5))
+    busy = _skipped("agent", "busy")
+
+    async def run():
+        await sup.on_candle(b"png", C)             # stage deadline: the tick fails, the thread runs on
+        assert sup.agent.calls == 1 and not sup._agent_call.done()
+        await sup.on_candle(b"png", C)             # previous call still running → skipped
+        assert sup.agent.calls == 1 and _skipped("agent", "busy") == busy + 1
+        await sup._agent_call
+        await sup.on_candle(b"png", C)
+        assert sup.agent.calls == 2
+
+    _with_stubs(run)
+    assert sup.brain.started == 0
+
+
+def test_algo_parent_is_not_shrunk_to_the_sweep_budget(monkeypatch) -> None:
+    monkeypatch.setitem(sup_mod.cfg["risk"], "max_var_usd", float("inf"))   # not in config.yaml
+    sup = _supervisor(_Agent("BUY"), level_size=40)    # 200-share book: the parent gets sliced
+    sup.brain = SimpleNamespace(decide=lambda *a: asyncio.sleep(0, SimpleNamespace(action="BUY")))
+    sent = []
+
+    async def execute(decision, contract, ctx=None):
+        sent.append(ctx.sized.qty)
+        raise RuntimeError("stop after execute")       # hedge / audit are not under test
+    sup.broker.execute = execute
+    resized = REGISTRY.get_sample_value("supervisor_impact_resized_total") or 0.0
+    wanted = sup.broker.risk.size_order(100_000, 20.0, 0.0).qty
+
+    _with_stubs(lambda: sup.on_candle(b"png", C))
+    lob = SimpleNamespace(ask=[(20.01, 40)] * 5, bid=[(19.99, 40)] * 5)
+    assert sup.broker.router.route(lob, "BUY", wanted).action == "ALGO"
+    assert sent == [wanted]
+    assert (REGISTRY.get_sample_value("supervisor_impact_resized_total") or 0.0) == resized
@@ -0,0 +1,79 @@
+"""Unit test."""
+import numpy as np
+import pytest
+
+from agents.technical_agent import BUY, HOLD, SELL
+from backtest import sweep
+from backtest.sweep import DEFAULTS, Artifacts, evaluate, fake_books
+from data_ingestion.lob_stream import LobTick
+from execution.impact_model import ImpactModel
+from execution.smart_router import SmartRouter
+from performance import analytics
+
+QTY = 100
+
+
+def _artifacts(n: int = 600, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    books = fake_books(close)
+    art = Artifacts(
+        ts=np.arange(n).astype("datetime64[m]"), close=np.stack([close, close], axis=1),
+        logits=np.zeros((n, 3)),
+        bid_px=books[..., 0], bid_sz=books[..., 1], ask_px=books[..., 2], ask_sz=books[..., 3],
+    )
+    action = rng.choice([HOLD, BUY, SELL], n, p=[0.9, 0.05, 0.05]).astype(np.int8)
+    return art, action
+
+
+def _reference(art: Artifacts, action: np.ndarray, p) -> dict:
+    """Bar-by-bar: a signal opens a ±QTY leg at the close, a hard-stop hit flattens it."""
+    close = art.close[:, -1]
+    pos, pnl = np.zeros(len(close)), np.zeros(len(close))
+    side, ref, stopped, stops, cost = 0.0, 1.0, False, 0, 0.0
+    for i in range(len(close)):
+        if action[i] != HOLD:
+            side, ref, stopped = (1.0 if action[i] == BUY else -1.0), close[i], False
+        if side and not stopped and side * (close[i] / ref - 1.0) <= -p["hard_stop_pct"]:
+            stopped, stops = True, stops + 1
+        pos[i] = 0.0 if stopped else QTY * side
+        prev = pos[i - 1] if i else 0.0
+        trade = pos[i] - prev
+        px, sz = (art.ask_px, art.ask_sz) if trade > 0 else (art.bid_px, art.bid_sz)
+        c = abs(trade) * sweep._walk_cost(px[i:i + 1], sz[i:i + 1], abs(trade), p["gamma"], p["eta"])[1][0]
+        pnl[i] = (prev * (close[i] - close[i - 1]) if i else 0.0) - c
+        cost += c
+    return {"signals": int((action != HOLD).sum()), "stops": stops, "cost": cost,
+            **analytics.summarize(pnl, pos)}
+
+
+@pytest.mark.parametrize("stop", [0.002, 0.01, 1.0])
+def test_vectorised_hard_stop_matches_a_bar_loop(monkeypatch, stop) -> None:
+    art, action = _artifacts()
+    monkeypatch.setattr(sweep.TechnicalAgent, "ta_signal_windows", staticmethod(lambda c, *a: action))
+    monkeypatch.setattr(sweep.TechnicalAgent, "decide_batch", staticmethod(lambda lg, ta, gap: (ta, None)))
+    p = {**DEFAULTS, "max_slippage_bps": 1e9, "max_cost_bps": 1e9, "hard_stop_pct": stop}
+
+    got, want = evaluate(art, p, QTY), _reference(art, action, p)
+    if stop < 1.0:
+        assert want["stops"] > 0
+    for k, v in want.items():
+        assert got[k] == pytest.approx(v, rel=1e-9, abs=1e-9), k
+
+
+def test_sizing_matches_the_live_router_and_impact_budget() -> None:
+    rng = np.random.default_rng(2)
+    n, levels = 200, 5
+    best = 20 + rng.random(n)
+    px = best[:, None] + 0.01 * np.cumsum(rng.integers(1, 4, (n, levels)), axis=1) - 0.01
+    sz = rng.integers(10, 300, (n, levels)).astype(float)
+    router, impact = SmartRouter({"SMART": 0.3}), ImpactModel(gamma=0.05, eta=0.01)
+    for qty in (50, 400):
+        got = sweep._size(px, sz, qty, 10.0)
+        for i in range(n):
+            lob = LobTick(None, [], list(zip(px[i], sz[i].astype(int))), 0.0, 0)
+            if router.route(lob, "BUY", qty).action == "ALGO":
+                want = qty                                # sliced: no sweep budget
+            else:
+                want = impact.max_qty("BUY", lob, 10.0, None, upper=qty)
+            assert got[i] == want, (qty, i)
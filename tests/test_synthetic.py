@@ -0,0 +1,41 @@
+"""Unit test."""
+import numpy as np
+import pytest
+
+from data_pipeline import synthetic
+from data_pipeline.binary_dataset import iter_pngs, list_shards, read_shard, shard_len, write_shard
+from data_pipeline.synthetic import SyntheticEngine
+
+
+def test_paths_are_consistent_ohlc() -> None:
+    eng = SyntheticEngine(n_scenarios=500, steps=30, seed=0)
+    ohlc = eng.simulate_paths()
+    o, h, l, c = np.moveaxis(ohlc, -1, 0)
+    assert ohlc.shape == (500, 30, 4) and ohlc.dtype == np.float32
+    assert np.allclose(o[:, 0], 100) and (h >= np.maximum(o, c)).all() and (l <= np.minimum(o, c)).all()
+    lob = eng.make_lob(ohlc)
+    assert (lob[:, 0, 0] < c[:, -1]).all() and (lob[:, 0, 2] > c[:, -1]).all()      # bid < last < ask
+    assert (np.diff(lob[..., 0], axis=1) < 0).all() and (lob[..., [1, 3]] >= 1).all()
+
+
+def test_shard_round_trip(tmp_path) -> None:
+    pngs = [bytes([i]) * (i * 7 + 1) for i in range(5)]           # ragged rows
+    lob = np.arange(5 * 2 * 4, dtype=np.float32).reshape(5, 2, 4)
+    path = write_shard(tmp_path / "x-00000.npz", pngs, lob=lob, action=np.array([0, 1, 2, 1, 0], np.int8))
+    shard = read_shard(path)
+    assert shard_len(shard) == 5 and list(iter_pngs(shard)) == pngs
+    np.testing.assert_array_equal(shard["lob"], lob)
+    with pytest.raises(ValueError):
+        write_shard(tmp_path / "bad.npz", pngs, action=np.zeros(4))
+
+
+def test_generate_splits_rows_across_shards(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(synthetic, "OUT_DIR", tmp_path)
+    eng = SyntheticEngine(n_scenarios=5, steps=20, workers=1, shard_size=3, chunk_size=2, seed=1)
+    shards = eng.generate()
+    assert shards == list_shards(tmp_path, synthetic.PREFIX) and len(shards) == 2
+    rows = [read_shard(p) for p in shards]
+    assert [shard_len(r) for r in rows] == [3, 2]
+    assert all(png.startswith(b"\x89PNG") for r in rows for png in iter_pngs(r))
+    ohlc = np.concatenate([r["ohlc"] for r in rows])
+    assert ohlc.shape == (5, 20, 4) and np.allclose(ohlc[:, 0, 0], 100)
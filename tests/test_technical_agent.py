@@ -0,0 +1,35 @@
+"""Unit test."""
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from agents.technical_agent import ACTIONS, HOLD, TechnicalAgent
+
+
+def test_ta_signal_windows_matches_per_window() -> None:
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, (40, 60)), axis=1))
+    agent = TechnicalAgent.__new__(TechnicalAgent)  # TA only – no encoder load
+    ref = [ACTIONS.index(agent._ta_signal(pd.DataFrame({"close": c}))) for c in close]
+    assert TechnicalAgent.ta_signal_windows(close).tolist() == ref
+
+
+def test_decide_batch_matches_decide_bar_by_bar() -> None:
+    rng = np.random.default_rng(1)
+    logits = rng.normal(0, 1, (300, 3)).astype(np.float32)
+    logits[::4, 1] += 2.0                                    # runs of confident BUYs
+    ta = rng.choice(3, 300, p=[0.2, 0.5, 0.3]).astype(np.int8)
+
+    agent = TechnicalAgent.__new__(TechnicalAgent)
+    agent._chart_history, agent.max_seq = [], 3
+    agent.encoder = SimpleNamespace(encode=lambda png: logits[int(png)].tolist())
+    live = []
+    for i in range(len(logits)):
+        agent._ta_signal = lambda df, a=ACTIONS[ta[i]]: a
+        live.append(agent.decide(str(i).encode(), None))
+
+    action, conf = TechnicalAgent.decide_batch(logits, ta)
+    assert [ACTIONS[a] for a in action] == [a for a, _ in live]
+    np.testing.assert_allclose(conf, [c for _, c in live], rtol=1e-6)
+    assert (action != HOLD).sum() > 0